@@ -1,5 +1,5 @@
 from django.core.management.base import BaseCommand, CommandError
-from django.core.mail import send_mail
+from django.core.mail import get_connection, send_mail
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
@@ -40,6 +40,9 @@ class Command(BaseCommand):
         self.stdout.write(f"[TEST] Testing {email_type} email...")
         self.stdout.write(f"[EMAIL] Target email: {test_email}")
         self.stdout.write(f"[BACKEND] Email backend: {settings.EMAIL_BACKEND}")
+        # Bypass the outbound queue so the delivery backend itself is tested
+        self.stdout.write(f"[BACKEND] Delivery backend: {settings.EMAIL_QUEUE_DELIVERY_BACKEND}")
+        self.connection = get_connection(settings.EMAIL_QUEUE_DELIVERY_BACKEND)
         self.stdout.write("-" * 60)
 
         try:
@@ -92,7 +95,8 @@ HR Portal Development Team
             message=message,
             from_email=settings.DEFAULT_FROM_EMAIL,
             recipient_list=[email],
-            fail_silently=False
+            fail_silently=False,
+            connection=self.connection
         )
 
     def send_password_reset_email(self, username, email):
@@ -161,6 +165,7 @@ HR Portal Team
             from_email=settings.DEFAULT_FROM_EMAIL,
             recipient_list=[email],
             fail_silently=False,
+            connection=self.connection,
             html_message=email_content
         )
 
@@ -202,7 +207,8 @@ Time: {self.get_current_time()}
             message=message,
             from_email=settings.DEFAULT_FROM_EMAIL,
             recipient_list=[email],
-            fail_silently=False
+            fail_silently=False,
+            connection=self.connection
         )
 
     def get_current_time(self):
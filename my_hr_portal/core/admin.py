@@ -1,10 +1,30 @@
 from django.contrib import admin
 from django.contrib.contenttypes.models import ContentType
 from django import forms
+from django.utils import timezone
 from .models import (
     Address, Qualification, Skill, Contract, Invoice,
-    Payment, Notification, Profession, InvoiceLineItem # Make sure InvoiceLineItem is imported
+    Payment, Notification, Profession, InvoiceLineItem, # Make sure InvoiceLineItem is imported
+    OutboundEmail, Rollup,
 )
+from .reference_data import MODEL_NAMES, use_cached_choices
+
+
+class ReferenceDataAdminMixin:
+    """Render skill/profession/qualification/address/template choices from the reference cache."""
+
+    def _cached(self, db_field, formfield):
+        name = MODEL_NAMES.get(db_field.remote_field.model)
+        if formfield is not None and name and db_field.name not in self.get_autocomplete_fields(None):
+            use_cached_choices(formfield, name)
+        return formfield
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        return self._cached(db_field, super().formfield_for_foreignkey(db_field, request, **kwargs))
+
+    def formfield_for_manytomany(self, db_field, request, **kwargs):
+        return self._cached(db_field, super().formfield_for_manytomany(db_field, request, **kwargs))
+
 
 @admin.register(Address)
 class AddressAdmin(admin.ModelAdmin):
@@ -46,7 +66,7 @@ class InvoiceLineItemInline(admin.TabularInline):
     extra = 1 # Show one extra blank line item form by default
 
 @admin.register(Contract)
-class ContractAdmin(admin.ModelAdmin):
+class ContractAdmin(ReferenceDataAdminMixin, admin.ModelAdmin):
     list_display = ['contract_type', 'get_client', 'status', 'effective_date', 'expiry_date']
     list_filter = ['contract_type', 'status']
     search_fields = ['template_version']
@@ -117,4 +137,34 @@ class NotificationAdmin(admin.ModelAdmin):
 @admin.register(Profession)
 class ProfessionAdmin(admin.ModelAdmin):
     list_display = ['name', 'description']
-    search_fields = ['name']
\ No newline at end of file
+    search_fields = ['name']
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'recipients', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status']
+    search_fields = ['subject']
+    exclude = ['message']
+    readonly_fields = ['from_email', 'recipients', 'subject', 'attempts', 'last_error', 'sent_at']
+    actions = ['retry_now']
+
+    @admin.action(description='Retry selected emails now')
+    def retry_now(self, request, queryset):
+        queryset.exclude(status=OutboundEmail.Status.SENT).update(
+            status=OutboundEmail.Status.QUEUED, next_attempt_at=timezone.now(), attempts=0
+        )
+
+
+@admin.register(Rollup)
+class RollupAdmin(admin.ModelAdmin):
+    """Read-only; rows are maintained by core/rollups.py (see the rebuild_rollups command)."""
+    list_display = ['scope', 'scope_id', 'period', 'period_start', 'hours', 'overtime_hours', 'gross_pay', 'billed_amount', 'headcount']
+    list_filter = ['scope', 'period']
+    date_hierarchy = 'period_start'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
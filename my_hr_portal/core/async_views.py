@@ -0,0 +1,64 @@
+# core/async_views.py
+"""
+Helpers for async views.
+
+Under ASGI (``asgi.py`` behind uvicorn workers) an async view runs on the
+worker's event loop, so a request waiting on the database, a file or a slow
+client does not hold a whole worker the way a sync view does. Under WSGI the
+same views still work: Django runs each one in its own event loop.
+
+Database work uses the async ORM (``aget``, ``acount``, ``async for``...),
+which Django runs in its single sync thread. Templates are rendered there as
+well (``render_async``): they may still touch lazy relations, paginator pages
+and ``request.user``, none of which may run on the event loop.
+
+Streaming bodies have to match the server. ASGI collects a sync iterator into
+a list before sending anything and WSGI does the same with an async one, so
+views check ``is_asgi()`` and wrap sync bodies with ``pull()``;
+``file_response()`` does this for file downloads.
+"""
+import asyncio
+import os
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, StreamingHttpResponse
+from django.shortcuts import render
+from django.utils.http import content_disposition_header
+
+FILE_CHUNK_SIZE = 64 * 1024
+
+render_async = sync_to_async(render)
+
+
+def is_asgi(request):
+    return isinstance(request, ASGIRequest)
+
+
+async def pull(iterator):
+    """Chunks of a sync iterator, each produced in the sync thread so database cursors stay on their connection."""
+    iterator = iter(iterator)
+    done = object()
+    next_chunk = sync_to_async(next)
+    while (chunk := await next_chunk(iterator, done)) is not done:
+        yield chunk
+
+
+async def _read(path, chunk_size):
+    # File reads go to the default executor, off both the event loop and the ORM thread
+    f = await asyncio.to_thread(open, path, 'rb')
+    try:
+        while chunk := await asyncio.to_thread(f.read, chunk_size):
+            yield chunk
+    finally:
+        await asyncio.to_thread(f.close)
+
+
+async def file_response(request, path, filename, content_type='application/octet-stream'):
+    """Download of the file at ``path``; under WSGI a ``FileResponse`` (sendfile where the server has it)."""
+    if not is_asgi(request):
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=filename, content_type=content_type)
+    response = StreamingHttpResponse(_read(path, FILE_CHUNK_SIZE), content_type=content_type)
+    response['Content-Length'] = str(await asyncio.to_thread(os.path.getsize, path))
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    return response
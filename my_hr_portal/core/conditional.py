@@ -0,0 +1,159 @@
+# core/conditional.py
+"""
+Conditional GET for detail pages.
+
+``conditional(validators)`` wraps a sync or async view. Before the view runs,
+``validators(request, *args, **kwargs)`` returns the values the page depends
+on: ``updated_at`` of the object and of whatever else it shows, read with one
+``values_list()`` query annotated with ``newest()``/``counted()`` subqueries,
+plus fragment_cache counters (``fragment_cache.changed_at()``) for the
+viewer's own rows and cache version counters for data shared by every page
+(a whole table), which would otherwise need a scan. It returns ``None`` when the object is missing, and the
+view then answers as usual (404, redirect).
+
+The ETag is a hash of those values, the user, the CSRF cookie (pages embed
+forms), the language and the deployed code (``release()``). If the browser
+already has it (``If-None-Match``), a 304 goes back without running the view:
+no template, no further queries. Pages are sent ``Cache-Control: private,
+no-cache`` so browsers keep them but revalidate every time. Last-Modified is
+sent as the newest timestamp, but only the ETag decides a 304, since the hash
+also covers things a timestamp does not (user, CSRF cookie, deleted rows).
+
+Requests with pending flash messages always get the full page, so a message
+is not held back by a 304.
+"""
+import hashlib
+import os
+import time
+from datetime import datetime
+from functools import cache, wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache as shared_cache
+from django.db.models import Func, IntegerField, Subquery
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date, parse_etags
+
+# Directories under BASE_DIR that hold no code or templates
+RELEASE_SKIP_DIRS = {'.git', 'media', 'static', 'staticfiles', 'logs', 'venv', '__pycache__', 'node_modules'}
+
+
+@cache
+def release():
+    """Newest modification time of the project's code and templates: changes with every deploy."""
+    newest = 0
+    for root, dirs, files in os.walk(settings.BASE_DIR):
+        dirs[:] = [d for d in dirs if d not in RELEASE_SKIP_DIRS]
+        for name in files:
+            if name.endswith(('.py', '.html')):
+                newest = max(newest, os.stat(os.path.join(root, name)).st_mtime_ns)
+    return str(newest)
+
+
+def newest(queryset, field='updated_at'):
+    """Subquery of the newest ``field`` in ``queryset``, for annotating a validator query."""
+    return Subquery(queryset.order_by().values(newest=Func(field, function='MAX')))
+
+
+def counted(queryset):
+    """Subquery of the number of rows in ``queryset`` (so deletions change the ETag too)."""
+    return Subquery(queryset.order_by().values(count=Func('pk', function='COUNT')), output_field=IntegerField())
+
+
+def versions(*keys):
+    """
+    Values of the cache version counters ``keys``. Missing ones are created, so
+    the page rendered next does not move them and miss the ETag it was sent with.
+    """
+    found = shared_cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        # add() keeps a counter another worker set in the meantime
+        for key in missing:
+            shared_cache.add(key, time.time_ns(), None)
+        found.update(shared_cache.get_many(missing))
+    return [found.get(key) for key in keys]
+
+
+def _validate(request, validators, args, kwargs):
+    if request.method not in ('GET', 'HEAD') or len(get_messages(request)):
+        return None
+    values = validators(request, *args, **kwargs)
+    if values is None:
+        return None
+    values = list(values)
+    parts = [
+        release(),
+        str(request.user.pk),
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+        getattr(request, 'LANGUAGE_CODE', ''),
+        *(value.isoformat() if isinstance(value, datetime) else repr(value) for value in values),
+    ]
+    # Weak: the page is equivalent, not byte-identical (CSRF tokens are masked per render)
+    etag = 'W/"%s"' % hashlib.sha256('|'.join(parts).encode()).hexdigest()[:32]
+    timestamps = [value for value in values if isinstance(value, datetime)]
+    return etag, max(timestamps) if timestamps else None
+
+
+def _not_modified(request, etag):
+    # Weak comparison, as for If-None-Match on GET/HEAD
+    tags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+    return '*' in tags or etag.removeprefix('W/') in (tag.removeprefix('W/') for tag in tags)
+
+
+def _finish(request, response, validated):
+    etag, last_modified = validated
+    if response.status_code == 200:
+        response.headers.setdefault('ETag', etag)
+        if last_modified and not response.has_header('Last-Modified'):
+            response.headers['Last-Modified'] = http_date(last_modified.timestamp())
+    if response.status_code in (200, 304):
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _not_modified_response(etag, last_modified):
+    response = HttpResponseNotModified()
+    response.headers['ETag'] = etag
+    if last_modified:
+        response.headers['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def conditional(validators):
+    """Answer repeat GETs of the decorated view with 304 while ``validators`` return the same values."""
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+
+            @wraps(view)
+            async def inner(request, *args, **kwargs):
+                # Validators query the database and touch request.user and the session
+                validated = await sync_to_async(_validate)(request, validators, args, kwargs)
+                if validated is None:
+                    return await view(request, *args, **kwargs)
+                if _not_modified(request, validated[0]):
+                    response = _not_modified_response(*validated)
+                else:
+                    response = await view(request, *args, **kwargs)
+                return _finish(request, response, validated)
+
+        else:
+
+            @wraps(view)
+            def inner(request, *args, **kwargs):
+                validated = _validate(request, validators, args, kwargs)
+                if validated is None:
+                    return view(request, *args, **kwargs)
+                if _not_modified(request, validated[0]):
+                    response = _not_modified_response(*validated)
+                else:
+                    response = view(request, *args, **kwargs)
+                return _finish(request, response, validated)
+
+        return inner
+
+    return decorator
@@ -0,0 +1,166 @@
+# core/connection_stats.py
+"""
+Database connection counters per worker process.
+
+``install()`` (run from CoreConfig.ready) wraps ``connect()`` and ``close()``
+of the configured database backends, so each process counts the connections
+it opened and closed and the time spent in ``connect()``: establishing a new
+connection, or waiting for a free one when PostgreSQL pooling is on. With
+persistent connections (``CONN_MAX_AGE``) opens per request fall well below 1.
+
+Counters are written as ``<pid>.json`` under ``DB_CONNECTION_STATS_DIR``
+every ``PUBLISH_INTERVAL`` seconds of traffic and when the process exits;
+``collect()`` reads them back for ``manage.py db_connections`` and
+``manage.py benchmark_db_connections``. Files rather than the cache, so the
+numbers of every worker are visible whichever cache backend is configured.
+"""
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db.utils import load_backend
+
+PUBLISH_INTERVAL = 5
+
+_lock = threading.Lock()
+_counters = {'opened': 0, 'closed': 0, 'wait_seconds': 0.0, 'max_wait_seconds': 0.0, 'requests': 0}
+_started = time.time()
+_published = 0.0
+
+
+def _counted_connect(connect):
+    @wraps(connect)
+    def inner(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return connect(self, *args, **kwargs)
+        finally:
+            waited = time.perf_counter() - started
+            if self.connection is not None:
+                with _lock:
+                    _counters['opened'] += 1
+                    _counters['wait_seconds'] += waited
+                    _counters['max_wait_seconds'] = max(_counters['max_wait_seconds'], waited)
+
+    return inner
+
+
+def _counted_close(close):
+    @wraps(close)
+    def inner(self, *args, **kwargs):
+        was_open = self.connection is not None
+        try:
+            return close(self, *args, **kwargs)
+        finally:
+            if was_open and self.connection is None:
+                with _lock:
+                    _counters['closed'] += 1
+
+    return inner
+
+
+def install():
+    """Count the connections of every configured database backend in this process."""
+    for database in settings.DATABASES.values():
+        wrapper = load_backend(database['ENGINE']).DatabaseWrapper
+        if '_connection_stats' in wrapper.__dict__:
+            continue
+        wrapper.connect = _counted_connect(wrapper.connect)
+        wrapper.close = _counted_close(wrapper.close)
+        wrapper._connection_stats = True
+    request_finished.connect(_request_finished, dispatch_uid='connection_stats')
+    atexit.register(_exiting)
+
+
+def snapshot():
+    """This process's counters."""
+    with _lock:
+        return {**_counters, 'pid': os.getpid(), 'started': _started, 'updated': time.time()}
+
+
+def _directory():
+    return settings.DB_CONNECTION_STATS_DIR
+
+
+def publish():
+    """Write this process's counters to its file."""
+    global _published
+    _published = time.monotonic()
+    stats = snapshot()
+    try:
+        os.makedirs(_directory(), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=_directory(), prefix='.stats.')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(stats, f)
+        os.replace(tmp, os.path.join(_directory(), f"{stats['pid']}.json"))
+    except OSError:
+        # Instrumentation must never break a request
+        pass
+
+
+def _request_finished(sender, **kwargs):
+    with _lock:
+        _counters['requests'] += 1
+    if time.monotonic() - _published >= PUBLISH_INTERVAL:
+        publish()
+
+
+def _exiting():
+    # Management commands and shells serve no requests and leave no file
+    if _counters['requests']:
+        publish()
+
+
+def _running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def collect():
+    """Counters of every process that published, oldest first, each with ``running`` set."""
+    found = []
+    try:
+        names = os.listdir(_directory())
+    except FileNotFoundError:
+        return found
+    for name in names:
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(_directory(), name)) as f:
+                stats = json.load(f)
+        except (OSError, ValueError):
+            continue
+        stats['running'] = _running(stats['pid'])
+        found.append(stats)
+    return sorted(found, key=lambda stats: stats['started'])
+
+
+def clear():
+    """Remove the files of processes that are no longer running."""
+    for stats in collect():
+        if not stats['running']:
+            try:
+                os.remove(os.path.join(_directory(), f"{stats['pid']}.json"))
+            except FileNotFoundError:
+                pass
+
+
+def totals(processes):
+    """Summed counters of ``processes``, with opens per request and mean wait in milliseconds."""
+    summed = {key: sum(stats[key] for stats in processes) for key in ('opened', 'closed', 'wait_seconds', 'requests')}
+    summed['max_wait_seconds'] = max((stats['max_wait_seconds'] for stats in processes), default=0.0)
+    summed['opened_per_request'] = summed['opened'] / summed['requests'] if summed['requests'] else 0.0
+    summed['mean_wait_ms'] = summed['wait_seconds'] / summed['opened'] * 1000 if summed['opened'] else 0.0
+    return summed
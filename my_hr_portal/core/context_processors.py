@@ -0,0 +1,7 @@
+# core/context_processors.py
+from django.conf import settings
+
+
+def live_events(request):
+    """Whether pages should open the live status event stream (needs an ASGI server)."""
+    return {'event_stream_enabled': settings.EVENTS_STREAM_ENABLED}
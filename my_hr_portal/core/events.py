@@ -0,0 +1,187 @@
+# core/events.py
+"""
+Live status events over server-sent events (SSE).
+
+Sync code calls ``publish()`` with the channels an event concerns
+(``employee:<profile id>`` / ``employer:<profile id>``); every open
+``event_stream`` of a user subscribed to one of them receives it.
+
+Delivery is in-process: each connection is an ``asyncio.Queue`` registered
+with ``broker``. With ``EVENTS_REDIS_URL`` set, events go through a Redis
+pub/sub channel instead and every worker process delivers them to its own
+connections, so a status change made in one worker reaches users connected to
+another.
+
+The stream is an async generator and needs an ASGI server (``asgi.py``);
+under WSGI it would hold a worker for the lifetime of the connection.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+try:
+    import redis
+except ImportError:  # Redis fan-out is optional
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+KEEPALIVE_INTERVAL = 15
+QUEUE_SIZE = 100
+RECONNECT_DELAY = 5
+REDIS_CHANNEL = 'portal:events'
+
+
+def _put(queue, message):
+    try:
+        queue.put_nowait(message)
+    except asyncio.QueueFull:
+        pass  # a stalled client; it resyncs with a page load
+
+
+class Broker:
+    """In-process pub/sub from channel names to the queues of open streams."""
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channels):
+        subscription = (asyncio.get_running_loop(), asyncio.Queue(QUEUE_SIZE), tuple(channels))
+        with self._lock:
+            for channel in subscription[2]:
+                self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription[2]:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[channel]
+
+    def deliver(self, channels, message):
+        """Hand ``message`` to every subscriber of ``channels``; safe from any thread."""
+        with self._lock:
+            targets = {subscription for channel in channels for subscription in self._subscribers.get(channel, ())}
+        for loop, queue, _ in targets:
+            try:
+                loop.call_soon_threadsafe(_put, queue, message)
+            except RuntimeError:
+                pass  # the connection's event loop is already closed
+
+
+broker = Broker()
+
+
+class RedisFanout:
+    """Relays events between worker processes through one Redis channel."""
+
+    def __init__(self, url):
+        self.client = redis.Redis.from_url(url)
+        self._listener = None
+        self._lock = threading.Lock()
+
+    def publish(self, channels, message):
+        self.client.publish(REDIS_CHANNEL, json.dumps({'channels': list(channels), 'message': message}))
+
+    def ensure_listening(self):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name='events-redis', daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(REDIS_CHANNEL)
+                for item in pubsub.listen():
+                    payload = json.loads(item['data'])
+                    broker.deliver(payload['channels'], payload['message'])
+            except Exception:
+                logger.exception('Event fan-out listener lost its Redis connection')
+                time.sleep(RECONNECT_DELAY)
+
+
+_fanout = None
+_fanout_lock = threading.Lock()
+_warned_missing_client = False
+
+
+def _get_fanout():
+    global _fanout, _warned_missing_client
+    if not settings.EVENTS_REDIS_URL:
+        return None
+    if redis is None:
+        if not _warned_missing_client:
+            _warned_missing_client = True
+            logger.warning('EVENTS_REDIS_URL is set but the redis package is not installed; '
+                           'events reach only the connections of the worker that published them')
+        return None
+    with _fanout_lock:
+        if _fanout is None:
+            _fanout = RedisFanout(settings.EVENTS_REDIS_URL)
+    return _fanout
+
+
+def format_event(event, data):
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+def publish(channels, event, data):
+    """Send ``event`` with JSON-serialisable ``data`` to the users subscribed to ``channels``."""
+    channels = [channel for channel in channels if channel]
+    if not channels:
+        return
+    message = format_event(event, data)
+    fanout = _get_fanout()
+    if fanout is None:
+        broker.deliver(channels, message)
+        return
+    try:
+        fanout.publish(channels, message)
+    except Exception:
+        logger.exception('Could not publish event to Redis; delivering locally only')
+        broker.deliver(channels, message)
+
+
+def channel(role, profile_id):
+    return f'{role}:{profile_id}' if profile_id else None
+
+
+async def channels_for(user):
+    """The channels ``user`` listens on, one per profile they own."""
+    from employees.models import EmployeeProfile
+    from employers.models import EmployerProfile
+
+    channels = []
+    for role, model in (('employee', EmployeeProfile), ('employer', EmployerProfile)):
+        profile_id = await model.objects.filter(user=user).values_list('id', flat=True).afirst()
+        if profile_id:
+            channels.append(channel(role, profile_id))
+    return channels
+
+
+async def stream(channels):
+    """Async SSE body: events for ``channels`` plus a keepalive comment every few seconds."""
+    fanout = _get_fanout()
+    if fanout is not None:
+        fanout.ensure_listening()
+    subscription = broker.subscribe(channels)
+    queue = subscription[1]
+    try:
+        yield f'retry: {RECONNECT_DELAY * 1000}\n\n'
+        while True:
+            try:
+                yield await asyncio.wait_for(queue.get(), KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,69 @@
+# core/fragment_cache.py
+"""
+Version counters for per-user template fragments.
+
+Dashboard sections are cached with Django's ``{% cache %}`` tag, keyed by the
+profile, the language and a version token built from the counters of the data
+the section depends on. Each counter belongs to one profile and one kind of
+row (``applications``, ``assignments``, ...); ``core/signals.py`` bumps it when
+such a row of that profile is saved or deleted, so a changed section gets a new
+key and is rendered fresh on the next visit. Stale entries simply expire.
+
+Code that writes these rows with ``QuerySet.update()``/``bulk_create()`` must
+call ``bump()`` itself.
+"""
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+FRAGMENT_TIMEOUT = 60 * 60
+
+# Kinds of rows a dashboard fragment can depend on
+DEPENDENCIES = ('applications', 'assignments', 'documents', 'job_postings')
+
+
+def _key(role, profile_id, dependency):
+    return f'fragments:{role}:{profile_id}:{dependency}'
+
+
+def bump(role, profile_ids, dependency):
+    """Invalidate the ``dependency`` fragments of the given profiles once the transaction commits."""
+    keys = [_key(role, profile_id, dependency) for profile_id in set(profile_ids) if profile_id]
+    if keys:
+        transaction.on_commit(lambda: cache.set_many(dict.fromkeys(keys, time.time_ns()), None))
+
+
+def versions(role, profile_id, fragments, daily=()):
+    """
+    ``{fragment: version token}`` for ``fragments``, a mapping of fragment name
+    to the dependencies it renders. Fragments listed in ``daily`` also change
+    with the date (e.g. "active today" counts).
+    """
+    needed = {dependency for dependencies in fragments.values() for dependency in dependencies}
+    keys = {dependency: _key(role, profile_id, dependency) for dependency in needed}
+    found = cache.get_many(keys.values())
+
+    missing = {key: time.time_ns() for key in keys.values() if key not in found}
+    if missing:
+        # add() keeps a counter another worker set in the meantime
+        for key, value in missing.items():
+            cache.add(key, value, None)
+        found.update(cache.get_many(missing))
+
+    today = timezone.localdate().isoformat()
+    tokens = {}
+    for name, dependencies in fragments.items():
+        parts = [str(found.get(keys[dependency], 0)) for dependency in sorted(dependencies)]
+        if name in daily:
+            parts.append(today)
+        tokens[name] = '.'.join(parts)
+    return tokens
+
+
+def changed_at(role, profile_id, dependencies):
+    """When the ``dependencies`` rows of a profile last changed, from the same counters (see core/conditional.py)."""
+    token = versions(role, profile_id, {'changed': dependencies})['changed']
+    return datetime.fromtimestamp(max(int(part) for part in token.split('.')) / 1e9, dt_timezone.utc)
@@ -0,0 +1,172 @@
+# core/loadtest.py
+"""
+A small HTTP load generator for comparing app server setups.
+
+``run()`` keeps ``concurrency`` keep-alive connections busy with GET requests,
+round-robin over ``paths``, until ``requests`` have been sent, and reports
+throughput and latency percentiles. Threads are enough for this: the load
+generator only waits on sockets, and a benchmark against a local server
+should not need more than the standard library.
+
+``serve()`` starts gunicorn on a free local port for the duration of a
+``with`` block, so a command can measure several worker setups one after the
+other; ``tree_rss()`` is the resident memory of the server and its workers.
+``login_headers()`` and ``pages_for()`` give the requests of a logged-in user.
+"""
+import contextlib
+import http.client
+import itertools
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.urls import reverse
+
+from employers.models import JobPosting
+from . import worker_tuning
+
+STARTUP_TIMEOUT = 60
+
+
+class Result:
+    """Outcome of one ``run()``."""
+
+    def __init__(self, latencies, errors, elapsed):
+        self.latencies = sorted(latencies)
+        self.errors = errors
+        self.elapsed = elapsed
+
+    @property
+    def requests(self):
+        return len(self.latencies) + self.errors
+
+    @property
+    def throughput(self):
+        return len(self.latencies) / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, p):
+        """Latency in milliseconds below which ``p`` percent of the successful requests finished."""
+        if not self.latencies:
+            return 0.0
+        index = min(len(self.latencies) - 1, int(len(self.latencies) * p / 100))
+        return self.latencies[index] * 1000
+
+
+def run(host, port, paths, concurrency=10, requests=500, headers=None, timeout=30):
+    """GET ``paths`` from ``host:port`` ``requests`` times over ``concurrency`` connections."""
+    counter = itertools.count()
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker():
+        connection = http.client.HTTPConnection(host, port, timeout=timeout)
+        own_latencies = []
+        own_errors = 0
+        while (n := next(counter)) < requests:
+            started = time.perf_counter()
+            try:
+                connection.request('GET', paths[n % len(paths)], headers=headers or {})
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                own_errors += 1
+                connection.close()
+                connection = http.client.HTTPConnection(host, port, timeout=timeout)
+                continue
+            if response.status >= 300:
+                own_errors += 1
+            else:
+                own_latencies.append(time.perf_counter() - started)
+        connection.close()
+        with lock:
+            latencies.extend(own_latencies)
+            errors.append(own_errors)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return Result(latencies, sum(errors), time.perf_counter() - started)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _wait_for(port, process):
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with status {process.returncode}")
+        with contextlib.suppress(OSError), socket.create_connection(('127.0.0.1', port), timeout=1):
+            return
+        time.sleep(0.2)
+    raise RuntimeError(f"Server did not listen on port {port} within {STARTUP_TIMEOUT}s")
+
+
+@contextlib.contextmanager
+def serve(app, port, options=(), env=None):
+    """
+    Run ``gunicorn app`` on ``127.0.0.1:port`` with the extra command line
+    ``options`` and environment variables ``env``; yields the master process.
+    Started outside the project directory so gunicorn.conf.py (production
+    paths) is not picked up.
+    """
+    command = [
+        sys.executable, '-m', 'gunicorn', app,
+        '--bind', f'127.0.0.1:{port}',
+        '--chdir', str(settings.BASE_DIR),
+        '--log-level', 'warning',
+        *options,
+    ]
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', ''), **(env or {})}
+    with tempfile.TemporaryDirectory() as cwd:
+        process = subprocess.Popen(command, cwd=cwd, env=env)
+        try:
+            _wait_for(port, process)
+            yield process
+        finally:
+            process.send_signal(signal.SIGTERM)
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def tree_rss(pid):
+    """Resident bytes of ``pid`` and its children (Linux ``/proc``; 0 elsewhere)."""
+    return worker_tuning.rss(pid) + sum(worker_tuning.rss(child) for child in worker_tuning.children(pid))
+
+
+def login_headers(user):
+    """Headers carrying a logged-in session for ``user``, written directly so no password is needed."""
+    session = import_module(settings.SESSION_ENGINE).SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.save()
+    return {'Cookie': f'{settings.SESSION_COOKIE_NAME}={session.session_key}'}
+
+
+def pages_for(user):
+    """The read-heavy pages ``user`` would load: the employer lists, or job search, applications and a job."""
+    if user.user_type == 'EMPLOYER':
+        return [reverse('employers:applications_list'), reverse('employers:assignments_list')]
+    paths = [reverse('employees:job_search'), reverse('employees:my_applications')]
+    job = JobPosting.objects.filter(status='OPEN').order_by('-pk').first()
+    if job:
+        paths.append(reverse('employees:job_detail', args=[job.pk]))
+    return paths
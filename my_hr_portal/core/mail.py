@@ -0,0 +1,196 @@
+# core/mail.py
+"""
+Outbound email queue.
+
+With ``EMAIL_BACKEND = 'core.mail.QueuedEmailBackend'`` every ``send_mail()``,
+password reset and notification email is stored as an ``OutboundEmail`` row
+inside the request's transaction instead of being sent over a fresh SMTP
+connection. ``python manage.py send_queued_email`` drains the queue in batches
+through one connection of ``EMAIL_QUEUE_DELIVERY_BACKEND`` (SMTP in production;
+the console or file backend works as a local sink), at most
+``EMAIL_QUEUE_RATE_LIMIT`` messages per second, and retries failures with
+exponential backoff up to ``EMAIL_QUEUE_MAX_ATTEMPTS`` times. In production
+``hr-portal-email.service`` (or the Procfile's ``worker``) runs it with
+``--loop``; without it nothing is sent.
+"""
+import logging
+import time
+from datetime import timedelta
+from email import message_from_bytes
+from email.message import Message
+
+from django.conf import settings
+from django.core.mail import EmailMessage, EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import connection as db_connection, transaction
+from django.template import TemplateDoesNotExist
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+RETRY_BASE_DELAY = 60  # seconds; doubles with every failed attempt
+CLAIM_LEASE = 5 * 60  # seconds a claimed batch stays reserved, on top of its sending time
+
+
+def _outbound(message):
+    return OutboundEmail(
+        from_email=message.from_email,
+        recipients=message.recipients(),
+        subject=str(message.subject)[:255],
+        message=message.message().as_bytes(),
+    )
+
+
+def queue_messages(messages):
+    """Persist ``EmailMessage`` objects to the outbound queue; returns how many were queued."""
+    rows = [_outbound(message) for message in messages if message.recipients()]
+    OutboundEmail.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
+
+
+def queue_templated(template_name, recipients, context=None, from_email=None):
+    """
+    Queue one email per ``(address, extra_context)`` in ``recipients``, rendered
+    from ``<template_name>_subject.txt``, ``<template_name>.txt`` and, if it
+    exists, ``<template_name>.html``.
+    """
+    messages = []
+    for address, extra_context in recipients:
+        message_context = {**(context or {}), **extra_context}
+        subject = ' '.join(render_to_string(f'{template_name}_subject.txt', message_context).split())
+        message = EmailMultiAlternatives(
+            subject,
+            render_to_string(f'{template_name}.txt', message_context),
+            from_email or settings.DEFAULT_FROM_EMAIL,
+            [address],
+        )
+        try:
+            message.attach_alternative(render_to_string(f'{template_name}.html', message_context), 'text/html')
+        except TemplateDoesNotExist:
+            pass
+        messages.append(message)
+    return queue_messages(messages)
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Email backend that queues messages instead of sending them."""
+
+    def send_messages(self, email_messages):
+        return queue_messages(email_messages)
+
+
+class StoredMIMEMessage(Message):
+    """A parsed queued message that serializes like Django's ``SafeMIMEMessage``."""
+
+    def as_bytes(self, unixfrom=False, linesep='\n'):
+        # The SMTP backend asks for CRLF line endings; the stdlib signature takes a policy instead
+        return super().as_bytes(unixfrom, policy=self.policy.clone(linesep=linesep))
+
+
+class StoredEmailMessage(EmailMessage):
+    """Replays a queued MIME message through any Django email backend."""
+
+    def __init__(self, outbound):
+        super().__init__(from_email=outbound.from_email, to=outbound.recipients)
+        self.raw_message = bytes(outbound.message)
+
+    def message(self, *args, **kwargs):
+        return message_from_bytes(self.raw_message, _class=StoredMIMEMessage)
+
+
+def _claim(batch_size, lease):
+    """
+    Lease up to ``batch_size`` due messages in one short transaction: their
+    ``next_attempt_at`` moves to the end of the lease, so no other worker picks
+    them up, and a message this worker never reports on is retried after it.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        due = OutboundEmail.objects.filter(
+            status=OutboundEmail.Status.QUEUED,
+            next_attempt_at__lte=now,
+        ).order_by('next_attempt_at', 'id')
+        if db_connection.features.has_select_for_update_skip_locked:
+            # Several workers can drain the queue without claiming the same rows
+            due = due.select_for_update(skip_locked=True)
+        ids = list(due.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return []
+        leased_until = now + lease
+        OutboundEmail.objects.filter(
+            id__in=ids, status=OutboundEmail.Status.QUEUED, next_attempt_at__lte=now,
+        ).update(next_attempt_at=leased_until, updated_at=now)
+    # Only the rows this worker's update actually moved
+    return list(OutboundEmail.objects.filter(id__in=ids, next_attempt_at=leased_until).order_by('id'))
+
+
+RECORDED_FIELDS = ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at', 'updated_at']
+
+
+def _record_failure(outbound, error):
+    outbound.attempts += 1
+    outbound.last_error = f'{error.__class__.__name__}: {error}'
+    if outbound.attempts >= settings.EMAIL_QUEUE_MAX_ATTEMPTS:
+        outbound.status = OutboundEmail.Status.FAILED
+        logger.error('Giving up on email %s after %d attempts: %s', outbound.pk, outbound.attempts, outbound.last_error)
+    else:
+        outbound.next_attempt_at = timezone.now() + timedelta(seconds=RETRY_BASE_DELAY * 2 ** (outbound.attempts - 1))
+    outbound.save(update_fields=RECORDED_FIELDS)
+
+
+def _record_success(outbound):
+    outbound.attempts += 1
+    outbound.status = OutboundEmail.Status.SENT
+    outbound.sent_at = timezone.now()
+    outbound.last_error = ''
+    outbound.save(update_fields=RECORDED_FIELDS)
+
+
+def send_queued(batch_size=None, rate_limit=None):
+    """
+    Send one batch of due messages over a single delivery connection.
+    Returns ``(sent, failed)``.
+
+    Each outcome is saved (and committed) as soon as the message went out or
+    failed, so a crash or timeout mid-batch resends at most the message in
+    flight; the rest of the batch is retried when its lease runs out.
+    """
+    batch_size = batch_size or settings.EMAIL_QUEUE_BATCH_SIZE
+    rate_limit = settings.EMAIL_QUEUE_RATE_LIMIT if rate_limit is None else rate_limit
+    interval = 1 / rate_limit if rate_limit else 0
+    # Long enough for the whole batch at the rate limit
+    lease = timedelta(seconds=CLAIM_LEASE + batch_size * interval)
+    sent = failed = 0
+
+    batch = _claim(batch_size, lease)
+    if not batch:
+        return 0, 0
+    connection = get_connection(settings.EMAIL_QUEUE_DELIVERY_BACKEND)
+    try:
+        connection.open()
+    except Exception as error:
+        logger.exception('Could not open the email delivery connection')
+        for outbound in batch:
+            _record_failure(outbound, error)
+        return 0, len(batch)
+
+    try:
+        for outbound in batch:
+            started = time.monotonic()
+            try:
+                connection.send_messages([StoredEmailMessage(outbound)])
+            except Exception as error:
+                _record_failure(outbound, error)
+                failed += 1
+            else:
+                _record_success(outbound)
+                sent += 1
+            remaining = interval - (time.monotonic() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+    finally:
+        connection.close()
+    return sent, failed
@@ -0,0 +1,62 @@
+from importlib import import_module
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core import loadtest
+
+# name -> (application, gunicorn options besides --workers)
+SERVERS = {
+    'wsgi': ('my_hr_portal.wsgi:application', ['--worker-class', 'sync']),
+    'asgi': ('my_hr_portal.asgi:application', ['--worker-class', 'uvicorn.workers.UvicornWorker']),
+}
+
+
+class Command(BaseCommand):
+    help = 'Load-test the async views under sync WSGI workers and under uvicorn ASGI workers and compare them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('email', help='User to send the requests as (employee or employer)')
+        parser.add_argument('--server', action='append', choices=list(SERVERS),
+                            help='Only benchmark this server (repeatable; default: both)')
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--path', action='append', dest='paths',
+                            help='Request this path instead of the default pages (repeatable)')
+
+    def handle(self, *args, **options):
+        for module in ('gunicorn', 'uvicorn'):
+            try:
+                import_module(module)
+            except ImportError:
+                raise CommandError(f"{module} is not installed")
+        try:
+            user = get_user_model().objects.get(email=options['email'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email {options['email']}")
+
+        paths = options['paths'] or loadtest.pages_for(user)
+        headers = loadtest.login_headers(user)
+        self.stdout.write(f"{options['requests']} requests over {options['concurrency']} connections to:")
+        for path in paths:
+            self.stdout.write(f"  {path}")
+
+        self.stdout.write(f"{'server':<8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}{'RSS MB':>10}")
+        for name in options['server'] or SERVERS:
+            app, worker_options = SERVERS[name]
+            port = loadtest.free_port()
+            try:
+                with loadtest.serve(app, port, ['--workers', str(options['workers']), *worker_options]) as process:
+                    # One pass over the pages so every worker has imported and connected before timing
+                    loadtest.run('127.0.0.1', port, paths, options['workers'], len(paths) * options['workers'], headers)
+                    result = loadtest.run(
+                        '127.0.0.1', port, paths, options['concurrency'], options['requests'], headers,
+                    )
+                    rss = loadtest.tree_rss(process.pid)
+            except RuntimeError as e:
+                raise CommandError(f"{name}: {e}")
+            self.stdout.write(
+                f"{name:<8}{result.throughput:>10.1f}{result.percentile(50):>10.1f}{result.percentile(95):>10.1f}"
+                f"{result.percentile(99):>10.1f}{result.errors:>8}{rss / 2**20:>10.1f}"
+            )
@@ -0,0 +1,70 @@
+import tempfile
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from core import connection_stats, loadtest
+
+
+class Command(BaseCommand):
+    help = 'Load-test a new database connection per request against persistent (and pooled) connections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('email', help='User to send the requests as (employee or employer)')
+        parser.add_argument('--max-age', type=int, default=60, help='CONN_MAX_AGE of the persistent setup')
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--path', action='append', dest='paths',
+                            help='Request this path instead of the default pages (repeatable)')
+
+    def handle(self, *args, **options):
+        try:
+            import_module('gunicorn')
+        except ImportError:
+            raise CommandError("gunicorn is not installed")
+        try:
+            user = get_user_model().objects.get(email=options['email'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email {options['email']}")
+        paths = options['paths'] or loadtest.pages_for(user)
+        headers = loadtest.login_headers(user)
+
+        # name -> environment of the server
+        setups = {
+            'per-request': {'DATABASE_CONN_MAX_AGE': '0', 'DATABASE_POOL': '0'},
+            'persistent': {'DATABASE_CONN_MAX_AGE': str(options['max_age']), 'DATABASE_POOL': '0'},
+        }
+        if settings.DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+            setups['pool'] = {'DATABASE_POOL': '1'}
+        else:
+            self.stdout.write('Not PostgreSQL: the pooled setup is skipped.')
+
+        self.stdout.write(
+            f"{'setup':<12}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}"
+            f"{'opened':>8}{'open/req':>10}{'wait ms':>9}"
+        )
+        for name, env in setups.items():
+            with tempfile.TemporaryDirectory() as stats_dir:
+                port = loadtest.free_port()
+                server_env = {**env, 'DB_CONNECTION_STATS_DIR': stats_dir}
+                try:
+                    with loadtest.serve('my_hr_portal.wsgi:application', port,
+                                        ['--workers', str(options['workers'])], server_env):
+                        loadtest.run('127.0.0.1', port, paths, options['workers'], len(paths) * options['workers'], headers)
+                        result = loadtest.run(
+                            '127.0.0.1', port, paths, options['concurrency'], options['requests'], headers,
+                        )
+                except RuntimeError as e:
+                    raise CommandError(f"{name}: {e}")
+                # Workers write their final counters as they exit
+                with override_settings(DB_CONNECTION_STATS_DIR=stats_dir):
+                    summed = connection_stats.totals(connection_stats.collect())
+            self.stdout.write(
+                f"{name:<12}{result.throughput:>10.1f}{result.percentile(50):>10.1f}{result.percentile(95):>10.1f}"
+                f"{result.errors:>8}{summed['opened']:>8}{summed['opened_per_request']:>10.2f}"
+                f"{summed['mean_wait_ms']:>9.2f}"
+            )
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import connection_stats
+
+
+class Command(BaseCommand):
+    help = 'Show the database connections each app server worker opened and closed, and the time spent connecting'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Include workers that have exited')
+        parser.add_argument('--clear', action='store_true', help='Forget workers that have exited')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            connection_stats.clear()
+        processes = [stats for stats in connection_stats.collect() if options['all'] or stats['running']]
+        if not processes:
+            self.stdout.write('No worker has reported yet.')
+            return
+
+        now = time.time()
+        self.stdout.write(
+            f"{'pid':>8}{'requests':>10}{'opened':>8}{'closed':>8}{'open/req':>10}"
+            f"{'wait ms':>9}{'max ms':>8}{'age s':>8}  state"
+        )
+        for stats in processes:
+            summed = connection_stats.totals([stats])
+            self.stdout.write(
+                f"{stats['pid']:>8}{stats['requests']:>10}{stats['opened']:>8}{stats['closed']:>8}"
+                f"{summed['opened_per_request']:>10.2f}{summed['mean_wait_ms']:>9.2f}"
+                f"{stats['max_wait_seconds'] * 1000:>8.1f}{now - stats['updated']:>8.0f}"
+                f"  {'running' if stats['running'] else 'exited'}"
+            )
+        summed = connection_stats.totals(processes)
+        self.stdout.write(
+            f"{'total':>8}{summed['requests']:>10}{summed['opened']:>8}{summed['closed']:>8}"
+            f"{summed['opened_per_request']:>10.2f}{summed['mean_wait_ms']:>9.2f}"
+            f"{summed['max_wait_seconds'] * 1000:>8.1f}"
+        )
@@ -0,0 +1,80 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Libraries that should only load when PDF or image work happens
+HEAVY_MODULES = ('weasyprint', 'PIL')
+
+# Run in a fresh interpreter: what a gunicorn master does before forking
+# (settings, app registry, URLconf), then report time, memory and modules
+STARTUP = '''
+import json, os, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+elapsed = time.perf_counter() - started
+from core.worker_tuning import rss
+print(json.dumps({
+    "seconds": elapsed,
+    "rss": rss(os.getpid()),
+    "modules": len(sys.modules),
+    "heavy": [name for name in %r if name in sys.modules],
+}))
+''' % (HEAVY_MODULES,)
+
+
+class Command(BaseCommand):
+    help = 'Profile the imports of a cold app start and report the slowest modules and packages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=25, help='Modules and packages to list (default 25)')
+        parser.add_argument('--min-ms', type=float, default=1.0, help='Hide modules cheaper than this')
+
+    def handle(self, *args, **options):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', '')}
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if process.returncode:
+            raise CommandError(f"App start failed:\n{process.stderr[-2000:]}")
+        summary = json.loads(process.stdout.strip().splitlines()[-1])
+
+        modules = []
+        packages = defaultdict(int)
+        for line in process.stderr.splitlines():
+            # import time: self [us] | cumulative | imported package
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            name = name.strip()
+            modules.append((int(cumulative_us), int(self_us), name))
+            packages[name.split('.')[0]] += int(self_us)
+
+        self.stdout.write(
+            f"Cold start: {summary['seconds'] * 1000:.0f} ms, {summary['modules']} modules, "
+            f"{summary['rss'] / 2**20:.1f} MiB RSS"
+        )
+        self.stdout.write("\nSlowest modules (cumulative, including what they import):")
+        self.stdout.write(f"{'cumul ms':>10}{'self ms':>10}  module")
+        for cumulative_us, self_us, name in sorted(modules, reverse=True)[:options['top']]:
+            if cumulative_us / 1000 >= options['min_ms']:
+                self.stdout.write(f"{cumulative_us / 1000:>10.1f}{self_us / 1000:>10.1f}  {name}")
+        self.stdout.write("\nPackages by own import time:")
+        for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:options['top']]:
+            if self_us / 1000 >= options['min_ms']:
+                self.stdout.write(f"{self_us / 1000:>10.1f}  {package}")
+
+        if summary['heavy']:
+            self.stdout.write(self.style.WARNING(
+                f"\nLoaded at startup although only needed for PDFs/images: {', '.join(summary['heavy'])}"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"\nNot loaded at startup: {', '.join(HEAVY_MODULES)}"))
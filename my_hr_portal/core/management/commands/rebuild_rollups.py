@@ -0,0 +1,25 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import rollups
+from core.models import Rollup
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily and monthly reporting rollups from timesheets, payslips and invoices'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='Only recompute periods from this date on (YYYY-MM-DD)')
+        parser.add_argument('--scope', action='append', choices=Rollup.Scope.values,
+                            help='Only recompute this scope (repeatable; default: all)')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError(f"Invalid date: {options['since']}")
+        written = rollups.rebuild(since, options['scope'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} rollup rows"))
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.mail import send_queued
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued outbound email in batches over one connection per batch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Messages per batch (default: EMAIL_QUEUE_BATCH_SIZE)')
+        parser.add_argument('--rate-limit', type=float, help='Messages per second (default: EMAIL_QUEUE_RATE_LIMIT)')
+        parser.add_argument('--loop', action='store_true', help='Keep running and poll the queue')
+        parser.add_argument('--interval', type=float, default=5, help='Seconds between polls of an empty queue with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = send_queued(options['batch_size'], options['rate_limit'])
+            if sent or failed:
+                self.stdout.write(f"Sent {sent}, failed {failed}")
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS("Outbound email queue drained"))
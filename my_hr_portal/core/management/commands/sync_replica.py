@@ -0,0 +1,26 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.replicas import REPLICA
+
+
+class Command(BaseCommand):
+    help = "Copy the primary SQLite database into the local 'replica' database, as a replica catching up would"
+
+    def handle(self, *args, **options):
+        if REPLICA not in settings.DATABASES:
+            raise CommandError('No replica database is configured (set DATABASE_REPLICA_PATH).')
+        primary, replica = settings.DATABASES['default'], settings.DATABASES[REPLICA]
+        if not all(database['ENGINE'] == 'django.db.backends.sqlite3' for database in (primary, replica)):
+            raise CommandError('Only SQLite databases can be synced; a PostgreSQL replica follows the primary itself.')
+
+        source = sqlite3.connect(primary['NAME'])
+        target = sqlite3.connect(replica['NAME'])
+        try:
+            source.backup(target)
+        finally:
+            source.close()
+            target.close()
+        self.stdout.write(self.style.SUCCESS(f"Copied {primary['NAME']} to {replica['NAME']}"))
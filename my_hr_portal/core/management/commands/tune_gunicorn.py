@@ -0,0 +1,85 @@
+import os
+from importlib import import_module
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core import loadtest, worker_tuning
+
+
+class Command(BaseCommand):
+    help = 'Load-test gunicorn worker profiles on this host and recommend the one to run with'
+
+    def add_arguments(self, parser):
+        parser.add_argument('email', help='User to send the requests as (employee or employer)')
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--path', action='append', dest='paths',
+                            help='Request this path instead of the default pages (repeatable)')
+        parser.add_argument('--estimate-only', action='store_true',
+                            help='Only print the profile the startup tuner would choose, without a load test')
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options['email'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email {options['email']}")
+        paths = options['paths'] or loadtest.pages_for(user)
+        headers = loadtest.login_headers(user)
+
+        # This process has Django and every app imported, like a preloaded gunicorn master
+        worker_rss = worker_tuning.rss(os.getpid()) or worker_tuning.DEFAULT_WORKER_RSS
+        estimate = worker_tuning.choose(worker_tuning.available_memory(), worker_tuning.cpu_count(), worker_rss)
+        self.stdout.write(f"Startup tuner would choose: {estimate.describe()}")
+        if options['estimate_only']:
+            return
+        try:
+            import_module('gunicorn')
+        except ImportError:
+            raise CommandError("gunicorn is not installed")
+
+        available = worker_tuning.budget(estimate.memory)
+        results = []
+        self.stdout.write(f"{'workers':>8}{'threads':>8}{'req/s':>10}{'p95 ms':>10}{'errors':>8}{'RSS MB':>10}")
+        for workers, threads in self._candidates(estimate, worker_rss, available):
+            port = loadtest.free_port()
+            options_ = ['--preload', '--workers', str(workers), '--threads', str(threads)]
+            try:
+                with loadtest.serve('my_hr_portal.wsgi:application', port, options_) as process:
+                    loadtest.run('127.0.0.1', port, paths, workers, len(paths) * workers, headers)
+                    result = loadtest.run(
+                        '127.0.0.1', port, paths, options['concurrency'], options['requests'], headers,
+                    )
+                    rss = loadtest.tree_rss(process.pid)
+            except RuntimeError as e:
+                raise CommandError(str(e))
+            results.append((workers, threads, result, rss))
+            self.stdout.write(
+                f"{workers:>8}{threads:>8}{result.throughput:>10.1f}{result.percentile(95):>10.1f}"
+                f"{result.errors:>8}{rss / 2**20:>10.1f}"
+            )
+
+        fitting = [r for r in results if r[3] <= available and not r[2].errors] or results
+        best = max(r[2].throughput for r in fitting)
+        # Within 5% of the best, fewer processes leave more memory for everything else
+        workers, threads, result, rss = min(
+            (r for r in fitting if r[2].throughput >= best * 0.95), key=lambda r: (r[0], r[1]),
+        )
+        max_requests = worker_tuning.max_requests_for(available, rss)
+        self.stdout.write(self.style.SUCCESS(
+            f"Recommended: {workers} workers x {threads} threads, max_requests {max_requests} "
+            f"({result.throughput:.1f} req/s, {rss / 2**20:.0f} MB)"
+        ))
+        self.stdout.write("To pin it, add to hr-portal.service:")
+        for name, value in (('WORKERS', workers), ('THREADS', threads), ('MAX_REQUESTS', max_requests)):
+            self.stdout.write(f"  Environment=GUNICORN_{name}={value}")
+
+    def _candidates(self, estimate, worker_rss, available):
+        """The tuner's own choice plus sync and threaded neighbours that are expected to fit in memory."""
+        counts = {1, max(1, estimate.workers // 2), estimate.workers, 2 * estimate.cpus + 1}
+        candidates = {(estimate.workers, estimate.threads)}
+        for workers in counts:
+            for threads in (1, 4):
+                if worker_tuning.footprint(worker_rss, workers, threads) <= available:
+                    candidates.add((workers, threads))
+        return sorted(candidates)
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-19 00:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_outboundemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Rollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('DAY', 'Day'), ('MONTH', 'Month')], max_length=5)),
+                ('period_start', models.DateField()),
+                ('scope', models.CharField(choices=[('EMPLOYER', 'Employer'), ('ASSIGNMENT', 'Assignment'), ('EOR_CLIENT', 'EOR Client')], max_length=10)),
+                ('scope_id', models.PositiveBigIntegerField()),
+                ('hours', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('overtime_hours', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('gross_pay', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('billed_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('headcount', models.PositiveIntegerField(default=0, help_text='Employees with approved hours')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['scope', 'scope_id', 'period', 'period_start'],
+                'constraints': [models.UniqueConstraint(fields=('scope', 'scope_id', 'period', 'period_start'), name='unique_rollup')],
+            },
+        ),
+    ]
@@ -237,4 +237,60 @@ class Notification(TimeStampedModel):
         ordering = ['-created_at']
 
     def __str__(self):
-        return f"{self.get_notification_type_display()} for {self.recipient}"
\ No newline at end of file
+        return f"{self.get_notification_type_display()} for {self.recipient}"
+
+class OutboundEmail(TimeStampedModel):
+    """An email waiting in (or sent from) the outbound queue; see core/mail.py."""
+    class Status(models.TextChoices):
+        QUEUED = 'QUEUED', 'Queued'
+        SENT = 'SENT', 'Sent'
+        FAILED = 'FAILED', 'Failed'
+
+    from_email = models.CharField(max_length=255)
+    recipients = models.JSONField(help_text="Envelope recipients (to, cc and bcc)")
+    subject = models.CharField(max_length=255, blank=True)
+    message = models.BinaryField(help_text="The complete MIME message")
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['next_attempt_at', 'id']
+        indexes = [models.Index(fields=['status', 'next_attempt_at'])]
+
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.recipients)}"
+
+
+class Rollup(models.Model):
+    """Daily or monthly totals of one employer, assignment or EOR client; see core/rollups.py."""
+    class Period(models.TextChoices):
+        DAY = 'DAY', 'Day'
+        MONTH = 'MONTH', 'Month'
+
+    class Scope(models.TextChoices):
+        EMPLOYER = 'EMPLOYER', 'Employer'
+        ASSIGNMENT = 'ASSIGNMENT', 'Assignment'
+        EOR_CLIENT = 'EOR_CLIENT', 'EOR Client'
+
+    period = models.CharField(max_length=5, choices=Period.choices)
+    period_start = models.DateField()
+    scope = models.CharField(max_length=10, choices=Scope.choices)
+    scope_id = models.PositiveBigIntegerField()
+    hours = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    overtime_hours = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    gross_pay = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    billed_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    headcount = models.PositiveIntegerField(default=0, help_text="Employees with approved hours")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['scope', 'scope_id', 'period', 'period_start']
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'scope_id', 'period', 'period_start'], name='unique_rollup'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_scope_display()} {self.scope_id} {self.get_period_display()} {self.period_start}"
@@ -0,0 +1,118 @@
+# core/notifications.py
+"""
+Notification fan-out.
+
+``notify()`` queues a notification for any number of recipients on the current
+transaction and delivers it when the transaction commits: one ``bulk_create``
+for the ``Notification`` rows and one ``EMAIL_BACKEND`` connection for all the
+emails (with the outbound queue, one more ``bulk_create``; see ``core/mail.py``).
+Inside ``with batch():`` every ``notify()`` is collected into one delivery.
+Nothing is sent for a transaction that rolls back.
+
+Unread counts are cached per user and adjusted on delivery and on read, so
+pages can show the badge without a COUNT query.
+"""
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+UNREAD_TIMEOUT = 60 * 60 * 24
+
+_pending = threading.local()
+
+
+def _unread_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def notify(recipients, notification_type, message, subject=None):
+    """
+    Queue ``message`` for ``recipients`` (users; duplicates and ``None`` are
+    skipped). With ``subject`` the recipients that have an email address are
+    emailed as well. Delivery happens when the transaction commits.
+    """
+    item = (list(recipients), notification_type, message, subject)
+    queued = getattr(_pending, 'items', None)
+    if queued is not None:
+        queued.append(item)
+    else:
+        transaction.on_commit(lambda: deliver([item]))
+
+
+@contextmanager
+def batch():
+    """Collect every ``notify()`` inside the block into a single delivery."""
+    if getattr(_pending, 'items', None) is not None:
+        yield
+        return
+    items = _pending.items = []
+    try:
+        yield
+    finally:
+        _pending.items = None
+    if items:
+        transaction.on_commit(lambda: deliver(items))
+
+
+def deliver(items):
+    """Deliver ``[(recipients, notification_type, message, subject), ...]`` in bulk."""
+    notifications = []
+    emails = []
+    for recipients, notification_type, message, subject in items:
+        seen = set()
+        for user in recipients:
+            if user is None or user.pk in seen:
+                continue
+            seen.add(user.pk)
+            notifications.append(Notification(recipient=user, notification_type=notification_type, message=message))
+            if subject and user.email:
+                emails.append(EmailMessage(subject, message, settings.DEFAULT_FROM_EMAIL, [user.email]))
+    if not notifications:
+        return
+
+    Notification.objects.bulk_create(notifications, batch_size=500)
+    added = {}
+    for notification in notifications:
+        added[notification.recipient_id] = added.get(notification.recipient_id, 0) + 1
+    for user_id, count in added.items():
+        try:
+            cache.incr(_unread_key(user_id), count)
+        except ValueError:
+            pass  # not cached; the next read counts from the database
+
+    if emails:
+        try:
+            with get_connection() as connection:
+                connection.send_messages(emails)
+        except Exception:
+            logger.exception('Failed to send %d notification emails', len(emails))
+
+
+def unread_count(user):
+    """Number of unread notifications of ``user``, from the cache when possible."""
+    key = _unread_key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(recipient=user, is_read=False).count()
+        cache.add(key, count, UNREAD_TIMEOUT)
+    return count
+
+
+def mark_read(user, ids=None):
+    """Mark the notifications ``ids`` (default: all) of ``user`` as read."""
+    notifications = Notification.objects.filter(recipient=user, is_read=False)
+    if ids is not None:
+        notifications = notifications.filter(id__in=ids)
+    updated = notifications.update(is_read=True)
+    if updated:
+        transaction.on_commit(lambda: cache.delete(_unread_key(user.pk)))
+    return updated
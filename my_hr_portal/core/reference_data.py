@@ -0,0 +1,197 @@
+# core/reference_data.py
+"""
+Cached lookups for slowly-changing reference tables.
+
+Skills, professions, qualifications, addresses and contract templates are read
+on nearly every form render but change rarely. Each table's rows are cached as
+plain tuples at two levels:
+
+* in-process, so repeated renders in one worker cost no queries at all;
+* in the shared cache (Redis/DB cache in production), so a fresh worker loads
+  the table once per version instead of once per process.
+
+Every table has a version counter in the shared cache that ``core/signals.py``
+bumps on save/delete. Readers compare the in-process copy against that counter,
+so a write in one worker is seen by all workers on their next read. Code that
+writes with ``QuerySet.update()``/``bulk_create()`` must call ``invalidate()``.
+"""
+import threading
+import time
+
+from django import forms
+from django.core.cache import cache
+from django.forms.models import ModelChoiceIterator, ModelChoiceIteratorValue
+from django.urls import reverse
+
+from .models import Address, ContractTemplate, Profession, Qualification, Skill
+
+CACHE_TIMEOUT = 60 * 60 * 24
+
+# name -> (model, values_list fields); the first field is always the pk
+REFERENCE_TABLES = {
+    'skill': (Skill, ('id', 'name', 'category')),
+    'profession': (Profession, ('id', 'name')),
+    'qualification': (Qualification, ('id', 'name')),
+    'address': (Address, ('id', 'street_address', 'city', 'postal_code', 'country')),
+    'contract_template': (ContractTemplate, ('id', 'name', 'contract_type', 'is_active')),
+}
+
+MODEL_NAMES = {model: name for name, (model, _) in REFERENCE_TABLES.items()}
+
+_local = {}
+_lock = threading.Lock()
+# name -> (rows list it was built from, {pk: row})
+_indexes = {}
+
+
+def _version_key(name):
+    return f'refdata:{name}:version'
+
+
+def _rows_key(name, version):
+    return f'refdata:{name}:{version}'
+
+
+def invalidate(name):
+    """Publish a new version of table ``name``; all workers reload on next read."""
+    cache.set(_version_key(name), time.time_ns(), None)
+
+
+def _load(name):
+    model, fields = REFERENCE_TABLES[name]
+    return list(model.objects.order_by(*_ordering(name)).values_list(*fields))
+
+
+def _ordering(name):
+    if name == 'address':
+        return ('city', 'street_address', 'id')
+    return ('name', 'id')
+
+
+def rows(name):
+    """All rows of table ``name`` as tuples of its ``REFERENCE_TABLES`` fields."""
+    version = cache.get(_version_key(name))
+    if version is None:
+        version = time.time_ns()
+        cache.add(_version_key(name), version, None)
+        version = cache.get(_version_key(name), version)
+
+    local = _local.get(name)
+    if local is not None and local[0] == version:
+        return local[1]
+
+    with _lock:
+        data = cache.get(_rows_key(name, version))
+        if data is None:
+            data = _load(name)
+            cache.set(_rows_key(name, version), data, CACHE_TIMEOUT)
+        _local[name] = (version, data)
+    return data
+
+
+def by_pk(name):
+    """``{pk: row}`` of table ``name``, built once per loaded version of its rows."""
+    data = rows(name)
+    index = _indexes.get(name)
+    if index is None or index[0] is not data:
+        index = (data, {row[0]: row for row in data})
+        _indexes[name] = index
+    return index[1]
+
+
+def address_label(street_address, city, country):
+    """Same text as ``Address.__str__`` without instantiating the model."""
+    if street_address:
+        return f"{street_address}, {city}, {country}"
+    return f"{city}, {country}"
+
+
+def choices(name, active_only=False):
+    """``[(pk, label), ...]`` for select widgets; ``active_only`` applies to contract templates."""
+    if name == 'address':
+        return [(pk, address_label(street, city, country)) for pk, street, city, _, country in rows(name)]
+    if active_only:
+        return [(row[0], row[1]) for row in rows(name) if row[-1]]
+    return [(row[0], row[1]) for row in rows(name)]
+
+
+def active_contract_templates():
+    """Active contract templates as dicts with ``id``, ``name`` and ``contract_type``."""
+    return [
+        {'id': pk, 'name': name, 'contract_type': contract_type}
+        for pk, name, contract_type, is_active in rows('contract_template') if is_active
+    ]
+
+
+def names(name):
+    """Set of ``name`` values of a named table (skills, professions, ...)."""
+    return {row[1] for row in rows(name)}
+
+
+def search_addresses(query, limit=20):
+    """Addresses whose label contains every word of ``query`` (case-insensitive)."""
+    words = query.lower().split()
+    results = []
+    for pk, label in choices('address'):
+        text = label.lower()
+        if all(word in text for word in words):
+            results.append((pk, label))
+            if len(results) >= limit:
+                break
+    return results
+
+
+class CachedChoiceIterator(ModelChoiceIterator):
+    """Yields a model choice field's options from the reference cache."""
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for pk, label in self._choices():
+            yield (ModelChoiceIteratorValue(pk, None), label)
+
+    def _choices(self):
+        return choices(self.field.reference_name, self.field.reference_active_only)
+
+    def __len__(self):
+        return len(self._choices()) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(self._choices())
+
+
+class AutocompleteSelect(forms.Select):
+    """
+    A select that renders only its selected option (plus the empty label);
+    ``main.js`` loads matching options from ``data-autocomplete-url`` as the
+    user types, so big tables are never dumped into the page.
+    """
+
+    def optgroups(self, name, value, attrs=None):
+        selected = {str(v) for v in value if v not in (None, '')}
+        all_choices = self.choices
+        self.choices = [(key, label) for key, label in all_choices if key == '' or str(key) in selected]
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = all_choices
+
+
+def use_cached_choices(field, name, active_only=False):
+    """Render ``field`` (a ModelChoiceField/ModelMultipleChoiceField) from the cache."""
+    field.reference_name = name
+    field.reference_active_only = active_only
+    field.iterator = CachedChoiceIterator
+    field.widget.choices = field.choices
+    return field
+
+
+def use_autocomplete(field, name):
+    """Render ``field`` as an :class:`AutocompleteSelect` backed by the address autocomplete endpoint."""
+    widget = AutocompleteSelect(attrs={
+        **field.widget.attrs,
+        'data-autocomplete-url': reverse('core:address_autocomplete'),
+    })
+    widget.is_required = field.required
+    field.widget = widget
+    return use_cached_choices(field, name)
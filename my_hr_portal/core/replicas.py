@@ -0,0 +1,161 @@
+# core/replicas.py
+"""
+Read replica routing.
+
+When ``DATABASES`` has a ``replica`` alias, read-only pages (job search,
+dashboard statistics, reports, exports) read from it, and every write goes to
+the primary (``default``). Reads go to the replica only inside ``reading()``
+(a context manager, or ``@reads`` on a sync or async view); everything else
+reads from the primary as before.
+
+Replicas lag behind the primary, so a visitor must not read from one right
+after changing something. ``ReplicaMiddleware`` marks each request; a request
+that writes (or is not GET/HEAD) sends back a cookie that keeps the visitor on
+the primary for ``DATABASE_REPLICA_STICKY_SECONDS``, and reads that follow a
+write in the same request stay on the primary as well. Reads inside a
+transaction always use the primary, and ``reading(since=...)`` stays on the
+primary when the data was changed (by anyone) within that window.
+
+Without a replica alias the router sends everything to ``default``.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+REPLICA = 'replica'
+PIN_COOKIE = 'db_primary'
+
+_reading = ContextVar('replica_reading', default=False)
+_request = ContextVar('replica_request', default=None)
+
+
+class _Request:
+    """Routing state of one request, shared with the threads its ORM calls run in."""
+
+    def __init__(self, pinned):
+        self.pinned = pinned
+        self.wrote = False
+
+
+def configured():
+    return REPLICA in settings.DATABASES
+
+
+def sticky_window():
+    return timedelta(seconds=settings.DATABASE_REPLICA_STICKY_SECONDS)
+
+
+def read_alias():
+    """The database a read issued now would use."""
+    if not configured() or not _reading.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return DEFAULT_DB_ALIAS
+    state = _request.get()
+    if state is not None and (state.pinned or state.wrote):
+        return DEFAULT_DB_ALIAS
+    return REPLICA
+
+
+@contextmanager
+def reading(since=None):
+    """
+    Send reads inside the block to the replica, unless ``since`` (when the data
+    last changed) is recent enough that the replica may not have it yet.
+    """
+    if since is not None and timezone.now() - since < sticky_window():
+        yield
+        return
+    token = _reading.set(True)
+    try:
+        yield
+    finally:
+        _reading.reset(token)
+
+
+def reads(view):
+    """Run the decorated view (sync or async) inside ``reading()``."""
+    if iscoroutinefunction(view):
+
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            with reading():
+                return await view(request, *args, **kwargs)
+
+    else:
+
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            with reading():
+                return view(request, *args, **kwargs)
+
+    return inner
+
+
+class ReplicaRouter:
+    """Reads to ``read_alias()``, writes to the primary, migrations on the primary only."""
+
+    def db_for_read(self, model, **hints):
+        return read_alias()
+
+    def db_for_write(self, model, **hints):
+        state = _request.get()
+        if state is not None:
+            state.wrote = True
+        # Explicit, or Django would write an instance back where it was read from
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, REPLICA}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db == REPLICA:
+            return False
+        return None
+
+
+class ReplicaMiddleware:
+    """Tracks writes per request and keeps visitors who wrote on the primary for a while."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        state = _Request(PIN_COOKIE in request.COOKIES)
+        token = _request.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request.reset(token)
+        return self._pin(request, response, state)
+
+    async def __acall__(self, request):
+        state = _Request(PIN_COOKIE in request.COOKIES)
+        token = _request.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request.reset(token)
+        return self._pin(request, response, state)
+
+    def _pin(self, request, response, state):
+        if configured() and (state.wrote or request.method not in ('GET', 'HEAD', 'OPTIONS')):
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.DATABASE_REPLICA_STICKY_SECONDS,
+                secure=settings.SESSION_COOKIE_SECURE, httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,380 @@
+# core/rollups.py
+"""
+Reporting rollups.
+
+``Rollup`` rows hold the daily and monthly totals of every employer,
+assignment and EOR client: approved timesheet hours and overtime, the number
+of employees with approved hours, payslip gross pay (on the payslip's period
+end date) and invoiced amounts (on the issue date; employers and EOR clients
+only). An EOR client is credited with the work of its placed employees while
+the placement runs.
+
+Reports read a few hundred of these rows instead of scanning timesheets. They
+are kept current incrementally: saving a timesheet, payslip or invoice marks
+its day as stale (``touch_*()``, called from core/signals.py and by bulk
+updates; saving an EOR placement marks its whole span), and when the
+transaction commits only the stale day and month rows of the affected
+employers, assignments and clients are recomputed from the source tables. Inside ``with batch():`` every change is refreshed together.
+An edit that moves a row (a timesheet to another day or assignment, an
+invoice to another date or client, a placement's span) marks both where it
+was and where it is now: a ``pre_save`` receiver keeps the stored values
+(``remember()``) and ``touch_*()`` touches them too.
+``rebuild()`` (the ``rebuild_rollups`` command) recomputes everything.
+"""
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Max, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from employees.models import Payslip, Timesheet
+from employers.models import Assignment, EmployerProfile
+from eor_services.models import EORClientProfile, EORPlacement
+from .models import Invoice, Rollup
+
+logger = logging.getLogger(__name__)
+
+Period = Rollup.Period
+Scope = Rollup.Scope
+
+MEASURES = ('hours', 'overtime_hours', 'gross_pay', 'billed_amount', 'headcount')
+MONEY = DecimalField(max_digits=14, decimal_places=2)
+
+# From a timesheet or payslip to the scope it is counted in
+SCOPE_PATHS = {
+    Scope.ASSIGNMENT: 'assignment_id',
+    Scope.EMPLOYER: 'assignment__employer_id',
+    Scope.EOR_CLIENT: 'employee__eor_placements__eor_client_id',
+}
+
+# Invoice clients
+CLIENT_MODELS = {
+    Scope.EMPLOYER: EmployerProfile,
+    Scope.EOR_CLIENT: EORClientProfile,
+}
+
+# Report windows offered to users, in months
+REPORT_MONTHS = (12, 24, 36)
+DEFAULT_REPORT_MONTHS = 24
+
+# Fields that decide which rollup rows a row is counted in
+COUNTED_BY = {
+    'employees.Timesheet': ('assignment_id', 'employee_id', 'date'),
+    'employees.Payslip': ('assignment_id', 'employee_id', 'period_end_date'),
+    'core.Invoice': ('client_content_type_id', 'client_object_id', 'issue_date'),
+    'core.InvoiceLineItem': ('invoice_id',),
+    'eor_services.EORPlacement': ('eor_client_id', 'start_date', 'end_date'),
+}
+
+_pending = threading.local()
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def period_end(period, start):
+    if period == Period.DAY:
+        return start
+    return month_start(start + timedelta(days=31)) - timedelta(days=1)
+
+
+def _counted(scope, date_field):
+    """Condition for a timesheet or payslip to count towards ``scope`` on its ``date_field``."""
+    if scope != Scope.EOR_CLIENT:
+        return Q()
+    # Part of the same filter() as the scope path, so values() groups on the same placement join
+    return Q(employee__eor_placements__start_date__lte=F(date_field)) & (
+        Q(employee__eor_placements__end_date__isnull=True)
+        | Q(employee__eor_placements__end_date__gte=F(date_field))
+    )
+
+
+def _grouped(rows, path, date_field, period, ids, start, end, extra=Q(), **aggregates):
+    """``aggregates`` of ``rows`` per ``(scope id, period start)``."""
+    condition = Q(**{f'{path}__isnull': False}) & extra
+    if ids is not None:
+        condition &= Q(**{f'{path}__in': ids})
+    if start:
+        condition &= Q(**{f'{date_field}__gte': start})
+    if end:
+        condition &= Q(**{f'{date_field}__lte': end})
+    bucket = F(date_field) if period == Period.DAY else TruncMonth(date_field)
+    return (
+        rows.filter(condition)
+        .annotate(rollup_id=F(path), rollup_start=bucket)
+        .values('rollup_id', 'rollup_start')
+        .annotate(**aggregates)
+        .order_by()
+    )
+
+
+def compute(scope, period, ids=None, start=None, end=None):
+    """
+    Fresh totals of ``scope`` per ``period`` from the source tables, as
+    ``{(scope_id, period_start): {measure: value}}``, optionally limited to
+    the scope ``ids`` and to periods between ``start`` and ``end``.
+    """
+    path = SCOPE_PATHS[scope]
+    totals = defaultdict(dict)
+
+    worked = _grouped(
+        Timesheet.objects.filter(status='APPROVED'), path, 'date', period, ids, start, end, _counted(scope, 'date'),
+        hours=Sum('hours_worked'),
+        overtime_hours=Sum('overtime_hours'),
+        headcount=Count('employee_id', distinct=True),
+    )
+    for row in worked:
+        totals[row.pop('rollup_id'), row.pop('rollup_start')].update(row)
+
+    paid = _grouped(
+        Payslip.objects.all(), path, 'period_end_date', period, ids, start, end, _counted(scope, 'period_end_date'),
+        gross_pay=Sum('gross_salary'),
+    )
+    for row in paid:
+        totals[row['rollup_id'], row['rollup_start']]['gross_pay'] = row['gross_pay']
+
+    if scope in CLIENT_MODELS:
+        invoices = Invoice.objects.filter(
+            client_content_type=ContentType.objects.get_for_model(CLIENT_MODELS[scope]),
+        ).exclude(status=Invoice.InvoiceStatus.CANCELED)
+        billed = _grouped(
+            invoices, 'client_object_id', 'issue_date', period, ids, start, end,
+            billed_amount=Sum(F('line_items__quantity') * F('line_items__unit_price'), output_field=MONEY),
+        )
+        for row in billed:
+            if row['billed_amount']:
+                totals[row['rollup_id'], row['rollup_start']]['billed_amount'] = row['billed_amount']
+    return totals
+
+
+def _rollup(scope, period, key, values):
+    scope_id, start = key
+    return Rollup(scope=scope, period=period, scope_id=scope_id, period_start=start, **values)
+
+
+def _replace(scope, period, ids, start, end, starts=None):
+    """Recompute the ``period`` rows of ``ids`` from ``start`` to ``end`` (or only those beginning on ``starts``)."""
+    totals = compute(scope, period, ids, start, end)
+    fresh = [_rollup(scope, period, key, values) for key, values in totals.items() if starts is None or key[1] in starts]
+    Rollup.objects.bulk_create(
+        fresh, batch_size=1000, update_conflicts=True,
+        unique_fields=['scope', 'scope_id', 'period', 'period_start'], update_fields=[*MEASURES, 'updated_at'],
+    )
+    # Rows that no longer have anything to count
+    existing = Rollup.objects.filter(scope=scope, period=period, scope_id__in=ids, period_start__gte=start)
+    if end:
+        existing = existing.filter(period_start__lte=end)
+    if starts is not None:
+        existing = existing.filter(period_start__in=starts)
+    emptied = [pk for pk, scope_id, period_start in existing.values_list('id', 'scope_id', 'period_start')
+               if (scope_id, period_start) not in totals]
+    if emptied:
+        Rollup.objects.filter(id__in=emptied).delete()
+
+
+def refresh(keys, spans=()):
+    """
+    Recompute the day and month rows of ``{(scope, scope_id, day), ...}``, and
+    all of them between ``start`` and ``end`` (open-ended when ``None``) for
+    ``{(scope, scope_id, start, end), ...}``.
+    """
+    wanted = defaultdict(set)
+    for scope, scope_id, day in keys:
+        wanted[scope, Period.DAY].add((scope_id, day))
+        wanted[scope, Period.MONTH].add((scope_id, month_start(day)))
+
+    with transaction.atomic():
+        for (scope, period), pairs in wanted.items():
+            ids = {scope_id for scope_id, _ in pairs}
+            starts = {start for _, start in pairs}
+            _replace(scope, period, ids, min(starts), period_end(period, max(starts)), starts)
+        for scope, scope_id, start, end in spans:
+            _replace(scope, Period.DAY, [scope_id], start, end)
+            _replace(scope, Period.MONTH, [scope_id], month_start(start), end and period_end(Period.MONTH, month_start(end)))
+
+
+def rebuild(since=None, scopes=None):
+    """Recompute every rollup (of ``scopes``, for periods from ``since`` on). Returns the rows written."""
+    written = 0
+    for scope in scopes or Scope.values:
+        for period in Period.values:
+            start = since and (month_start(since) if period == Period.MONTH else since)
+            with transaction.atomic():
+                existing = Rollup.objects.filter(scope=scope, period=period)
+                if start:
+                    existing = existing.filter(period_start__gte=start)
+                existing.delete()
+                rows = [_rollup(scope, period, key, values) for key, values in compute(scope, period, start=start).items()]
+                Rollup.objects.bulk_create(rows, batch_size=1000)
+            written += len(rows)
+    return written
+
+
+def _resolve(items):
+    """The ``(scope, scope_id, day)`` keys the touched ``items`` affect."""
+    keys = set()
+    work = [item[1:] for item in items if item[0] == 'work']
+    assignment_ids = {assignment_id for assignment_id, _, _ in work if assignment_id}
+    employers = dict(Assignment.objects.filter(id__in=assignment_ids).values_list('id', 'employer_id')) if assignment_ids else {}
+    placements = defaultdict(list)
+    employee_ids = {employee_id for _, employee_id, _ in work}
+    if employee_ids:
+        for employee_id, client_id, start, end in EORPlacement.objects.filter(employee_id__in=employee_ids).values_list(
+                'employee_id', 'eor_client_id', 'start_date', 'end_date'):
+            placements[employee_id].append((client_id, start, end))
+
+    for assignment_id, employee_id, day in work:
+        if assignment_id:
+            keys.add((Scope.ASSIGNMENT, assignment_id, day))
+            if employers.get(assignment_id):
+                keys.add((Scope.EMPLOYER, employers[assignment_id], day))
+        for client_id, start, end in placements[employee_id]:
+            if start <= day and (end is None or day <= end):
+                keys.add((Scope.EOR_CLIENT, client_id, day))
+
+    scopes = {ContentType.objects.get_for_model(model).pk: scope for scope, model in CLIENT_MODELS.items()}
+    for kind, content_type_id, client_id, day in items:
+        if kind == 'invoice' and content_type_id in scopes:
+            keys.add((scopes[content_type_id], client_id, day))
+    return keys
+
+
+def _flush(items):
+    spans = {(Scope.EOR_CLIENT, *item[1:]) for item in items if item[0] == 'placement'}
+    try:
+        refresh(_resolve(items), spans)
+    except Exception:
+        # The source rows are committed; rebuild_rollups repairs the totals
+        logger.exception('Failed to refresh rollups for %d changes', len(items))
+
+
+def _touch(items):
+    items = set(items)
+    if not items:
+        return
+    queued = getattr(_pending, 'items', None)
+    if queued is not None:
+        queued.update(items)
+    else:
+        transaction.on_commit(lambda: _flush(items))
+
+
+@contextmanager
+def batch():
+    """Refresh the rollups touched inside the block together when the transaction commits."""
+    if getattr(_pending, 'items', None) is not None:
+        yield
+        return
+    items = _pending.items = set()
+    try:
+        yield
+    finally:
+        _pending.items = None
+    if items:
+        transaction.on_commit(lambda: _flush(items))
+
+
+def remember(instance, update_fields=None):
+    """Before ``instance`` is saved (pre_save), keep the stored values of its ``COUNTED_BY`` fields if it moves."""
+    if instance._state.adding or instance.pk is None:
+        return
+    fields = COUNTED_BY[instance._meta.label]
+    if update_fields is not None:
+        names = {name for field in fields for name in (field, field.removesuffix('_id'))}
+        if not names & set(update_fields):
+            return
+    stored = type(instance)._base_manager.filter(pk=instance.pk).values(*fields).first()
+    if stored and any(stored[field] != getattr(instance, field) for field in fields):
+        instance._rollup_original = SimpleNamespace(**stored)
+
+
+def original(instance):
+    """The values ``remember()`` kept for ``instance`` (once), or ``None``."""
+    return instance.__dict__.pop('_rollup_original', None)
+
+
+def _with_originals(instances):
+    for instance in instances:
+        yield instance
+        before = original(instance)
+        if before is not None:
+            yield before
+
+
+def touch_timesheets(timesheets):
+    _touch(('work', timesheet.assignment_id, timesheet.employee_id, timesheet.date)
+           for timesheet in _with_originals(timesheets) if timesheet.date)
+
+
+def touch_payslips(payslips):
+    _touch(('work', payslip.assignment_id, payslip.employee_id, payslip.period_end_date)
+           for payslip in _with_originals(payslips) if payslip.period_end_date)
+
+
+def touch_invoices(invoices):
+    _touch(('invoice', invoice.client_content_type_id, invoice.client_object_id, invoice.issue_date)
+           for invoice in _with_originals(invoices) if invoice.issue_date)
+
+
+def touch_placements(placements):
+    """Placements decide which client is credited, so their whole span (before and after an edit) is recomputed."""
+    _touch(('placement', placement.eor_client_id, placement.start_date, placement.end_date)
+           for placement in _with_originals(placements) if placement.start_date)
+
+
+def report_months(value):
+    """The window of a ``?months=`` parameter; the default unless it is one of ``REPORT_MONTHS``."""
+    try:
+        months = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_REPORT_MONTHS
+    return months if months in REPORT_MONTHS else DEFAULT_REPORT_MONTHS
+
+
+def months_back(count, today=None):
+    """First days of the last ``count`` months up to ``today``'s, oldest first."""
+    starts = [month_start(today or timezone.localdate())]
+    while len(starts) < count:
+        starts.append(month_start(starts[-1] - timedelta(days=1)))
+    return starts[::-1]
+
+
+def monthly(scope, scope_id, months=24):
+    """Month rows of one employer, assignment or client for the last ``months`` months, empty months included."""
+    starts = months_back(months)
+    rows = {
+        row.period_start: row
+        for row in Rollup.objects.filter(scope=scope, scope_id=scope_id, period=Period.MONTH, period_start__gte=starts[0])
+    }
+    return [rows.get(start) or Rollup(scope=scope, scope_id=scope_id, period=Period.MONTH, period_start=start)
+            for start in starts]
+
+
+def per_scope(scope, ids, since):
+    """``{scope_id: {measure: total}}`` of month rows from ``since`` on; headcount is the monthly peak."""
+    rows = (
+        Rollup.objects.filter(scope=scope, scope_id__in=ids, period=Period.MONTH, period_start__gte=since)
+        .values('scope_id')
+        .annotate(
+            hours=Sum('hours'), overtime_hours=Sum('overtime_hours'), gross_pay=Sum('gross_pay'),
+            billed_amount=Sum('billed_amount'), headcount=Max('headcount'),
+        )
+        .order_by()
+    )
+    return {row.pop('scope_id'): row for row in rows}
+
+
+def totals(rows):
+    """Sums of ``rows`` (``Rollup`` objects); headcount is the peak."""
+    result = {measure: sum((getattr(row, measure) for row in rows), Decimal('0')) for measure in MEASURES}
+    result['headcount'] = max((row.headcount for row in rows), default=0)
+    return result
@@ -0,0 +1,47 @@
+# core/sessions/__init__.py
+"""
+Session stores that are only written when something actually changed.
+
+``SESSION_SAVE_EVERY_REQUEST`` rewrote every session on every page view. The
+stores in this package remember what they loaded and report ``has_changed()``
+only when the data or key really differs, and ``SessionMiddleware`` saves on a
+change or once per ``SESSION_REFRESH_INTERVAL`` to slide the expiry forward. A
+session therefore expires between ``SESSION_COOKIE_AGE - SESSION_REFRESH_INTERVAL``
+and ``SESSION_COOKIE_AGE`` after the last request that used it.
+
+Use ``core.sessions.cache`` or ``core.sessions.db`` as ``SESSION_ENGINE``. With
+``SESSION_ANONYMOUS_SIGNED_COOKIES`` anonymous visitors keep their session in a
+signed cookie and never touch the server store; it moves there on login.
+"""
+import time
+
+from django.conf import settings
+
+REFRESHED_KEY = '_session_refreshed'
+
+
+class ChangeTrackingMixin:
+    """Remembers the loaded data so unchanged sessions are not written back."""
+
+    _loaded_state = None
+
+    def load(self):
+        data = super().load()
+        self._loaded_state = (self.session_key, self._fingerprint(data))
+        return data
+
+    def _fingerprint(self, data):
+        return self.serializer().dumps(data)
+
+    def has_changed(self):
+        if not self.modified:
+            return False
+        if self._loaded_state is None:
+            return True
+        return self._loaded_state != (self.session_key, self._fingerprint(self._session))
+
+    def needs_refresh(self):
+        return time.time() - self.get(REFRESHED_KEY, 0) >= settings.SESSION_REFRESH_INTERVAL
+
+    def mark_refreshed(self):
+        self[REFRESHED_KEY] = int(time.time())
@@ -0,0 +1,8 @@
+# core/sessions/cache.py
+from django.contrib.sessions.backends import cache
+
+from . import ChangeTrackingMixin
+
+
+class SessionStore(ChangeTrackingMixin, cache.SessionStore):
+    pass
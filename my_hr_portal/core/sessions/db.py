@@ -0,0 +1,8 @@
+# core/sessions/db.py
+from django.contrib.sessions.backends import db
+
+from . import ChangeTrackingMixin
+
+
+class SessionStore(ChangeTrackingMixin, db.SessionStore):
+    pass
@@ -0,0 +1,100 @@
+# core/sessions/middleware.py
+import time
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.contrib.sessions.backends.base import UpdateError
+from django.contrib.sessions.exceptions import SessionInterrupted
+from django.contrib.sessions.middleware import SessionMiddleware as BaseSessionMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+
+from .signed_cookies import SessionStore as SignedCookieStore, is_signed_cookie
+
+# Browsers drop cookies over 4096 bytes; bigger anonymous sessions go server-side
+MAX_COOKIE_SESSION_SIZE = 4000
+
+
+class SessionMiddleware(BaseSessionMiddleware):
+    """
+    Drop-in replacement for Django's ``SessionMiddleware`` that saves a session
+    only when it changed or its expiry is due for a refresh, and keeps
+    anonymous sessions in a signed cookie when ``SESSION_ANONYMOUS_SIGNED_COOKIES``
+    is enabled.
+    """
+
+    def process_request(self, request):
+        session_key = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        if settings.SESSION_ANONYMOUS_SIGNED_COOKIES and (session_key is None or is_signed_cookie(session_key)):
+            request.session = SignedCookieStore(session_key)
+        else:
+            request.session = self.SessionStore(session_key)
+
+    def process_response(self, request, response):
+        try:
+            accessed = request.session.accessed
+            empty = request.session.is_empty()
+        except AttributeError:
+            return response
+
+        # Delete the cookie only if the session is entirely empty
+        if settings.SESSION_COOKIE_NAME in request.COOKIES and empty:
+            response.delete_cookie(
+                settings.SESSION_COOKIE_NAME,
+                path=settings.SESSION_COOKIE_PATH,
+                domain=settings.SESSION_COOKIE_DOMAIN,
+                samesite=settings.SESSION_COOKIE_SAMESITE,
+            )
+            patch_vary_headers(response, ('Cookie',))
+            return response
+
+        # A session nobody touched can neither have changed nor be refreshed
+        if not accessed or empty:
+            return response
+        patch_vary_headers(response, ('Cookie',))
+
+        # Skip session save for 5xx responses
+        if response.status_code >= 500:
+            return response
+
+        session = request.session
+        if not session.has_changed() and not session.needs_refresh():
+            return response
+        session.mark_refreshed()
+        if isinstance(session, SignedCookieStore) and self._needs_server_store(session):
+            session = request.session = self._to_server_store(session)
+
+        if session.get_expire_at_browser_close():
+            max_age = None
+            expires = None
+        else:
+            max_age = session.get_expiry_age()
+            expires = http_date(time.time() + max_age)
+        try:
+            session.save()
+        except UpdateError:
+            raise SessionInterrupted(
+                "The request's session was deleted before the "
+                "request completed. The user may have logged "
+                "out in a concurrent request, for example."
+            )
+        response.set_cookie(
+            settings.SESSION_COOKIE_NAME,
+            session.session_key,
+            max_age=max_age,
+            expires=expires,
+            domain=settings.SESSION_COOKIE_DOMAIN,
+            path=settings.SESSION_COOKIE_PATH,
+            secure=settings.SESSION_COOKIE_SECURE or None,
+            httponly=settings.SESSION_COOKIE_HTTPONLY or None,
+            samesite=settings.SESSION_COOKIE_SAMESITE,
+        )
+        return response
+
+    def _needs_server_store(self, session):
+        return SESSION_KEY in session or len(session._get_session_key()) > MAX_COOKIE_SESSION_SIZE
+
+    def _to_server_store(self, session):
+        server_session = self.SessionStore()
+        server_session.update(session._session)
+        return server_session
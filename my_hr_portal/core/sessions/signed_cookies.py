@@ -0,0 +1,13 @@
+# core/sessions/signed_cookies.py
+from django.contrib.sessions.backends import signed_cookies
+
+from . import ChangeTrackingMixin
+
+
+class SessionStore(ChangeTrackingMixin, signed_cookies.SessionStore):
+    pass
+
+
+def is_signed_cookie(session_key):
+    # Server-side keys are plain [a-z0-9]; signed payloads contain ':' separators
+    return session_key is not None and ':' in session_key
@@ -0,0 +1,179 @@
+# core/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from . import events, rollups
+from .fragment_cache import bump
+from .reference_data import MODEL_NAMES, invalidate
+
+
+def reference_data_changed(sender, **kwargs):
+    # Publish after commit so no worker caches the pre-commit rows under the new version
+    name = MODEL_NAMES[sender]
+    transaction.on_commit(lambda: invalidate(name))
+
+
+for model in MODEL_NAMES:
+    post_save.connect(reference_data_changed, sender=model, dispatch_uid=f'refdata-save-{model.__name__}')
+    post_delete.connect(reference_data_changed, sender=model, dispatch_uid=f'refdata-delete-{model.__name__}')
+
+
+def _employer_of(instance, field):
+    """``employer_id`` of the posting/assignment ``instance`` points to through ``field``."""
+    descriptor = instance._meta.get_field(field)
+    if descriptor.is_cached(instance):
+        related = getattr(instance, field)
+        return related.employer_id if related is not None else None
+    related_id = getattr(instance, descriptor.attname)
+    if related_id is None:
+        return None
+    # May already be gone when this runs inside a cascade delete
+    return descriptor.related_model.objects.filter(pk=related_id).values_list('employer_id', flat=True).first()
+
+
+def assignment_changed(sender, instance, **kwargs):
+    bump('employee', [instance.employee_id], 'assignments')
+    bump('employer', [instance.employer_id], 'assignments')
+
+
+def application_changed(sender, instance, **kwargs):
+    bump('employee', [instance.applicant_id], 'applications')
+    bump('employer', [_employer_of(instance, 'job_posting')], 'applications')
+
+
+def job_posting_changed(sender, instance, **kwargs):
+    bump('employer', [instance.employer_id], 'job_postings')
+
+
+def document_changed(sender, instance, **kwargs):
+    bump('employee', [instance.employee_id], 'documents')
+
+
+DASHBOARD_RECEIVERS = {
+    'employers.Assignment': assignment_changed,
+    'employers.Application': application_changed,
+    'employers.JobPosting': job_posting_changed,
+    'employees.Document': document_changed,
+}
+
+for label, receiver in DASHBOARD_RECEIVERS.items():
+    post_save.connect(receiver, sender=label, dispatch_uid=f'fragments-save-{label}')
+    post_delete.connect(receiver, sender=label, dispatch_uid=f'fragments-delete-{label}')
+
+
+def publish_statuses(kind, changes):
+    """
+    Publish a ``status`` event for every ``(instance, channels)`` in ``changes``
+    once the transaction commits. Bulk updates, which bypass ``post_save``, call
+    this directly.
+    """
+    messages = [
+        (list(channels), {
+            'model': kind,
+            'id': instance.pk,
+            'status': instance.status,
+            'status_display': instance.get_status_display(),
+        })
+        for instance, channels in changes
+    ]
+
+    def publish():
+        for channels, data in messages:
+            events.publish(channels, 'status', data)
+
+    transaction.on_commit(publish)
+
+
+def _publish_status(kind, instance, channels):
+    publish_statuses(kind, [(instance, channels)])
+
+
+def application_status_published(sender, instance, **kwargs):
+    _publish_status('application', instance, [
+        events.channel('employee', instance.applicant_id),
+        events.channel('employer', _employer_of(instance, 'job_posting')),
+    ])
+
+
+def assignment_status_published(sender, instance, **kwargs):
+    _publish_status('assignment', instance, [
+        events.channel('employee', instance.employee_id),
+        events.channel('employer', instance.employer_id),
+    ])
+
+
+def contract_status_published(sender, instance, **kwargs):
+    from employers.models import Assignment
+    employee_id = Assignment.objects.filter(employment_contract=instance).values_list('employee_id', flat=True).first()
+    _publish_status('contract', instance, [
+        events.channel('employee', employee_id),
+        events.channel('employer', instance.employer_profile_id),
+    ])
+
+
+def timesheet_status_published(sender, instance, **kwargs):
+    _publish_status('timesheet', instance, [
+        events.channel('employee', instance.employee_id),
+        events.channel('employer', _employer_of(instance, 'assignment')),
+    ])
+
+
+EVENT_PUBLISHERS = {
+    'employers.Application': application_status_published,
+    'employers.Assignment': assignment_status_published,
+    'core.Contract': contract_status_published,
+    'employees.Timesheet': timesheet_status_published,
+}
+
+for label, receiver in EVENT_PUBLISHERS.items():
+    post_save.connect(receiver, sender=label, dispatch_uid=f'events-save-{label}')
+
+
+def remember_rollup_position(sender, instance, raw=False, update_fields=None, **kwargs):
+    # An edit may move the row to another day, assignment or client; its old rows need a refresh too
+    if not raw:
+        rollups.remember(instance, update_fields)
+
+
+def timesheet_rollups(sender, instance, **kwargs):
+    rollups.touch_timesheets([instance])
+
+
+def payslip_rollups(sender, instance, **kwargs):
+    rollups.touch_payslips([instance])
+
+
+def invoice_rollups(sender, instance, **kwargs):
+    rollups.touch_invoices([instance])
+
+
+def invoice_line_item_rollups(sender, instance, **kwargs):
+    descriptor = instance._meta.get_field('invoice')
+    if descriptor.is_cached(instance):
+        invoices = [instance.invoice]
+    else:
+        # Gone already when this runs inside the invoice's cascade delete, which touches it itself
+        invoices = descriptor.related_model.objects.filter(pk=instance.invoice_id)
+    before = rollups.original(instance)
+    if before is not None and before.invoice_id != instance.invoice_id:
+        # Moved to another invoice: the one it left lost its amount
+        invoices = [*invoices, *descriptor.related_model.objects.filter(pk=before.invoice_id)]
+    rollups.touch_invoices(invoices)
+
+
+def placement_rollups(sender, instance, **kwargs):
+    rollups.touch_placements([instance])
+
+
+ROLLUP_RECEIVERS = {
+    'employees.Timesheet': timesheet_rollups,
+    'employees.Payslip': payslip_rollups,
+    'core.Invoice': invoice_rollups,
+    'core.InvoiceLineItem': invoice_line_item_rollups,
+    'eor_services.EORPlacement': placement_rollups,
+}
+
+for label, receiver in ROLLUP_RECEIVERS.items():
+    pre_save.connect(remember_rollup_position, sender=label, dispatch_uid=f'rollups-pre-save-{label}')
+    post_save.connect(receiver, sender=label, dispatch_uid=f'rollups-save-{label}')
+    post_delete.connect(receiver, sender=label, dispatch_uid=f'rollups-delete-{label}')
@@ -0,0 +1,37 @@
+from unittest import mock
+
+from django.core.mail import EmailMultiAlternatives
+from django.test import TestCase, override_settings
+
+from . import mail
+from .models import OutboundEmail
+
+
+@override_settings(
+    EMAIL_QUEUE_DELIVERY_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+    EMAIL_HOST='smtp.example.com',
+    EMAIL_PORT=25,
+    EMAIL_HOST_USER='',
+    EMAIL_HOST_PASSWORD='',
+    EMAIL_USE_TLS=False,
+    EMAIL_USE_SSL=False,
+)
+class SendQueuedOverSMTPTests(TestCase):
+    def setUp(self):
+        message = EmailMultiAlternatives('Password reset', 'Plain body', 'hr@example.com', ['user@example.com'])
+        message.attach_alternative('<p>HTML body</p>', 'text/html')
+        mail.queue_messages([message])
+
+    @mock.patch('django.core.mail.backends.smtp.smtplib.SMTP')
+    def test_queued_message_is_sent_with_crlf_line_endings(self, smtp):
+        self.assertEqual(mail.send_queued(rate_limit=0), (1, 0))
+
+        outbound = OutboundEmail.objects.get()
+        self.assertEqual(outbound.status, OutboundEmail.Status.SENT)
+        self.assertEqual(outbound.last_error, '')
+        from_email, recipients, payload = smtp.return_value.sendmail.call_args.args
+        self.assertEqual(from_email, 'hr@example.com')
+        self.assertEqual(recipients, ['user@example.com'])
+        self.assertIn(b'Subject: Password reset\r\n', payload)
+        self.assertIn(b'HTML body', payload)
+        self.assertNotIn(b'\n', payload.replace(b'\r\n', b''))
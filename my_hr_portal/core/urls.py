@@ -8,4 +8,8 @@ urlpatterns = [
     path('about/', views.about, name='about'),
     path('services/', views.services, name='services'),
     path('dashboard/', views.dashboard, name='dashboard'),
+    path('autocomplete/addresses/', views.address_autocomplete, name='address_autocomplete'),
+    path('notifications/unread-count/', views.notifications_unread_count, name='notifications_unread_count'),
+    path('notifications/mark-read/', views.notifications_mark_read, name='notifications_mark_read'),
+    path('events/', views.event_stream, name='event_stream'),
 ]
\ No newline at end of file
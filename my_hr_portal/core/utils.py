@@ -1,9 +1,12 @@
 from io import BytesIO
 from django.template.loader import render_to_string
-from weasyprint import HTML
 
 def generate_invoice_pdf(invoice):
     """Renders an invoice HTML template to a PDF file in memory."""
+    # weasyprint (with its font and layout stack) is imported on the first PDF,
+    # not when the app loads
+    from weasyprint import HTML
+
     context = {'invoice': invoice}
     html_string = render_to_string('invoicing/invoice_template.html', context)
     
@@ -1,5 +1,9 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_POST
+from . import events, notifications
+from .reference_data import search_addresses
 
 
 def home(request):
@@ -53,4 +57,45 @@ def dashboard(request):
         'user_type': request.user.user_type,
         'user_type_display': request.user.get_user_type_display(),
     }
-    return render(request, 'core/dashboard.html', context)
\ No newline at end of file
+    return render(request, 'core/dashboard.html', context)
+
+
+@login_required
+def address_autocomplete(request):
+    """Address options matching ``?q=`` for autocomplete selects, served from the reference cache"""
+    query = request.GET.get('q', '').strip()
+    results = search_addresses(query) if query else []
+    return JsonResponse({
+        'results': [{'id': pk, 'text': label} for pk, label in results]
+    })
+
+
+@login_required
+def notifications_unread_count(request):
+    """Unread notification count of the current user, from the cached counter"""
+    return JsonResponse({'unread': notifications.unread_count(request.user)})
+
+
+@login_required
+@require_POST
+def notifications_mark_read(request):
+    """Mark the current user's notifications as read (all, or the ``id`` values posted)"""
+    try:
+        ids = [int(value) for value in request.POST.getlist('id')] or None
+    except ValueError:
+        return JsonResponse({'error': 'id must be an integer'}, status=400)
+    notifications.mark_read(request.user, ids)
+    return JsonResponse({'unread': notifications.unread_count(request.user)})
+
+
+@login_required
+async def event_stream(request):
+    """Server-sent events with live status changes for the current user (serve via ASGI)"""
+    user = await request.auser()
+    response = StreamingHttpResponse(
+        events.stream(await events.channels_for(user)),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # stop nginx from buffering the stream
+    return response
@@ -0,0 +1,173 @@
+# core/worker_tuning.py
+"""
+Gunicorn worker profile for the host the server starts on.
+
+``gunicorn.conf.py`` calls ``apply()`` once the app is preloaded (and again on
+a HUP reload). It reads the memory the workers may use (``MemAvailable``,
+capped by a container's cgroup limit, minus ``RESERVED_MEMORY`` for nginx,
+Redis and the database), the CPUs the process may run on, and the RSS of the
+preloaded master, which is what every forked worker starts from. ``choose()``
+then picks:
+
+- sync workers, ``2 * CPUs + 1`` of them, when that many fit in memory;
+- otherwise as many workers as fit, with threads (gthread) making up the
+  concurrency, since the views mostly wait on the database;
+- ``max_requests`` lower the less headroom is left, so workers that grow are
+  recycled before the host starts swapping.
+
+Under ``GUNICORN_ASGI`` the uvicorn worker class is kept and only the worker
+count is tuned. ``GUNICORN_WORKERS``, ``GUNICORN_THREADS`` and
+``GUNICORN_MAX_REQUESTS`` override the individual choices. Only the standard
+library is used here, so this module does not need Django to be set up.
+"""
+import math
+import os
+
+MIB = 2**20
+
+# Memory left for everything else on the host
+RESERVED_MEMORY = int(os.environ.get('GUNICORN_RESERVED_MB', 256)) * MIB
+# Assumed worker RSS when the app is not preloaded and cannot be measured
+DEFAULT_WORKER_RSS = 150 * MIB
+# Workers grow past the preloaded size as they touch pages and fill caches
+WORKER_GROWTH = 1.5
+# Extra memory per gthread thread (stack, connection, request buffers)
+THREAD_RSS = 10 * MIB
+MAX_THREADS = 8
+
+ASGI_WORKER = 'uvicorn.workers.UvicornWorker'
+
+
+class Profile:
+    """Worker class and counts chosen for a host."""
+
+    def __init__(self, worker_class, workers, threads, max_requests, memory, cpus, worker_rss):
+        self.worker_class = worker_class
+        self.workers = workers
+        self.threads = threads
+        self.max_requests = max_requests
+        self.memory = memory
+        self.cpus = cpus
+        self.worker_rss = worker_rss
+
+    def describe(self):
+        threads = f" x {self.threads} threads" if self.threads > 1 else ''
+        return (
+            f"{self.worker_class}, {self.workers} workers{threads}, max_requests {self.max_requests} "
+            f"({self.memory / MIB:.0f} MiB available, {self.cpus} CPUs, {self.worker_rss / MIB:.0f} MiB per worker)"
+        )
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def rss(pid):
+    """Resident bytes of process ``pid`` (Linux ``/proc``; 0 elsewhere)."""
+    for line in (_read(f'/proc/{pid}/status') or '').splitlines():
+        if line.startswith('VmRSS:'):
+            return int(line.split()[1]) * 1024
+    return 0
+
+
+def children(pid):
+    return [int(child) for child in (_read(f'/proc/{pid}/task/{pid}/children') or '').split()]
+
+
+def available_memory():
+    """Bytes the workers may still use: ``MemAvailable``, capped by a cgroup v2 memory limit."""
+    available = None
+    for line in (_read('/proc/meminfo') or '').splitlines():
+        if line.startswith('MemAvailable:'):
+            available = int(line.split()[1]) * 1024
+    if available is None:
+        available = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_AVPHYS_PAGES')
+    limit = _read('/sys/fs/cgroup/memory.max')
+    current = _read('/sys/fs/cgroup/memory.current')
+    if limit and limit != 'max' and current:
+        available = min(available, int(limit) - int(current))
+    return max(available, 0)
+
+
+def cpu_count():
+    """CPUs this process may run on, capped by a cgroup v2 CPU quota."""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+    quota = (_read('/sys/fs/cgroup/cpu.max') or 'max').split()
+    if quota[0] != 'max':
+        cpus = min(cpus, math.ceil(int(quota[0]) / int(quota[1])))
+    return max(cpus, 1)
+
+
+def budget(memory):
+    return max(memory - RESERVED_MEMORY, 0)
+
+
+def footprint(worker_rss, workers, threads=1):
+    """Expected memory of ``workers`` grown workers with ``threads`` each."""
+    extra_threads = THREAD_RSS * (threads - 1) if threads > 1 else 0
+    return workers * (worker_rss * WORKER_GROWTH + extra_threads)
+
+
+def max_requests_for(available, used):
+    """Requests before a worker is recycled: fewer the closer ``used`` is to ``available``."""
+    headroom = available / used if used else math.inf
+    if headroom < 1.5:
+        return 500
+    if headroom < 3:
+        return 1000
+    return 2000
+
+
+def choose(memory, cpus, worker_rss, asgi=False):
+    """The ``Profile`` for ``memory`` bytes, ``cpus`` CPUs and workers starting at ``worker_rss`` bytes."""
+    available = budget(memory)
+    fit = max(1, int(available // footprint(worker_rss, 1)))
+    if asgi:
+        workers = min(cpus, fit)
+        worker_class, threads = ASGI_WORKER, 1
+    elif fit >= 2 * cpus + 1:
+        workers = 2 * cpus + 1
+        worker_class, threads = 'sync', 1
+    else:
+        # Memory-bound: fewer processes, each serving several requests at once
+        workers = fit
+        worker_class = 'gthread'
+        threads = min(MAX_THREADS, max(2, math.ceil((2 * cpus + 1) / workers)))
+        while workers > 1 and footprint(worker_rss, workers, threads) > available:
+            workers -= 1
+    max_requests = max_requests_for(available, footprint(worker_rss, workers, threads))
+    return Profile(worker_class, workers, threads, max_requests, memory, cpus, worker_rss)
+
+
+def tune(worker_rss, asgi=False, environ=os.environ):
+    """``choose()`` for this host, with the ``GUNICORN_*`` overrides from ``environ`` applied."""
+    profile = choose(available_memory(), cpu_count(), worker_rss, asgi)
+    if environ.get('GUNICORN_WORKERS'):
+        profile.workers = int(environ['GUNICORN_WORKERS'])
+    if environ.get('GUNICORN_THREADS') and not asgi:
+        profile.threads = int(environ['GUNICORN_THREADS'])
+        profile.worker_class = 'gthread' if profile.threads > 1 else 'sync'
+    if environ.get('GUNICORN_MAX_REQUESTS'):
+        profile.max_requests = int(environ['GUNICORN_MAX_REQUESTS'])
+    return profile
+
+
+def apply(server):
+    """Tune the gunicorn arbiter ``server`` before it spawns its workers and log the decision."""
+    cfg = server.cfg
+    asgi = cfg.worker_class_str == ASGI_WORKER
+    worker_rss = rss(os.getpid()) if cfg.preload_app else 0
+    profile = tune(worker_rss or DEFAULT_WORKER_RSS, asgi)
+    cfg.set('workers', profile.workers)
+    cfg.set('threads', profile.threads)
+    cfg.set('max_requests', profile.max_requests)
+    cfg.set('max_requests_jitter', profile.max_requests // 10)
+    cfg.set('worker_class', profile.worker_class)
+    server.worker_class = cfg.worker_class
+    server.num_workers = profile.workers
+    server.log.info("Worker profile: %s", profile.describe())
+    return profile
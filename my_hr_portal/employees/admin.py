@@ -1,23 +1,60 @@
+from datetime import timedelta
+
 from django.contrib import admin
-from .models import EmployeeProfile, WorkSchedule, Timesheet, Payslip
+from django.utils import timezone
+from .models import EmployeeProfile, ScheduleTemplate, WorkSchedule, Timesheet, Payslip
+from .schedules import materialize
+from core.admin import ReferenceDataAdminMixin
+from employers.admin import CsvImportAdminMixin
 
 
 @admin.register(EmployeeProfile)
-class EmployeeProfileAdmin(admin.ModelAdmin):
+class EmployeeProfileAdmin(CsvImportAdminMixin, ReferenceDataAdminMixin, admin.ModelAdmin):
+    import_kind = 'employees'
     list_display = ['full_name', 'nationality', 'current_status', 'expected_salary']
     list_filter = ['current_status', 'nationality']
     search_fields = ['first_name', 'last_name', 'user__email']
     filter_horizontal = ['preferred_professions', 'skills']
+    autocomplete_fields = ['address']
 
 
 @admin.register(WorkSchedule)
 class WorkScheduleAdmin(admin.ModelAdmin):
-    list_display = ['employee', 'date', 'start_time', 'end_time', 'status', 'total_hours']
+    list_display = ['employee', 'date', 'start_time', 'end_time', 'status', 'hours']
     list_filter = ['status', 'date']
     search_fields = ['employee__first_name', 'employee__last_name']
     date_hierarchy = 'date'
 
 
+@admin.register(ScheduleTemplate)
+class ScheduleTemplateAdmin(admin.ModelAdmin):
+    list_display = ['assignment', 'weekday', 'start_time', 'end_time', 'interval_weeks', 'valid_from', 'valid_until', 'is_active']
+    list_filter = ['is_active', 'weekday']
+    search_fields = ['assignment__employee__first_name', 'assignment__employee__last_name', 'assignment__employer__company_name']
+    list_select_related = ('assignment__employee', 'assignment__employer')
+    raw_id_fields = ['assignment']
+    exclude = ['created_by']
+    actions = ['materialize_next_four_weeks']
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.created_by = request.user
+        super().save_model(request, obj, form, change)
+
+    @admin.action(description="Create shifts for the next 4 weeks")
+    def materialize_next_four_weeks(self, request, queryset):
+        start = timezone.localdate()
+        created, conflicts = materialize(
+            queryset.filter(is_active=True).select_related('assignment__employee', 'assignment__employer', 'created_by'),
+            start,
+            start + timedelta(weeks=4, days=-1),
+        )
+        message = f"Created {created} shifts."
+        if conflicts:
+            message += f" Skipped {len(conflicts)} that would overlap existing shifts."
+        self.message_user(request, message)
+
+
 @admin.register(Timesheet)
 class TimesheetAdmin(admin.ModelAdmin):
     list_display = ['employee', 'date', 'hours_worked', 'overtime_hours', 'status', 'approved_by']
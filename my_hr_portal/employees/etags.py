@@ -0,0 +1,50 @@
+# employees/etags.py
+"""
+Validators for conditional GETs of employee pages (see core/conditional.py).
+
+Each reads the timestamps of everything its page shows in one query and
+returns them, or ``None`` when the view will not render the page (missing
+object), so the view answers as usual. Data shared by every page (all open
+postings) is covered by a cache version counter the signals move, never by
+scanning its table.
+"""
+from django.db.models import Subquery
+
+from core import fragment_cache
+from core.conditional import versions
+from employers import board
+from employers.models import JobPosting
+from .models import CV, EmployeeProfile, Payslip
+
+
+def job_detail(request, job_id):
+    """The posting with its employer and location, the open postings behind "similar jobs", and the viewer's application."""
+    row = JobPosting.objects.filter(pk=job_id, status='OPEN').annotate(
+        profile_id=Subquery(EmployeeProfile.objects.filter(user=request.user).values('pk')),
+    ).values_list(
+        'updated_at', 'employer__updated_at', 'employer__address__updated_at', 'location__updated_at', 'profile_id',
+    ).first()
+    if row is None:
+        return None
+    profile_id = row[-1]
+    # Applying and withdrawing bump the viewer's applications counter
+    applications = fragment_cache.changed_at('employee', profile_id, ['applications']) if profile_id else None
+    # Any posting that opens, closes or changes moves the board version (employers/board.py)
+    return [*row, applications, *versions(board.VERSION_KEY)]
+
+
+def payslip_detail(request, payslip_id):
+    """The payslip with its assignment and employer; the first view marks it viewed, so it always renders."""
+    return Payslip.objects.filter(
+        pk=payslip_id, employee__user=request.user, viewed_at__isnull=False,
+    ).values_list(
+        'updated_at', 'assignment__updated_at', 'assignment__employer__updated_at',
+        'assignment__employer__address__updated_at',
+    ).first()
+
+
+def cv_view(request):
+    """The CV and the profile and address it shows."""
+    return CV.objects.filter(employee__user=request.user).values_list(
+        'updated_at', 'employee__updated_at', 'employee__address__updated_at',
+    ).first()
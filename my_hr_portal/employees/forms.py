@@ -3,8 +3,10 @@ from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
 from .models import EmployeeProfile, Document, CV
 from core.models import Skill, Profession, Address
+from core import reference_data
 from employers.models import JobPosting, Application
 from employees.models import Timesheet,WorkSchedule
+from . import overlaps
 import datetime
 
 
@@ -76,7 +78,7 @@ class EmployeeProfileForm(forms.ModelForm):
         )
 
         # Create some default addresses if none exist
-        if not Address.objects.exists():
+        if not reference_data.rows('address'):
             Address.objects.create(
                 street_address='Main Street 1',
                 city='Vilnius',
@@ -94,6 +96,11 @@ class EmployeeProfileForm(forms.ModelForm):
         # Create some default professions and skills if they don't exist
         self._ensure_default_data()
 
+        # Render reference data from the cache; the address list can be large
+        reference_data.use_autocomplete(self.fields['address'], 'address')
+        reference_data.use_cached_choices(self.fields['preferred_professions'], 'profession')
+        reference_data.use_cached_choices(self.fields['skills'], 'skill')
+
         # Add help text
         self.fields['first_name'].help_text = _('Your first name as it appears on official documents')
         self.fields['last_name'].help_text = _('Your last name as it appears on official documents')
@@ -129,8 +136,10 @@ class EmployeeProfileForm(forms.ModelForm):
             'Financial Analyst', 'HR Specialist', 'Graphic Designer', 'Data Analyst'
         ]
 
+        existing = reference_data.names('profession')
         for prof_name in default_professions:
-            Profession.objects.get_or_create(name=prof_name)
+            if prof_name not in existing:
+                Profession.objects.get_or_create(name=prof_name)
 
         # Default skills
         default_skills = [
@@ -143,8 +152,10 @@ class EmployeeProfileForm(forms.ModelForm):
             ('Social Media', 'Digital'), ('Content Writing', 'Professional')
         ]
 
+        existing = reference_data.names('skill')
         for skill_name, category in default_skills:
-            Skill.objects.get_or_create(name=skill_name, defaults={'category': category})
+            if skill_name not in existing:
+                Skill.objects.get_or_create(name=skill_name, defaults={'category': category})
 
     def clean_date_of_birth(self):
         dob = self.cleaned_data.get('date_of_birth')
@@ -205,7 +216,30 @@ class WorkScheduleForm(forms.ModelForm):
             'start_time': forms.TimeInput(attrs={'type': 'time'}),
             'end_time': forms.TimeInput(attrs={'type': 'time'}),
         }
-        
+
+    def clean(self):
+        cleaned_data = super().clean()
+        employee = cleaned_data.get('employee')
+        day = cleaned_data.get('date')
+        start_time = cleaned_data.get('start_time')
+        end_time = cleaned_data.get('end_time')
+        if employee and day and start_time and end_time:
+            shift = WorkSchedule(
+                pk=self.instance.pk, employee=employee, date=day,
+                start_time=start_time, end_time=end_time, status=self.instance.status,
+            )
+            conflicts = overlaps.find_conflicts([shift])
+            if conflicts:
+                raise ValidationError(
+                    _('%(employee)s already has a shift that overlaps this one: %(shifts)s.'),
+                    params={
+                        'employee': employee.full_name,
+                        'shifts': ', '.join(overlaps.describe(other) for shift, other in conflicts),
+                    },
+                )
+        return cleaned_data
+
+
 class TimesheetForm(forms.ModelForm):
     class Meta:
         model = Timesheet
@@ -269,12 +303,11 @@ class JobSearchForm(forms.Form):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        # Import here to avoid circular imports
-        from core.models import Address
-
-        # Set querysets
+        # Set querysets (used for validation; options come from the reference cache)
         self.fields['location'].queryset = Address.objects.all().order_by('city')
         self.fields['skills'].queryset = Skill.objects.all().order_by('name')
+        reference_data.use_autocomplete(self.fields['location'], 'address')
+        reference_data.use_cached_choices(self.fields['skills'], 'skill')
 
 
 class JobApplicationForm(forms.ModelForm):
@@ -0,0 +1,85 @@
+# employees/hours.py
+"""
+Hours worked, summed in the database.
+
+A shift's hours are stored on ``WorkSchedule.hours`` when it is saved and a
+timesheet's total is ``hours_worked + overtime_hours``, so the totals for any
+date range are SQL aggregates. ``annotate_hours()`` adds them to a queryset of
+assignments, employees or employers as correlated subqueries: a whole list is
+annotated in one query, and shifts and timesheets are summed separately so
+neither multiplies the other's rows.
+"""
+from decimal import Decimal
+
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Timesheet, WorkSchedule
+
+HOURS = DecimalField(max_digits=12, decimal_places=2)
+ZERO = Value(Decimal('0.00'), output_field=HOURS)
+
+# Timesheet.total_hours in SQL
+TIMESHEET_TOTAL = ExpressionWrapper(F('hours_worked') + F('overtime_hours'), output_field=HOURS)
+
+# From a shift or timesheet to the model being annotated
+PATHS = {
+    'employers.assignment': 'assignment',
+    'employees.employeeprofile': 'employee',
+    'employers.employerprofile': 'assignment__employer',
+}
+
+
+def in_period(queryset, start=None, end=None):
+    """Rows of ``queryset`` dated between ``start`` and ``end`` (either may be open)."""
+    if start:
+        queryset = queryset.filter(date__gte=start)
+    if end:
+        queryset = queryset.filter(date__lte=end)
+    return queryset
+
+
+def _sum(rows, path, expression):
+    """``SUM(expression)`` over the ``rows`` whose ``path`` is the outer row; 0 when there are none."""
+    totals = (
+        rows.filter(**{path: OuterRef('pk')})
+        .order_by()
+        .values(path)
+        .annotate(total=Sum(expression, output_field=HOURS))
+        .values('total')
+    )
+    return Coalesce(Subquery(totals, output_field=HOURS), ZERO)
+
+
+def annotate_hours(queryset, start=None, end=None, timesheets=None):
+    """
+    Annotate assignments, employee profiles or employer profiles with their
+    hours between ``start`` and ``end``:
+
+    * ``scheduled_hours``: shifts that are not canceled
+    * ``completed_hours``: completed shifts
+    * ``worked_hours``, ``overtime_hours``, ``total_hours``: approved timesheets,
+      or the ``timesheets`` queryset given instead (e.g. the ones not invoiced yet)
+    """
+    path = PATHS[queryset.model._meta.label_lower]
+    schedules = in_period(WorkSchedule.objects.all(), start, end)
+    if timesheets is None:
+        timesheets = Timesheet.objects.filter(status='APPROVED')
+    timesheets = in_period(timesheets, start, end)
+    return queryset.annotate(
+        scheduled_hours=_sum(schedules.exclude(status='CANCELED'), path, 'hours'),
+        completed_hours=_sum(schedules.filter(status='COMPLETED'), path, 'hours'),
+        worked_hours=_sum(timesheets, path, 'hours_worked'),
+        overtime_hours=_sum(timesheets, path, 'overtime_hours'),
+    ).annotate(
+        total_hours=ExpressionWrapper(F('worked_hours') + F('overtime_hours'), output_field=HOURS),
+    )
+
+
+def timesheet_totals(timesheets):
+    """``{'worked', 'overtime', 'total'}`` hours of ``timesheets`` in one aggregate query."""
+    return timesheets.aggregate(
+        worked=Coalesce(Sum('hours_worked', output_field=HOURS), ZERO),
+        overtime=Coalesce(Sum('overtime_hours', output_field=HOURS), ZERO),
+        total=Coalesce(Sum(TIMESHEET_TOTAL), ZERO),
+    )
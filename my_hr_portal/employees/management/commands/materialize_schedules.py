@@ -0,0 +1,35 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from employees.overlaps import describe
+from employees.schedules import active_templates, materialize
+
+
+class Command(BaseCommand):
+    help = 'Create the work schedules that recurring schedule templates produce over the next weeks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--weeks', type=int, default=4, help='Number of weeks ahead to generate (default: 4)')
+        parser.add_argument('--start', help='First day to generate, YYYY-MM-DD (default: today)')
+        parser.add_argument('--assignment', type=int, action='append', help='Only this assignment (repeatable)')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many shifts would be created')
+
+    def handle(self, *args, **options):
+        start = timezone.localdate()
+        if options['start']:
+            start = date.fromisoformat(options['start'])
+        end = start + timedelta(weeks=options['weeks']) - timedelta(days=1)
+
+        templates = active_templates()
+        if options['assignment']:
+            templates = templates.filter(assignment_id__in=options['assignment'])
+
+        created, conflicts = materialize(templates, start, end, dry_run=options['dry_run'])
+        for shift, other in conflicts:
+            self.stdout.write(self.style.WARNING(
+                f"Skipped {shift.employee.full_name} {describe(shift)}: overlaps {describe(other)}"
+            ))
+        verb = 'Would create' if options['dry_run'] else 'Created'
+        self.stdout.write(self.style.SUCCESS(f"{verb} {created} shifts from {start} to {end}"))
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-19 00:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_initial'),
+        ('employees', '0004_remove_payslip_created_at_remove_payslip_updated_at_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employeeprofile',
+            index=models.Index(fields=['updated_at'], name='employees_e_updated_42d1c8_idx'),
+        ),
+    ]
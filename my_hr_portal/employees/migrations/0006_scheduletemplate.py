@@ -0,0 +1,53 @@
+# Generated by Django 5.2.6 on 2026-10-19 00:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0005_employeeprofile_employees_e_updated_42d1c8_idx'),
+        ('employers', '0008_split_application_notes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleTemplate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Creation Date')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Last Updated')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')])),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('break_duration_minutes', models.IntegerField(default=0)),
+                ('interval_weeks', models.PositiveSmallIntegerField(default=1, help_text='1 = every week, 2 = every other week, ...')),
+                ('valid_from', models.DateField(help_text='First week of the pattern')),
+                ('valid_until', models.DateField(blank=True, null=True)),
+                ('location', models.CharField(blank=True, max_length=255, null=True)),
+                ('job_position', models.CharField(blank=True, max_length=200, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedule_templates', to='employers.assignment')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_schedule_templates', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['assignment', 'weekday', 'start_time'],
+            },
+        ),
+        migrations.AddField(
+            model_name='workschedule',
+            name='template',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='shifts', to='employees.scheduletemplate'),
+        ),
+        migrations.AddIndex(
+            model_name='workschedule',
+            index=models.Index(fields=['employee', 'date'], name='employees_w_employe_82010c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workschedule',
+            index=models.Index(fields=['assignment', 'date'], name='employees_w_assignm_ec3cf3_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 00:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0006_scheduletemplate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workschedule',
+            name='hours',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=5),
+        ),
+    ]
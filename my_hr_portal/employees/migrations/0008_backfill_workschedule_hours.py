@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.db import migrations
+
+
+def shift_hours(start_time, end_time, break_minutes):
+    # Frozen copy of employees.models.shift_hours
+    day = datetime(2000, 1, 1)
+    start = datetime.combine(day, start_time)
+    end = datetime.combine(day, end_time)
+    if end <= start:
+        end += timedelta(days=1)
+    seconds = max((end - start - timedelta(minutes=break_minutes or 0)).total_seconds(), 0)
+    return (Decimal(int(seconds)) / 3600).quantize(Decimal('0.01'))
+
+
+def backfill_hours(apps, schema_editor):
+    WorkSchedule = apps.get_model('employees', 'WorkSchedule')
+    # Shifts repeat a handful of time patterns: one UPDATE per pattern
+    patterns = WorkSchedule.objects.values_list('start_time', 'end_time', 'break_duration_minutes').distinct()
+    for start_time, end_time, break_minutes in patterns.order_by():
+        WorkSchedule.objects.filter(
+            start_time=start_time, end_time=end_time, break_duration_minutes=break_minutes,
+        ).update(hours=shift_hours(start_time, end_time, break_minutes))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0007_workschedule_hours'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_hours, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-19 01:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_rollup'),
+        ('employees', '0009_payslip_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timesheet',
+            name='invoice',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='timesheets', to='core.invoice'),
+        ),
+    ]
@@ -1,3 +1,6 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
 from django.db import models
 from django.conf import settings
 from core.models import Skill, Profession, Address
@@ -24,6 +27,10 @@ class EmployeeProfile(TimeStampedModel):
     expected_salary = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
     current_status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='AVAILABLE')
 
+    class Meta:
+        # Incremental refresh of the matching index (employers/matching.py)
+        indexes = [models.Index(fields=['updated_at'])]
+
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
@@ -45,6 +52,58 @@ class Document(TimeStampedModel):
     description = models.CharField(max_length=255, blank=True)
 
 
+class ScheduleTemplate(TimeStampedModel):
+    """
+    A weekly recurring shift of an assignment. Calendars expand it into shifts
+    on the fly; ``materialize_schedules`` turns it into ``WorkSchedule`` rows
+    (see employees/schedules.py).
+    """
+    class Weekday(models.IntegerChoices):
+        MONDAY = 0, 'Monday'
+        TUESDAY = 1, 'Tuesday'
+        WEDNESDAY = 2, 'Wednesday'
+        THURSDAY = 3, 'Thursday'
+        FRIDAY = 4, 'Friday'
+        SATURDAY = 5, 'Saturday'
+        SUNDAY = 6, 'Sunday'
+
+    assignment = models.ForeignKey('employers.Assignment', on_delete=models.CASCADE, related_name='schedule_templates')
+    weekday = models.PositiveSmallIntegerField(choices=Weekday.choices)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    break_duration_minutes = models.IntegerField(default=0)
+    interval_weeks = models.PositiveSmallIntegerField(default=1, help_text="1 = every week, 2 = every other week, ...")
+    valid_from = models.DateField(help_text="First week of the pattern")
+    valid_until = models.DateField(blank=True, null=True)
+    location = models.CharField(max_length=255, blank=True, null=True)
+    job_position = models.CharField(max_length=200, blank=True, null=True)
+    is_active = models.BooleanField(default=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='created_schedule_templates'
+    )
+
+    class Meta:
+        ordering = ['assignment', 'weekday', 'start_time']
+
+    def __str__(self):
+        return f"{self.assignment} - {self.get_weekday_display()} {self.start_time:%H:%M}-{self.end_time:%H:%M}"
+
+
+def shift_hours(start_time, end_time, break_minutes=0):
+    """Hours of a shift, to the hundredth. An end time not after the start time is on the next day."""
+    day = datetime(2000, 1, 1)
+    start = datetime.combine(day, start_time)
+    end = datetime.combine(day, end_time)
+    if end <= start:
+        end += timedelta(days=1)
+    seconds = max((end - start - timedelta(minutes=break_minutes or 0)).total_seconds(), 0)
+    return (Decimal(int(seconds)) / 3600).quantize(Decimal('0.01'))
+
+
 class WorkSchedule(models.Model):
     STATUS_CHOICES = [
         ('PLANNED', 'Planned'),
@@ -67,6 +126,8 @@ class WorkSchedule(models.Model):
     end_time = models.TimeField()
     break_duration_minutes = models.IntegerField(default=0)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PLANNED')
+    # Stored so hours can be summed and sorted in SQL (employees/hours.py); set by save()
+    hours = models.DecimalField(max_digits=5, decimal_places=2, default=0, editable=False)
 
     # Additional fields
     location = models.CharField(max_length=255, blank=True, null=True)
@@ -79,21 +140,36 @@ class WorkSchedule(models.Model):
         blank=True,
         related_name='created_schedules'
     )
+    template = models.ForeignKey(
+        ScheduleTemplate,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='shifts'
+    )
 
     class Meta:
         unique_together = ['employee', 'assignment', 'date', 'start_time']
         ordering = ['-date', '-start_time']
+        # Calendar range queries (employees/schedules.py)
+        indexes = [
+            models.Index(fields=['employee', 'date']),
+            models.Index(fields=['assignment', 'date']),
+        ]
 
     def __str__(self):
         return f"{self.employee.full_name} - {self.assignment.employer.company_name} - {self.date}"
 
+    def save(self, *args, **kwargs):
+        self.hours = shift_hours(self.start_time, self.end_time, self.break_duration_minutes)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'hours' not in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'hours'}
+        super().save(*args, **kwargs)
+
     @property
     def total_hours(self):
-        from datetime import datetime, timedelta
-        start = datetime.combine(self.date, self.start_time)
-        end = datetime.combine(self.date, self.end_time)
-        total_time = end - start - timedelta(minutes=self.break_duration_minutes)
-        return total_time.total_seconds() / 3600
+        return shift_hours(self.start_time, self.end_time, self.break_duration_minutes)
 
     @property
     def employer(self):
@@ -134,6 +210,14 @@ class Timesheet(models.Model):
     rejection_reason = models.TextField(blank=True, null=True)
     notes = models.TextField(blank=True, null=True)
 
+    # Set when the approved hours are billed (employers/services.py), so they are billed once
+    invoice = models.ForeignKey(
+        'core.Invoice',
+        on_delete=models.SET_NULL,
+        blank=True, null=True,
+        related_name='timesheets'
+    )
+
     class Meta:
         unique_together = ['employee', 'assignment', 'date']
         ordering = ['-date']
@@ -199,6 +283,7 @@ class Payslip(models.Model):
     file = models.FileField(upload_to='payslips/%Y/%m/', blank=True, null=True)
     issue_date = models.DateField()
     viewed_at = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ['employee', 'assignment', 'period_start_date', 'period_end_date']
@@ -0,0 +1,120 @@
+# employees/overlaps.py
+"""
+Overlap detection for work schedules.
+
+An employee cannot work two shifts at once. ``find_conflicts()`` checks any
+number of new or changed shifts against each other and against the saved
+shifts in one pass. The saved shifts that could overlap are loaded with a
+single range query on the ``(employee, date)`` index into a ``ShiftIndex``,
+which keeps each employee's intervals sorted by start time and finds overlaps
+with a binary search. A shift whose end time is not after its start time runs
+past midnight.
+
+Canceled shifts never conflict.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+
+from .models import WorkSchedule
+
+# Longest possible shift; bounds how far back a search has to look
+MAX_SHIFT = timedelta(hours=24)
+
+IGNORED_STATUSES = ('CANCELED',)
+
+
+def interval(shift):
+    """``(start, end)`` datetimes of ``shift``."""
+    start = datetime.combine(shift.date, shift.start_time)
+    end = datetime.combine(shift.date, shift.end_time)
+    if end <= start:
+        end += timedelta(days=1)
+    return start, end
+
+
+class ShiftIndex:
+    """Per-employee shift intervals sorted by start time."""
+
+    def __init__(self):
+        self._starts = {}
+        self._entries = {}
+
+    @classmethod
+    def around(cls, shifts, exclude_ids=()):
+        """An index of the saved shifts that could overlap ``shifts`` (one query)."""
+        index = cls()
+        employee_ids = {shift.employee_id for shift in shifts}
+        if not employee_ids:
+            return index
+        days = [shift.date for shift in shifts]
+        saved = WorkSchedule.objects.filter(
+            employee_id__in=employee_ids,
+            # Overnight shifts reach into the next day
+            date__range=(min(days) - timedelta(days=1), max(days) + timedelta(days=1)),
+        ).exclude(status__in=IGNORED_STATUSES).only('id', 'employee_id', 'date', 'start_time', 'end_time')
+        exclude_ids = [pk for pk in exclude_ids if pk]
+        if exclude_ids:
+            saved = saved.exclude(id__in=exclude_ids)
+        for shift in saved:
+            index.add(shift)
+        return index
+
+    def add(self, shift):
+        start, end = interval(shift)
+        starts = self._starts.setdefault(shift.employee_id, [])
+        position = bisect_right(starts, start)
+        starts.insert(position, start)
+        self._entries.setdefault(shift.employee_id, []).insert(position, (start, end, shift))
+
+    def overlapping(self, shift):
+        """The indexed shifts of the same employee that overlap ``shift``."""
+        start, end = interval(shift)
+        starts = self._starts.get(shift.employee_id)
+        if not starts:
+            return []
+        entries = self._entries[shift.employee_id]
+        found = []
+        # Only shifts starting before this one ends, and after its start minus the longest shift, can overlap
+        for position in range(bisect_left(starts, end) - 1, bisect_left(starts, start - MAX_SHIFT) - 1, -1):
+            _, other_end, other = entries[position]
+            if other_end > start and other is not shift:
+                found.append(other)
+        return found
+
+
+def _scan(shifts, exclude_ids, keep_conflicting):
+    shifts = [shift for shift in shifts if shift.status not in IGNORED_STATUSES]
+    if exclude_ids is None:
+        exclude_ids = [shift.pk for shift in shifts]
+    index = ShiftIndex.around(shifts, exclude_ids)
+    accepted = []
+    conflicts = []
+    for shift in sorted(shifts, key=lambda shift: (shift.employee_id, shift.date, shift.start_time)):
+        others = index.overlapping(shift)
+        conflicts.extend((shift, other) for other in others)
+        if not others or keep_conflicting:
+            index.add(shift)
+            accepted.append(shift)
+    return accepted, conflicts
+
+
+def find_conflicts(shifts, exclude_ids=None):
+    """
+    Every overlap of ``shifts`` with each other or with saved shifts, as
+    ``[(shift, other), ...]``. Saved versions of ``shifts`` (and any
+    ``exclude_ids``) are not compared against.
+    """
+    return _scan(shifts, exclude_ids, keep_conflicting=True)[1]
+
+
+def without_conflicts(shifts, exclude_ids=None):
+    """
+    ``(accepted, conflicts)``: the ``shifts`` that can be added in date order
+    without overlapping a saved or an already accepted shift, and the
+    overlaps of the rest.
+    """
+    return _scan(shifts, exclude_ids, keep_conflicting=False)
+
+
+def describe(shift):
+    return f"{shift.date:%Y-%m-%d} {shift.start_time:%H:%M}-{shift.end_time:%H:%M}"
@@ -0,0 +1,184 @@
+# employees/schedules.py
+"""
+Recurring schedules and calendar ranges.
+
+A ``ScheduleTemplate`` describes one weekly shift of an assignment. It is not
+stored shift by shift: ``expand()`` produces the concrete (unsaved)
+``WorkSchedule`` objects for any date range, and the calendar endpoints merge
+them with the shifts that already exist, so a week or month is served by one
+range query on ``WorkSchedule`` plus one on the templates.
+
+``materialize()`` saves the expanded shifts with ``bulk_create`` (the
+``materialize_schedules`` command runs it for the coming weeks), so they can be
+edited, timesheeted and approved like any other shift. Shifts that would
+overlap another shift of the employee (see employees/overlaps.py) are skipped
+and reported.
+"""
+import calendar as calendar_module
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from employers.models import Assignment
+from . import overlaps
+from .models import ScheduleTemplate, WorkSchedule, shift_hours
+
+# Assignments whose templates still produce shifts
+SCHEDULED_ASSIGNMENT_STATUSES = (Assignment.AssignmentStatus.ACTIVE, Assignment.AssignmentStatus.PENDING_START)
+
+CALENDAR_VIEWS = ('week', 'month')
+
+
+def calendar_range(view='week', anchor=None):
+    """
+    ``(start, end)`` of the week (Monday to Sunday) or month containing
+    ``anchor`` (an ISO date string or ``date``; default today). Raises
+    ``ValueError`` for an unknown view or date.
+    """
+    if view not in CALENDAR_VIEWS:
+        raise ValueError(f'Unknown calendar view: {view}')
+    if not anchor:
+        anchor = timezone.localdate()
+    elif isinstance(anchor, str):
+        anchor = date.fromisoformat(anchor)
+    if view == 'week':
+        start = anchor - timedelta(days=anchor.weekday())
+        return start, start + timedelta(days=6)
+    last_day = calendar_module.monthrange(anchor.year, anchor.month)[1]
+    return anchor.replace(day=1), anchor.replace(day=last_day)
+
+
+def active_templates():
+    """Active templates of assignments that are running or about to start."""
+    return ScheduleTemplate.objects.filter(
+        is_active=True,
+        assignment__status__in=SCHEDULED_ASSIGNMENT_STATUSES,
+    ).select_related('assignment__employee', 'assignment__employer', 'created_by')
+
+
+def in_range(templates, start, end):
+    """The ``templates`` whose validity overlaps ``start``..``end``."""
+    return templates.filter(valid_from__lte=end).filter(Q(valid_until__isnull=True) | Q(valid_until__gte=start))
+
+
+def occurrences(template, start, end):
+    """Dates between ``start`` and ``end`` (inclusive) on which ``template`` has a shift."""
+    assignment = template.assignment
+    first_day = max(start, template.valid_from, assignment.start_date)
+    last_day = min(day for day in (end, template.valid_until, assignment.effective_end_date) if day is not None)
+    if first_day > last_day:
+        return
+
+    step = 7 * max(template.interval_weeks, 1)
+    # The pattern is anchored on the template's first week
+    current = template.valid_from + timedelta(days=(template.weekday - template.valid_from.weekday()) % 7)
+    if current < first_day:
+        current += timedelta(days=-(-(first_day - current).days // step) * step)
+    while current <= last_day:
+        yield current
+        current += timedelta(days=step)
+
+
+def expand(templates, start, end):
+    """Unsaved ``WorkSchedule`` objects for every occurrence of ``templates`` in the range."""
+    shifts = []
+    for template in templates:
+        assignment = template.assignment
+        for day in occurrences(template, start, end):
+            shifts.append(WorkSchedule(
+                employee=assignment.employee,
+                assignment=assignment,
+                template=template,
+                date=day,
+                start_time=template.start_time,
+                end_time=template.end_time,
+                break_duration_minutes=template.break_duration_minutes,
+                # bulk_create in materialize() does not call save()
+                hours=shift_hours(template.start_time, template.end_time, template.break_duration_minutes),
+                location=template.location,
+                job_position=template.job_position or assignment.position_title,
+                created_by=template.created_by,
+            ))
+    return shifts
+
+
+def _key(shift):
+    # Mirrors WorkSchedule's unique_together
+    return (shift.employee_id, shift.assignment_id, shift.date, shift.start_time)
+
+
+def calendar_shifts(schedules, templates, start, end):
+    """
+    Existing ``schedules`` in the range plus the not yet materialized shifts
+    of ``templates``, ordered by date and time.
+    """
+    existing = list(
+        schedules.filter(date__range=(start, end))
+        .select_related('employee', 'assignment__employer')
+        .defer('description')
+    )
+    taken = {_key(shift) for shift in existing}
+    planned = [shift for shift in expand(templates, start, end) if _key(shift) not in taken]
+    return sorted(existing + planned, key=lambda shift: (shift.date, shift.start_time, shift.employee_id))
+
+
+def serialize(shift):
+    assignment = shift.assignment
+    return {
+        'id': shift.pk,
+        'date': shift.date.isoformat(),
+        'start_time': shift.start_time.strftime('%H:%M'),
+        'end_time': shift.end_time.strftime('%H:%M'),
+        'break_duration_minutes': shift.break_duration_minutes,
+        'hours': float(shift.hours),
+        'status': shift.status,
+        'employee': {'id': shift.employee_id, 'name': shift.employee.full_name},
+        'assignment_id': shift.assignment_id,
+        'company_name': assignment.employer.company_name if assignment else None,
+        'location': shift.location,
+        'job_position': shift.job_position,
+        'template_id': shift.template_id,
+        # Expanded from a template but not saved yet
+        'planned': shift.pk is None,
+    }
+
+
+def calendar_payload(schedules, templates, view, anchor):
+    """JSON-ready calendar for ``view`` around ``anchor``; see ``calendar_range()``."""
+    start, end = calendar_range(view, anchor)
+    templates = in_range(templates, start, end)
+    return {
+        'view': view,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'shifts': [serialize(shift) for shift in calendar_shifts(schedules, templates, start, end)],
+    }
+
+
+def materialize(templates, start, end, dry_run=False):
+    """
+    Save the shifts ``templates`` produce between ``start`` and ``end``, skipping
+    the ones that already exist and the ones that would overlap another shift
+    of the employee. Returns ``(created, conflicts)``: the number of shifts
+    created (with ``dry_run``, that would be created) and the skipped overlaps
+    as ``[(shift, other), ...]``.
+    """
+    templates = list(in_range(templates, start, end))
+    shifts = expand(templates, start, end)
+    if not shifts:
+        return 0, []
+    assignment_ids = {template.assignment_id for template in templates}
+    taken = set(
+        WorkSchedule.objects.filter(assignment_id__in=assignment_ids, date__range=(start, end))
+        .values_list('employee_id', 'assignment_id', 'date', 'start_time')
+    )
+    shifts, conflicts = overlaps.without_conflicts([shift for shift in shifts if _key(shift) not in taken])
+    if dry_run or not shifts:
+        return len(shifts), conflicts
+
+    with transaction.atomic():
+        # ignore_conflicts covers shifts added concurrently since the check above
+        WorkSchedule.objects.bulk_create(shifts, batch_size=500, ignore_conflicts=True)
+    return len(shifts), conflicts
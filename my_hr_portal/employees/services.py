@@ -1,6 +1,6 @@
 # employees/services.py
-from django.db.models import Sum
 from datetime import date
+from .hours import timesheet_totals
 from .models import Timesheet, Payslip
 # Assume you have a PDF generation utility like in the invoice example
 from core.utils import generate_payslip_pdf 
@@ -25,12 +25,9 @@ def generate_payslip_for_employee(employee_profile, period_start, period_end):
         return None # No work, no payslip
 
     # 2. Calculate total hours
-    total_hours_data = approved_timesheets.aggregate(
-        total_regular=Sum('hours_worked'),
-        total_overtime=Sum('overtime_hours')
-    )
-    total_regular = total_hours_data['total_regular'] or 0
-    total_overtime = total_hours_data['total_overtime'] or 0
+    total_hours_data = timesheet_totals(approved_timesheets)
+    total_regular = total_hours_data['worked']
+    total_overtime = total_hours_data['overtime']
 
     # 3. Determine pay rates (this should come from the contract or assignment)
     REGULAR_RATE = 20.00 # Placeholder
@@ -0,0 +1,141 @@
+# employees/timesheets.py
+"""
+Timesheet approval queue.
+
+Managers see the pending timesheets they may decide on (staff: all of them;
+employers: those of their own assignments) ordered by employer, assignment and
+date, one keyset page at a time: a page is a single query however deep into
+the queue it is, and rows approved in the meantime do not shift the pages.
+
+``decide()`` approves or rejects any number of them with one ``UPDATE``,
+completes the linked work schedules with another and queues the employees'
+notifications as one delivery.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import groupby
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core import events, notifications, rollups, signals
+from employers.notifications import timesheet_status_changed
+from .models import Timesheet, WorkSchedule
+
+PAGE_SIZE = 100
+
+# Keyset order; the cursor holds these values of the last row of a page
+KEYSET = ('assignment__employer_id', 'assignment_id', 'date', 'id')
+
+
+def approval_queue(user):
+    """
+    Pending timesheets ``user`` may decide on. Timesheets without an
+    assignment have no employer to approve them and are left out.
+    """
+    timesheets = Timesheet.objects.filter(status='PENDING', assignment__isnull=False)
+    if not user.is_staff:
+        timesheets = timesheets.filter(assignment__employer__user=user)
+    return timesheets
+
+
+def cursor_for(timesheet):
+    return f'{timesheet.assignment.employer_id}.{timesheet.assignment_id}.{timesheet.date.isoformat()}.{timesheet.pk}'
+
+
+def _after(cursor):
+    """Rows after ``cursor`` in ``KEYSET`` order; raises ``ValueError`` for a malformed cursor."""
+    employer_id, assignment_id, day, pk = cursor.split('.')
+    employer_id, assignment_id, day, pk = int(employer_id), int(assignment_id), date.fromisoformat(day), int(pk)
+    same_employer = Q(assignment__employer_id=employer_id)
+    same_assignment = same_employer & Q(assignment_id=assignment_id)
+    return (
+        Q(assignment__employer_id__gt=employer_id)
+        | same_employer & Q(assignment_id__gt=assignment_id)
+        | same_assignment & Q(date__gt=day)
+        | same_assignment & Q(date=day, id__gt=pk)
+    )
+
+
+def page(queue, after=None, size=PAGE_SIZE):
+    """``(timesheets, next cursor or None)`` for the page of ``queue`` following the cursor ``after``."""
+    timesheets = queue.select_related('employee', 'assignment__employer', 'work_schedule').defer(
+        'notes', 'rejection_reason', 'employee__experience_summary',
+        'assignment__notes', 'assignment__termination_reason', 'work_schedule__description',
+    ).order_by(*KEYSET)
+    if after:
+        timesheets = timesheets.filter(_after(after))
+    rows = list(timesheets[:size + 1])
+    if len(rows) > size:
+        return rows[:size], cursor_for(rows[size - 1])
+    return rows, None
+
+
+def group(timesheets):
+    """
+    Nest a page by employer, assignment and week (Monday)::
+
+        [{'employer': ..., 'assignments': [{'assignment': ..., 'weeks': [
+            {'start': date, 'timesheets': [...], 'hours': Decimal}]}]}]
+    """
+    employers = []
+    for _, by_employer in groupby(timesheets, key=lambda timesheet: timesheet.assignment.employer_id):
+        by_employer = list(by_employer)
+        assignments = []
+        for _, by_assignment in groupby(by_employer, key=lambda timesheet: timesheet.assignment_id):
+            by_assignment = list(by_assignment)
+            weeks = []
+            for start, by_week in groupby(by_assignment, key=lambda timesheet: timesheet.date - timedelta(days=timesheet.date.weekday())):
+                by_week = list(by_week)
+                weeks.append({
+                    'start': start,
+                    'timesheets': by_week,
+                    'hours': sum((timesheet.total_hours for timesheet in by_week), Decimal('0')),
+                })
+            assignments.append({'assignment': by_assignment[0].assignment, 'weeks': weeks})
+        employers.append({'employer': by_employer[0].assignment.employer, 'assignments': assignments})
+    return employers
+
+
+def decide(queue, ids, approve, user, reason=''):
+    """
+    Approve (or reject, with ``reason``) the timesheets ``ids`` that are still
+    in ``queue``. Returns how many were decided.
+    """
+    with transaction.atomic():
+        selected = queue.filter(id__in=ids).select_related('employee__user', 'assignment').order_by('id')
+        if connection.features.has_select_for_update_of:
+            selected = selected.select_for_update(of=('self',))
+        else:
+            selected = selected.select_for_update()
+        timesheets = list(selected)
+        if not timesheets:
+            return 0
+
+        now = timezone.now()
+        if approve:
+            changes = {'status': 'APPROVED', 'approved_by': user, 'approval_date': now}
+        else:
+            changes = {'status': 'REJECTED', 'rejection_reason': reason or None}
+        Timesheet.objects.filter(id__in=[timesheet.pk for timesheet in timesheets]).update(**changes)
+
+        schedule_ids = [timesheet.work_schedule_id for timesheet in timesheets if timesheet.work_schedule_id]
+        if approve and schedule_ids:
+            WorkSchedule.objects.filter(id__in=schedule_ids).exclude(status='COMPLETED').update(status='COMPLETED')
+
+        for timesheet in timesheets:
+            for field, value in changes.items():
+                setattr(timesheet, field, value)
+        with notifications.batch():
+            for timesheet in timesheets:
+                timesheet_status_changed(timesheet)
+
+        # update() bypasses the post_save receivers in core/signals.py
+        rollups.touch_timesheets(timesheets)
+        signals.publish_statuses('timesheet', [
+            (timesheet, [events.channel('employee', timesheet.employee_id),
+                         events.channel('employer', timesheet.assignment.employer_id)])
+            for timesheet in timesheets
+        ])
+    return len(timesheets)
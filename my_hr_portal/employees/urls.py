@@ -20,8 +20,12 @@ urlpatterns = [
     path('payslips/', views.payslips_view, name='payslips'),
     path('payslips/<int:payslip_id>/', views.payslip_detail, name='payslip_detail'),
     path('schedules/', views.schedules_view, name='schedules'),
+    path('schedules/calendar/', views.schedule_calendar, name='schedule_calendar'),
     path('schedules/create/', views.WorkScheduleCreateView.as_view(), name='schedule_create'),
     path('schedules/<int:schedule_id>/timesheet/', views.submit_timesheet, name='submit_timesheet'),
+    path('timesheets/pending/', views.pending_timesheets, name='pending_timesheets'),
+    path('timesheets/pending/process/', views.bulk_process_timesheets, name='bulk_process_timesheets'),
+    path('timesheets/<int:timesheet_id>/<str:action>/', views.process_timesheet, name='process_timesheet'),
     path('assignments/', views.my_assignments, name='my_assignments'),
     path('assignments/<int:assignment_id>/', views.assignment_detail, name='assignment_detail'),
 ]
\ No newline at end of file
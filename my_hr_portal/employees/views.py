@@ -1,18 +1,29 @@
 
-from django.shortcuts import render, get_object_or_404, redirect
+import asyncio
+import os
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, get_object_or_404, redirect, aget_object_or_404
+from django.urls import reverse
+from django.utils.http import urlencode
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.decorators import user_passes_test
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse
 from django.core.paginator import Paginator
-from django.db.models import Q
+from django.db.models import Count, Q
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
 from .models import EmployeeProfile, Document, Payslip, WorkSchedule, Timesheet, CV
 from .forms import EmployeeProfileForm, JobSearchForm, JobApplicationForm, DocumentUploadForm, WorkScheduleForm, TimesheetForm, CVForm
 from employers.models import JobPosting, Application
+from employers.matching import recommend_jobs_for_employee
+from employers.similarity import similar_jobs_for
+from core import async_views, fragment_cache, replicas
+from core.conditional import conditional
+from . import etags, hours, schedules, timesheets
 from django.views.generic import CreateView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.views.generic import ListView
 from django.utils import timezone
 
 def is_employee(user):
@@ -29,6 +40,7 @@ def payslips_view(request):
 
 @login_required
 @user_passes_test(is_employee)
+@conditional(etags.payslip_detail)
 def payslip_detail(request, payslip_id):
     """View payslip details"""
     try:
@@ -64,36 +76,64 @@ class WorkScheduleCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView
 
 
 
+def is_timesheet_manager(user):
+    return user.is_authenticated and (user.is_staff or user.user_type == 'EMPLOYER')
+
+
 @login_required
+@user_passes_test(is_timesheet_manager)
 def process_timesheet(request, timesheet_id, action):
-    if not request.user.is_staff:
-        return redirect('dashboard') # Or show an error
+    """Approve or reject a single pending timesheet"""
+    if request.method == 'POST' and action in ('approve', 'reject'):
+        queue = timesheets.approval_queue(request.user)
+        get_object_or_404(queue, id=timesheet_id)
+        timesheets.decide(queue, [timesheet_id], action == 'approve', request.user, request.POST.get('reason', '').strip())
+    return redirect('employees:pending_timesheets')
 
-    timesheet = get_object_or_404(Timesheet, id=timesheet_id)
-    if request.method == 'POST':
-        if action == 'approve':
-            timesheet.status = 'APPROVED'
-            timesheet.approved_by = request.user
-            timesheet.approval_date = timezone.now()
-        elif action == 'reject':
-            timesheet.status = 'REJECTED'
 
-        timesheet.save()
-    return redirect('pending_timesheets')
+@login_required
+@user_passes_test(is_timesheet_manager)
+def pending_timesheets(request):
+    """Approval queue: pending timesheets grouped by employer, assignment and week, one keyset page at a time"""
+    after = request.GET.get('after')
+    try:
+        page, next_cursor = timesheets.page(timesheets.approval_queue(request.user), after)
+    except ValueError:
+        return redirect('employees:pending_timesheets')
 
+    context = {
+        'groups': timesheets.group(page),
+        'page_count': len(page),
+        'next_cursor': next_cursor,
+        'after': after,
+    }
+    return render(request, 'employees/pending_timesheets.html', context)
 
 
-class PendingTimesheetsView(LoginRequiredMixin, UserPassesTestMixin, ListView):
-    model = Timesheet
-    template_name = 'employees/pending_timesheets.html'
-    context_object_name = 'timesheets'
+@login_required
+@user_passes_test(is_timesheet_manager)
+def bulk_process_timesheets(request):
+    """Approve or reject the selected pending timesheets at once"""
+    if request.method != 'POST':
+        return redirect('employees:pending_timesheets')
+
+    action = request.POST.get('action')
+    ids = [int(pk) for pk in request.POST.getlist('timesheet_ids') if pk.isdigit()]
+    if action not in ('approve', 'reject') or not ids:
+        messages.error(request, 'Select timesheets and an action.')
+    else:
+        decided = timesheets.decide(
+            timesheets.approval_queue(request.user), ids, action == 'approve', request.user,
+            request.POST.get('reason', '').strip(),
+        )
+        verb = 'approved' if action == 'approve' else 'rejected'
+        messages.success(request, f'{decided} timesheet(s) {verb}.')
 
-    def get_queryset(self):
-        # Managers should only see timesheets for their employees
-        return Timesheet.objects.filter(status='PENDING').order_by('date')
+    after = request.POST.get('after')
+    if after:
+        return redirect(f"{reverse('employees:pending_timesheets')}?{urlencode({'after': after})}")
+    return redirect('employees:pending_timesheets')
 
-    def test_func(self):
-        return self.request.user.is_staff
 
 @login_required
 def submit_timesheet(request, schedule_id=None):
@@ -103,7 +143,7 @@ def submit_timesheet(request, schedule_id=None):
         schedule = get_object_or_404(WorkSchedule, id=schedule_id, employee__user=request.user)
         initial_data = {
             'date': schedule.date,
-            'hours_worked': round(schedule.total_hours, 2)
+            'hours_worked': schedule.hours
         }
 
     if request.method == 'POST':
@@ -140,85 +180,58 @@ def dashboard(request):
     from employers.models import Assignment
     today = timezone.now().date()
 
-    # Assignment queries with time-based filtering
+    # Assignment queries with time-based filtering (the dashboard shows their counts only)
     current_assignments = Assignment.objects.filter(
         employee=employee_profile,
         status=Assignment.AssignmentStatus.ACTIVE,
         start_date__lte=today
     ).exclude(
         actual_end_date__lt=today
-    ).select_related('employer', 'employment_contract')
-
-    future_assignments = Assignment.objects.filter(
-        employee=employee_profile,
-        status=Assignment.AssignmentStatus.PENDING_START,
-        start_date__gt=today
-    ).select_related('employer', 'employment_contract')
+    )
 
     past_assignments = Assignment.objects.filter(
         employee=employee_profile,
         status__in=[Assignment.AssignmentStatus.COMPLETED, Assignment.AssignmentStatus.TERMINATED]
-    ).select_related('employer', 'employment_contract')[:5]  # Latest 5
+    )[:5]  # Latest 5
 
-    # Check if CV is uploaded
-    cv_document = Document.objects.filter(
-        employee=employee_profile,
-        document_type=Document.DocumentType.CV
-    ).order_by('-created_at').first()
-
-    # Statistics
-    stats = {
+    # Statistics; evaluated only when the cached stats fragment is stale
+    stats = SimpleLazyObject(lambda: {
         'total_applications': employee_profile.applications.count(),
         'pending_applications': employee_profile.applications.filter(status='SUBMITTED').count(),
         'total_assignments': Assignment.objects.filter(employee=employee_profile).count(),
         'active_assignments': current_assignments.count(),
         'completed_assignments': past_assignments.count(),
         'total_employers': Assignment.objects.filter(employee=employee_profile).values('employer').distinct().count(),
-    }
+    })
 
-    # Recent work schedules
-    recent_schedules = WorkSchedule.objects.filter(
-        employee=employee_profile,
-        date__gte=today - timezone.timedelta(days=30)
-    ).select_related('assignment__employer').order_by('-date')[:10]
-
-    # Pending timesheets
-    pending_timesheets = Timesheet.objects.filter(
-        employee=employee_profile,
-        status='PENDING'
-    ).select_related('assignment__employer').order_by('-date')
-
-    # Get CV information
-    cv_document = Document.objects.filter(
+    # Check if CV is uploaded
+    has_cv = SimpleLazyObject(lambda: Document.objects.filter(
         employee=employee_profile,
-        document_type='CV'
-    ).first()
+        document_type=Document.DocumentType.CV
+    ).exists())
 
-    # Check if CV model exists
-    try:
-        cv = CV.objects.get(employee=employee_profile)
-    except CV.DoesNotExist:
-        cv = None
+    # Open jobs ranked by skills, salary and location fit
+    recommended_jobs = recommend_jobs_for_employee(employee_profile, limit=5)
 
     context = {
         'user': request.user,
         'has_profile': has_profile,
         'profile': employee_profile,
-        'has_cv': cv_document is not None,
-        'cv': cv,
-        'current_assignments': current_assignments,
-        'future_assignments': future_assignments,
-        'past_assignments': past_assignments,
-        'recent_schedules': recent_schedules,
-        'pending_timesheets': pending_timesheets,
-        # Legacy stats for existing dashboard template
-        'total_applications': stats['total_applications'],
-        'pending_applications': stats['pending_applications'],
-        'total_assignments': stats['total_assignments'],
-        'active_assignments': stats['active_assignments'],
+        'has_cv': has_cv,
+        'cv': SimpleLazyObject(lambda: CV.objects.filter(employee=employee_profile).first()),
+        'recommended_jobs': recommended_jobs,
+        'stats': stats,
+        'fragments': fragment_cache.versions('employee', employee_profile.pk, {
+            'stats': ('applications', 'assignments'),
+            'documents': ('documents',),
+        }, daily=('stats',)),
+        'fragment_timeout': fragment_cache.FRAGMENT_TIMEOUT,
     }
 
-    return render(request, 'employees/dashboard.html', context)
+    # Read from the replica unless this profile's rows changed too recently for it
+    changed = fragment_cache.changed_at('employee', employee_profile.pk, fragment_cache.DEPENDENCIES)
+    with replicas.reading(since=changed):
+        return render(request, 'employees/dashboard.html', context)
 
 
 @login_required
@@ -296,56 +309,20 @@ def profile_view(request):
 
 @login_required
 @user_passes_test(is_employee)
-def cv_download(request):
-    """Download CV file"""
-    try:
-        profile = request.user.employeeprofile
-    except EmployeeProfile.DoesNotExist:
-        messages.error(request, 'Profile not found.')
-        return redirect('employees:profile_setup')
-
-    # Get the latest CV document
-    cv_document = Document.objects.filter(
-        employee=profile,
-        document_type=Document.DocumentType.CV
-    ).order_by('-created_at').first()
-
-    if not cv_document:
-        messages.error(request, 'No CV file uploaded.')
-        return redirect('employees:profile_view')
-
-    try:
-        response = HttpResponse(cv_document.file.read(), content_type='application/octet-stream')
-        response['Content-Disposition'] = f'attachment; filename="{cv_document.file.name}"'
-        return response
-    except FileNotFoundError:
-        messages.error(request, 'CV file not found.')
-        return redirect('employees:profile_view')
-
-
-@login_required
-@user_passes_test(is_employee)
-def job_search(request):
+@replicas.reads
+async def job_search(request):
     """Search for available job postings"""
-    form = JobSearchForm(request.GET or None)
-
-    # Debug: Show all jobs first
-    all_jobs = JobPosting.objects.all()
-    print(f"DEBUG: Total jobs in database: {all_jobs.count()}")
-    for job in all_jobs:
-        print(f"DEBUG: Job '{job.title}' has status '{job.status}'")
+    form = await sync_to_async(JobSearchForm)(request.GET or None)
 
     # Filter for OPEN jobs
     jobs = JobPosting.objects.filter(status='OPEN').select_related('employer', 'location').prefetch_related('required_skills', 'required_qualifications')
-    print(f"DEBUG: OPEN jobs found: {jobs.count()}")
 
     # Temporary: if no OPEN jobs, show all jobs for debugging
-    if not jobs.exists():
-        print("DEBUG: No OPEN jobs found, showing all jobs for debugging")
+    if not await jobs.aexists():
         jobs = JobPosting.objects.all().select_related('employer', 'location').prefetch_related('required_skills', 'required_qualifications')
 
     # Apply search filters
-    if form.is_valid():
+    if await sync_to_async(form.is_valid)():
         search_query = form.cleaned_data.get('search_query')
         location = form.cleaned_data.get('location')
         job_type = form.cleaned_data.get('job_type')
@@ -377,57 +354,55 @@ def job_search(request):
     # Order by creation date (newest first)
     jobs = jobs.order_by('-created_at')
 
-    # Add application status for each job if user has profile
-    try:
-        employee_profile = request.user.employeeprofile
-        for job in jobs:
-            job.user_applied = Application.objects.filter(
-                job_posting=job,
-                applicant=employee_profile
-            ).exists()
-    except EmployeeProfile.DoesNotExist:
-        for job in jobs:
-            job.user_applied = False
-
     # Pagination
     paginator = Paginator(jobs, 12)  # 12 jobs per page
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = await sync_to_async(paginator.get_page)(page_number)
+    page_obj.object_list = [job async for job in page_obj.object_list]
+
+    # Mark the jobs on this page the user has applied for
+    user = await request.auser()
+    applied = {
+        job_posting_id async for job_posting_id in Application.objects.filter(
+            applicant__user=user,
+            job_posting_id__in=[job.id for job in page_obj.object_list]
+        ).values_list('job_posting_id', flat=True)
+    }
+    for job in page_obj.object_list:
+        job.user_applied = job.id in applied
 
     context = {
         'form': form,
         'page_obj': page_obj,
         'jobs': page_obj,
-        'total_jobs': jobs.count()
+        'total_jobs': paginator.count
     }
 
-    return render(request, 'employees/job_search.html', context)
+    return await async_views.render_async(request, 'employees/job_search.html', context)
 
 
 @login_required
 @user_passes_test(is_employee)
-def job_detail(request, job_id):
+@conditional(etags.job_detail)
+async def job_detail(request, job_id):
     """View detailed job posting"""
-    job = get_object_or_404(JobPosting, id=job_id, status='OPEN')
+    job = await aget_object_or_404(
+        JobPosting.objects.select_related('employer', 'location'), id=job_id, status='OPEN'
+    )
 
     # Check if user has applied
-    user_applied = False
+    user = await request.auser()
+    employee_profile = await EmployeeProfile.objects.filter(user=user).afirst()
     application = None
-    try:
-        employee_profile = request.user.employeeprofile
-        application = Application.objects.filter(
+    if employee_profile is not None:
+        application = await Application.objects.filter(
             job_posting=job,
             applicant=employee_profile
-        ).first()
-        user_applied = application is not None
-    except EmployeeProfile.DoesNotExist:
-        employee_profile = None
+        ).afirst()
+    user_applied = application is not None
 
-    # Get similar jobs (same location or type)
-    similar_jobs = JobPosting.objects.filter(
-        Q(location=job.location) | Q(job_type=job.job_type),
-        status='OPEN'
-    ).exclude(id=job.id).select_related('employer', 'location')[:4]
+    # Precomputed nearest neighbours by skills, title, location and job type
+    similar_jobs = await sync_to_async(similar_jobs_for)(job)
 
     context = {
         'job': job,
@@ -437,7 +412,7 @@ def job_detail(request, job_id):
         'has_profile': employee_profile is not None
     }
 
-    return render(request, 'employees/job_detail.html', context)
+    return await async_views.render_async(request, 'employees/job_detail.html', context)
 
 
 @login_required
@@ -488,17 +463,19 @@ def apply_for_job(request, job_id):
 
 @login_required
 @user_passes_test(is_employee)
-def my_applications(request):
+async def my_applications(request):
     """View user's job applications"""
-    try:
-        employee_profile = request.user.employeeprofile
-    except EmployeeProfile.DoesNotExist:
+    user = await request.auser()
+    employee_profile = await EmployeeProfile.objects.filter(user=user).afirst()
+    if employee_profile is None:
         messages.info(request, 'Please complete your employee profile first.')
         return redirect('employees:profile_setup')
 
     applications = Application.objects.filter(
         applicant=employee_profile
-    ).select_related('job_posting', 'job_posting__employer', 'job_posting__location').order_by('-created_at')
+    ).select_related('job_posting', 'job_posting__employer', 'job_posting__location').defer(
+        'notes', 'job_posting__description', 'job_posting__employer__verification_notes'
+    ).order_by('-created_at')
 
     # Filter by status if requested
     status_filter = request.GET.get('status')
@@ -508,16 +485,22 @@ def my_applications(request):
     # Pagination
     paginator = Paginator(applications, 10)
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = await sync_to_async(paginator.get_page)(page_number)
+    page_obj.object_list = [application async for application in page_obj.object_list]
 
-    # Get status counts for filter tabs
+    # Get status counts for filter tabs, in one grouped query
+    counts = {
+        row['status']: row['count'] async for row in Application.objects.filter(
+            applicant=employee_profile
+        ).order_by().values('status').annotate(count=Count('id'))
+    }
     status_counts = {
-        'all': Application.objects.filter(applicant=employee_profile).count(),
-        'submitted': Application.objects.filter(applicant=employee_profile, status='SUBMITTED').count(),
-        'reviewed': Application.objects.filter(applicant=employee_profile, status='REVIEWED').count(),
-        'invited': Application.objects.filter(applicant=employee_profile, status='INVITED').count(),
-        'hired': Application.objects.filter(applicant=employee_profile, status='HIRED').count(),
-        'rejected': Application.objects.filter(applicant=employee_profile, status='REJECTED').count(),
+        'all': sum(counts.values()),
+        'submitted': counts.get('SUBMITTED', 0),
+        'reviewed': counts.get('REVIEWED', 0),
+        'invited': counts.get('INVITED', 0),
+        'hired': counts.get('HIRED', 0),
+        'rejected': counts.get('REJECTED', 0),
     }
 
     context = {
@@ -528,7 +511,7 @@ def my_applications(request):
         'employee_profile': employee_profile
     }
 
-    return render(request, 'employees/my_applications.html', context)
+    return await async_views.render_async(request, 'employees/my_applications.html', context)
 
 
 @login_required
@@ -656,6 +639,27 @@ def schedules_view(request):
     return render(request, 'employees/schedules.html', context)
 
 
+@login_required
+@user_passes_test(is_employee)
+def schedule_calendar(request):
+    """JSON calendar of the employee's shifts: ``?view=week|month&date=YYYY-MM-DD``"""
+    try:
+        profile = request.user.employeeprofile
+    except EmployeeProfile.DoesNotExist:
+        return JsonResponse({'error': 'Employee profile not found'}, status=404)
+
+    try:
+        payload = schedules.calendar_payload(
+            WorkSchedule.objects.filter(employee=profile),
+            schedules.active_templates().filter(assignment__employee=profile),
+            request.GET.get('view', 'week'),
+            request.GET.get('date'),
+        )
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(payload)
+
+
 @login_required
 @user_passes_test(is_employee)
 def submit_timesheet(request, schedule_id):
@@ -748,7 +752,10 @@ def assignment_detail(request, assignment_id):
         return redirect('employees:profile_setup')
 
     from employers.models import Assignment
-    assignment = get_object_or_404(Assignment, id=assignment_id, employee=employee_profile)
+    assignment = get_object_or_404(
+        hours.annotate_hours(Assignment.objects.select_related('employer')),
+        id=assignment_id, employee=employee_profile,
+    )
 
     # Get related work schedules and timesheets
     work_schedules = WorkSchedule.objects.filter(assignment=assignment).order_by('-date')[:10]
@@ -800,6 +807,7 @@ def cv_form(request):
 
 @login_required
 @user_passes_test(is_employee)
+@conditional(etags.cv_view)
 def cv_view(request):
     """View employee CV"""
     try:
@@ -824,34 +832,24 @@ def cv_view(request):
 
 @login_required
 @user_passes_test(is_employee)
-def cv_download(request):
+async def cv_download(request):
     """Download CV as PDF or redirect to attachment"""
-    try:
-        employee_profile = request.user.employeeprofile
-    except EmployeeProfile.DoesNotExist:
+    user = await request.auser()
+    employee_profile = await EmployeeProfile.objects.filter(user=user).afirst()
+    if employee_profile is None:
         messages.error(request, 'Profile not found.')
         return redirect('employees:profile_setup')
 
-    try:
-        cv = CV.objects.get(employee=employee_profile)
-    except CV.DoesNotExist:
+    cv = await CV.objects.filter(employee=employee_profile).afirst()
+    if cv is None:
         messages.error(request, 'CV not found. Please create your CV first.')
         return redirect('employees:cv_form')
 
     # If there's an attachment, serve that
-    if cv.attachment:
-        from django.http import FileResponse
-        import os
-
-        file_path = cv.attachment.path
-        if os.path.exists(file_path):
-            response = FileResponse(
-                open(file_path, 'rb'),
-                as_attachment=True,
-                filename=f"{employee_profile.full_name}_CV.{cv.attachment.name.split('.')[-1]}"
-            )
-            return response
+    if cv.attachment and await asyncio.to_thread(os.path.exists, cv.attachment.path):
+        extension = cv.attachment.name.split('.')[-1]
+        return await async_views.file_response(request, cv.attachment.path, f"{employee_profile.full_name}_CV.{extension}")
 
     # Otherwise, render the CV as HTML for now (could be enhanced to generate PDF)
     messages.info(request, 'No CV attachment found. Showing CV details below.')
-    return redirect('employees:cv_view')
\ No newline at end of file
+    return redirect('employees:cv_view')
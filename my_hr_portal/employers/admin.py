@@ -1,7 +1,73 @@
-from django.contrib import admin
+import io
+
+from django import forms
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.template.response import TemplateResponse
+from django.urls import path
 from datetime import date, timedelta
-from .models import EmployerProfile, JobPosting, Application, Assignment
+from .imports import IMPORTERS, run_import
+from .models import EmployerProfile, JobPosting, Application, ApplicationEvent, Assignment
 from .services import generate_invoice_for_employer
+from core.admin import ReferenceDataAdminMixin
+
+
+class CsvImportForm(forms.Form):
+    file = forms.FileField(help_text='UTF-8 CSV with a header row. Use the import_csv command for files over ~20k rows.')
+    employer = forms.ModelChoiceField(queryset=EmployerProfile.objects.order_by('company_name'))
+    create_missing = forms.BooleanField(
+        required=False, help_text='Create skills, professions and qualifications the file names but the database lacks'
+    )
+    dry_run = forms.BooleanField(required=False, help_text='Validate everything, then roll it back')
+
+    def __init__(self, *args, needs_employer=True, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not needs_employer:
+            del self.fields['employer']
+
+
+class CsvImportAdminMixin:
+    """Adds an "Import CSV" page to the changelist, backed by employers/imports.py."""
+    import_kind = None
+    change_list_template = 'admin/csv_import_change_list.html'
+
+    def get_urls(self):
+        opts = self.model._meta
+        return [
+            path('import-csv/', self.admin_site.admin_view(self.import_csv_view),
+                 name=f'{opts.app_label}_{opts.model_name}_import_csv'),
+        ] + super().get_urls()
+
+    def import_csv_view(self, request):
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        importer = IMPORTERS[self.import_kind]
+        form = CsvImportForm(request.POST or None, request.FILES or None, needs_employer=importer.needs_employer)
+        result = None
+        if request.method == 'POST' and form.is_valid():
+            lines = io.TextIOWrapper(form.cleaned_data['file'].file, encoding='utf-8-sig', newline='')
+            try:
+                result = run_import(
+                    self.import_kind, lines, form.cleaned_data.get('employer'),
+                    dry_run=form.cleaned_data['dry_run'],
+                    create_missing=form.cleaned_data['create_missing'],
+                )
+            except (UnicodeDecodeError, ValueError) as e:
+                form.add_error('file', str(e))
+            else:
+                level = messages.SUCCESS if not result.error_count else messages.WARNING
+                self.message_user(request, str(result), level)
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': f'Import {self.model._meta.verbose_name_plural} from CSV',
+            'form': form,
+            'result': result,
+            'columns': importer.required_columns,
+            'columns_help': importer.__doc__,
+        }
+        return TemplateResponse(request, 'admin/csv_import.html', context)
+
 
 @admin.action(description='Generate monthly invoice for selected employers')
 def generate_invoice_action(modeladmin, request, queryset):
@@ -15,13 +81,14 @@ def generate_invoice_action(modeladmin, request, queryset):
         generate_invoice_for_employer(employer, first_day_previous_month, last_day_previous_month)
 
 @admin.register(EmployerProfile)
-class EmployerProfileAdmin(admin.ModelAdmin):
+class EmployerProfileAdmin(ReferenceDataAdminMixin, admin.ModelAdmin):
     list_display = ['id', 'company_name', 'contact_person_name', 'phone', 'internal_verification_status', 'has_logo']
     list_filter = ['internal_verification_status']
     search_fields = ['company_name', 'registration_code', 'contact_person_name', 'contact_person_email']
     fields = ['user', 'company_name', 'registration_code', 'address', 'contact_person_name',
               'contact_person_email', 'contact_person_phone', 'phone', 'website', 'logo',
               'internal_verification_status', 'verification_notes']
+    autocomplete_fields = ['address']
     actions = [generate_invoice_action]
 
     def has_logo(self, obj):
@@ -31,15 +98,33 @@ class EmployerProfileAdmin(admin.ModelAdmin):
 
 
 @admin.register(JobPosting)
-class JobPostingAdmin(admin.ModelAdmin):
+class JobPostingAdmin(CsvImportAdminMixin, ReferenceDataAdminMixin, admin.ModelAdmin):
+    import_kind = 'job_postings'
     list_display = ['title', 'employer', 'location', 'job_type', 'status', 'created_at', 'closing_date']
     list_filter = ['job_type', 'status', 'created_at']
     search_fields = ['title', 'description', 'employer__company_name']
     filter_horizontal = ['required_qualifications', 'required_skills']
+    autocomplete_fields = ['location']
     date_hierarchy = 'created_at'
     list_select_related = ('employer', 'location')
 
 
+class ApplicationEventInline(admin.TabularInline):
+    """Read-only status history; events are append-only."""
+    model = ApplicationEvent
+    fields = ['created_at', 'from_status', 'to_status', 'actor', 'note']
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+    ordering = ['-created_at', '-id']
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('actor')
+
+
 @admin.register(Application)
 class ApplicationAdmin(admin.ModelAdmin):
     list_display = ['applicant', 'job_posting', 'status', 'created_at']
@@ -47,10 +132,12 @@ class ApplicationAdmin(admin.ModelAdmin):
     search_fields = ['applicant__first_name', 'applicant__last_name', 'job_posting__title']
     date_hierarchy = 'created_at'
     list_select_related = ('job_posting', 'applicant', 'job_posting__employer')
+    inlines = [ApplicationEventInline]
 
 
 @admin.register(Assignment)
-class AssignmentAdmin(admin.ModelAdmin):
+class AssignmentAdmin(CsvImportAdminMixin, admin.ModelAdmin):
+    import_kind = 'assignments'
     list_display = ['employee', 'employer', 'status', 'start_date', 'end_date']
     list_filter = ['status', 'start_date']
     search_fields = ['employee__first_name', 'employee__last_name', 'employer__company_name']
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class EmployersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'employers'
\ No newline at end of file
+    name = 'employers'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,246 @@
+# employers/benchmarks.py
+"""
+Salary benchmarks.
+
+Monthly salary percentile bands per profession, experience level and area,
+computed from the curated ``SalaryBenchmark`` ranges plus the live salary data
+of job postings (estimated ranges) and assignments (monthly salary, or the
+hourly rate over ``HOURS_PER_MONTH``). Postings and assignments have no
+profession or level of their own: the professions are the ones whose name
+tokens all appear in the title (as in employers/matching.py) and the level is
+read from words such as "junior" or "senior" in it.
+
+Every salary counts towards its city, its country and the profession as a
+whole; a lookup uses the narrowest area with at least ``MIN_SAMPLES`` salaries.
+The bands of all keys are held in one ``BandTable`` (a key index plus NumPy
+arrays) that is built with three queries, shared through the cache and kept
+in-process, so a lookup is a few dict probes. Benchmark and profession edits
+publish a new version (``invalidate()``, from employers/signals.py); live data
+is picked up when the shared table expires after ``TABLE_TIMEOUT``.
+"""
+import threading
+import time
+from collections import defaultdict
+from decimal import Decimal
+
+import numpy as np
+from django.core.cache import cache
+
+from core import reference_data
+from core.models import SalaryBenchmark
+from .matching import tokenize
+from .models import Assignment, JobPosting
+
+Level = SalaryBenchmark.ExperienceLevel
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+# A band needs this many salaries; narrower areas fall back to wider ones
+MIN_SAMPLES = 3
+
+HOURS_PER_MONTH = Decimal('168')
+
+LEVEL_WORDS = {
+    Level.ENTRY: {'junior', 'jr', 'entry', 'trainee', 'intern', 'apprentice', 'graduate'},
+    Level.SENIOR: {'senior', 'sr', 'lead', 'principal', 'head', 'chief'},
+}
+
+VERSION_CACHE_KEY = 'benchmarks:version'
+TABLE_TIMEOUT = 60 * 15
+# How long a worker uses its copy before checking the shared version again
+LOCAL_TIMEOUT = 60
+
+_local = {}
+_lock = threading.Lock()
+
+
+def level_for_title(title):
+    words = tokenize(title)
+    for level, level_words in LEVEL_WORDS.items():
+        if words & level_words:
+            return level
+    return Level.MID
+
+
+def profession_tokens():
+    """``[(profession_id, name tokens), ...]`` from the reference cache."""
+    return [(profession_id, tokenize(name)) for profession_id, name in reference_data.rows('profession')]
+
+
+def _professions(tokens, title):
+    """Ids of the professions whose name tokens all appear in ``title``."""
+    title_tokens = tokenize(title)
+    return [profession_id for profession_id, name_tokens in tokens if name_tokens and name_tokens <= title_tokens]
+
+
+def _area(city, country):
+    return (city or '').strip().lower(), (country or '').strip().lower()
+
+
+def _keys(profession_id, level, city, country):
+    """The keys a salary counts towards, narrowest first."""
+    city, country = _area(city, country)
+    keys = [(profession_id, level, '', '')]
+    if country:
+        keys.insert(0, (profession_id, level, country, ''))
+        if city:
+            keys.insert(0, (profession_id, level, country, city))
+    return keys
+
+
+def samples(tokens):
+    """``(profession_id, level, city, country, monthly salary)`` of every source salary."""
+    for profession_id, level, city, country, low, high in SalaryBenchmark.objects.values_list(
+            'profession_id', 'experience_level', 'location__city', 'location__country', 'salary_min', 'salary_max'):
+        for salary in (low, high):
+            yield profession_id, level, city, country, salary
+
+    postings = JobPosting.objects.exclude(status=JobPosting.JobStatus.DRAFT).exclude(
+        estimated_salary_min__isnull=True, estimated_salary_max__isnull=True
+    )
+    for title, city, country, low, high in postings.values_list(
+            'title', 'location__city', 'location__country', 'estimated_salary_min', 'estimated_salary_max'):
+        level = level_for_title(title)
+        for profession_id in _professions(tokens, title):
+            for salary in {low, high} - {None}:
+                yield profession_id, level, city, country, salary
+
+    assignments = Assignment.objects.exclude(status=Assignment.AssignmentStatus.CANCELLED).filter(
+        job_posting__isnull=False
+    )
+    for position, posting_title, city, country, monthly, hourly in assignments.values_list(
+            'position_title', 'job_posting__title', 'job_posting__location__city',
+            'job_posting__location__country', 'monthly_salary', 'hourly_rate'):
+        salary = monthly or (hourly * HOURS_PER_MONTH if hourly else None)
+        if not salary:
+            continue
+        title = position or posting_title
+        level = level_for_title(title)
+        for profession_id in _professions(tokens, title):
+            yield profession_id, level, city, country, salary
+
+
+class Band:
+    """Salary percentiles of one profession, level and area."""
+
+    def __init__(self, values, samples, area):
+        self.values = values
+        self.samples = samples
+        # 'city', 'country' or 'all'
+        self.area = area
+
+    @property
+    def median(self):
+        return self.values[PERCENTILES.index(50)]
+
+    def suggested_range(self):
+        """The 25th to 75th percentile."""
+        return self.values[PERCENTILES.index(25)], self.values[PERCENTILES.index(75)]
+
+    def percentile_of(self, salary):
+        """Where ``salary`` falls in the band, 10 to 90 (clamped at the ends)."""
+        return round(float(np.interp(float(salary), self.values, PERCENTILES)))
+
+    def as_dict(self):
+        low, high = self.suggested_range()
+        return {
+            'min': round(low), 'max': round(high), 'median': round(self.median),
+            'percentiles': dict(zip(PERCENTILES, (round(value) for value in self.values))),
+            'samples': self.samples, 'area': self.area,
+        }
+
+
+class BandTable:
+    """Percentile bands of every key: ``rows`` maps a key to its row in ``bands``/``counts``."""
+
+    def __init__(self, grouped, tokens):
+        self.tokens = tokens
+        keys = [key for key, values in grouped.items() if len(values) >= MIN_SAMPLES]
+        self.rows = {key: row for row, key in enumerate(keys)}
+        self.bands = np.empty((len(keys), len(PERCENTILES)))
+        self.counts = np.empty(len(keys), dtype=np.int32)
+        for row, key in enumerate(keys):
+            values = np.asarray(grouped[key], dtype=np.float64)
+            self.bands[row] = np.percentile(values, PERCENTILES)
+            self.counts[row] = len(values)
+
+    @classmethod
+    def build(cls):
+        tokens = profession_tokens()
+        grouped = defaultdict(list)
+        for profession_id, level, city, country, salary in samples(tokens):
+            for key in _keys(profession_id, level, city, country):
+                grouped[key].append(float(salary))
+        return cls(grouped, tokens)
+
+    def professions(self, title):
+        return _professions(self.tokens, title)
+
+    def lookup(self, profession_ids, level, city=None, country=None):
+        """The band of the narrowest area with enough data; of several professions, the best covered."""
+        areas = ('city', 'country', 'all')[-len(_keys(0, level, city, country)):]
+        for depth, area in enumerate(areas):
+            best = None
+            for profession_id in profession_ids:
+                row = self.rows.get(_keys(profession_id, level, city, country)[depth])
+                if row is not None and (best is None or self.counts[row] > self.counts[best]):
+                    best = row
+            if best is not None:
+                return Band(self.bands[best].tolist(), int(self.counts[best]), area)
+        return None
+
+
+def invalidate():
+    """Publish a new version; every worker rebuilds or reloads the table on its next check."""
+    cache.set(VERSION_CACHE_KEY, time.time_ns(), None)
+
+
+def table():
+    """The current ``BandTable``."""
+    local = _local.get('table')
+    now = time.time()
+    if local is not None and now < local[3]:
+        if time.monotonic() - local[1] < LOCAL_TIMEOUT:
+            return local[2]
+        if cache.get(VERSION_CACHE_KEY) == local[0]:
+            _local['table'] = (local[0], time.monotonic(), local[2], local[3])
+            return local[2]
+
+    with _lock:
+        version = cache.get(VERSION_CACHE_KEY)
+        if version is None:
+            cache.add(VERSION_CACHE_KEY, time.time_ns(), None)
+            version = cache.get(VERSION_CACHE_KEY)
+        key = f'benchmarks:table:{version}'
+        # (table, expiry timestamp)
+        shared = cache.get(key)
+        if shared is None:
+            shared = (BandTable.build(), now + TABLE_TIMEOUT)
+            cache.set(key, shared, TABLE_TIMEOUT)
+        _local['table'] = (version, time.monotonic(), *shared)
+    return shared[0]
+
+
+def band_for_title(title, city=None, country=None):
+    """Band for a job title in a city/country, or ``None`` without enough data."""
+    bands = table()
+    profession_ids = bands.professions(title)
+    if not profession_ids:
+        return None
+    return bands.lookup(profession_ids, level_for_title(title), city, country)
+
+
+def band_for_location(title, location_id):
+    """``band_for_title()`` in the city and country of the address ``location_id`` (from the reference cache)."""
+    address = reference_data.by_pk('address').get(location_id)
+    if address is None:
+        return band_for_title(title)
+    _, _, city, _, country = address
+    return band_for_title(title, city, country)
+
+
+def band_for_posting(job_posting):
+    location = job_posting.location
+    if location is None:
+        return band_for_title(job_posting.title)
+    return band_for_title(job_posting.title, location.city, location.country)
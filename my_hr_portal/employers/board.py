@@ -0,0 +1,142 @@
+# employers/board.py
+"""
+Public job board.
+
+Anonymous visitors and job aggregators see the OPEN postings at /jobs/. The
+list (per filter combination) and the detail pages are cached whole, as
+rendered HTML, under keys that carry a board version. ``bump()`` moves the
+version when a posting opens, closes or changes (employers/signals.py), so
+every page is rendered fresh on its next request and the old entries expire.
+
+Pages are rendered as for an anonymous visitor, so one cached copy serves
+everyone, and only the known filter parameters (normalized) make up the key,
+so tracking parameters and letter case do not multiply entries.
+
+The sitemap and the RSS/JSON feeds are static files kept by employers/feeds.py.
+"""
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.utils.cache import patch_cache_control
+from django.utils.http import urlencode
+from django.utils.translation import get_language
+
+from core.models import Address
+from . import feeds
+from .models import JobPosting
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 20
+MAX_PAGE = 500
+MAX_QUERY_LENGTH = 100
+VERSION_KEY = 'board:version'
+# Browsers and proxies may reuse a page this long without asking again
+BROWSER_MAX_AGE = 5 * 60
+
+# Context that makes the shared layout render as for an anonymous visitor
+ANONYMOUS = {'user': AnonymousUser(), 'messages': ()}
+
+
+def version():
+    found = cache.get(VERSION_KEY)
+    if found is None:
+        # add() keeps a version another worker set in the meantime
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        found = cache.get(VERSION_KEY)
+    return found
+
+
+def bump(job_posting_ids=()):
+    """Replace every cached board page, and refresh the feeds for ``job_posting_ids``, once the transaction commits."""
+    job_posting_ids = list(job_posting_ids)
+
+    def changed():
+        cache.set(VERSION_KEY, time.time_ns(), None)
+        try:
+            feeds.refresh(job_posting_ids)
+        except Exception:
+            # The postings are committed; the ids stay queued for the next refresh or rebuild_job_feeds
+            logger.exception('Failed to refresh the job feeds for %d postings', len(job_posting_ids))
+
+    transaction.on_commit(changed)
+
+
+def filters(query):
+    """The board filters in request GET parameters ``query``, normalized; unknown or invalid values are dropped."""
+    params = {}
+    text = ' '.join(query.get('q', '').split())[:MAX_QUERY_LENGTH].casefold()
+    if text:
+        params['q'] = text
+    if query.get('type') in JobPosting.JobType.values:
+        params['type'] = query['type']
+    city = ' '.join(query.get('city', '').split())[:MAX_QUERY_LENGTH]
+    if city:
+        params['city'] = city
+    page = query.get('page', '')
+    if page.isdigit() and 1 < int(page) <= MAX_PAGE:
+        params['page'] = int(page)
+    return params
+
+
+def cached(kind, params, render):
+    """The ``kind`` page for ``params`` from the cache, or ``render()``-ed and stored."""
+    digest = hashlib.md5(urlencode(sorted(params.items())).encode(), usedforsecurity=False).hexdigest()
+    key = f'board:{version()}:{kind}:{get_language()}:{digest}'
+    html = cache.get(key)
+    if html is None:
+        html = render()
+        cache.set(key, html, settings.JOB_BOARD_CACHE_TIMEOUT)
+    return html
+
+
+def render(template, context, request):
+    return render_to_string(template, {**context, **ANONYMOUS}, request)
+
+
+def open_postings():
+    return JobPosting.objects.filter(status=JobPosting.JobStatus.OPEN).select_related('employer', 'location')
+
+
+def list_context(params):
+    jobs = open_postings().defer('description')
+    if params.get('q'):
+        jobs = jobs.filter(
+            Q(title__icontains=params['q'])
+            | Q(description__icontains=params['q'])
+            | Q(employer__company_name__icontains=params['q'])
+        )
+    if params.get('type'):
+        jobs = jobs.filter(job_type=params['type'])
+    if params.get('city'):
+        jobs = jobs.filter(location__city__iexact=params['city'])
+    page = Paginator(jobs.order_by('-created_at', '-pk'), PAGE_SIZE).get_page(params.get('page', 1))
+    cities = (
+        Address.objects.filter(jobposting__status=JobPosting.JobStatus.OPEN)
+        .order_by('city').values_list('city', flat=True).distinct()
+    )
+    return {
+        'page_obj': page,
+        'filters': params,
+        'query': urlencode({key: value for key, value in params.items() if key != 'page'}),
+        'cities': list(cities),
+        'job_types': JobPosting.JobType.choices,
+    }
+
+
+def detail_context(job_id):
+    job = open_postings().prefetch_related('required_skills', 'required_qualifications').filter(pk=job_id).first()
+    return {'job': job} if job else None
+
+
+def page_response(response):
+    patch_cache_control(response, public=True, max_age=BROWSER_MAX_AGE)
+    return response
@@ -0,0 +1,12 @@
+from django.urls import path
+from . import views
+
+app_name = 'board'
+
+urlpatterns = [
+    path('jobs/', views.public_job_list, name='job_list'),
+    path('jobs/<int:job_id>/', views.public_job_detail, name='job_detail'),
+    path('jobs/feed.rss', views.public_feed, {'name': 'jobs.rss'}, name='rss'),
+    path('jobs/feed.json', views.public_feed, {'name': 'jobs.json'}, name='json'),
+    path('sitemap.xml', views.public_feed, {'name': 'sitemap.xml'}, name='sitemap'),
+]
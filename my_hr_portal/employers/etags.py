@@ -0,0 +1,59 @@
+# employers/etags.py
+"""
+Validators for conditional GETs of employer pages (see core/conditional.py).
+
+Each reads the timestamps of everything its page shows in one query and
+returns them, or ``None`` when the view will not render the page (missing
+object), so the view answers as usual. Data shared by every page (all
+employees, all salary benchmarks) is covered by cache version counters that
+the signals move, never by scanning its table.
+"""
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import OuterRef, Subquery
+
+from core import fragment_cache
+from core.conditional import counted, newest, versions
+from core.models import Contract, Invoice, InvoiceLineItem, Payment
+from . import benchmarks
+from .matching import EMPLOYEES_VERSION_KEY, EPOCH_CACHE_KEY
+from .models import EmployerProfile, JobPosting
+
+
+def job_posting_detail(request, job_id):
+    """
+    The posting and its location, its applications (the employer's
+    applications counter), the employees behind the recommendations and the
+    salary benchmarks behind the market range.
+    """
+    row = JobPosting.objects.filter(pk=job_id, employer__user=request.user).values_list(
+        'updated_at', 'location__updated_at', 'employer_id',
+    ).first()
+    if row is None:
+        return None
+    return [
+        *row,
+        fragment_cache.changed_at('employer', row[-1], ['applications']),
+        *versions(EPOCH_CACHE_KEY, EMPLOYEES_VERSION_KEY, benchmarks.VERSION_CACHE_KEY),
+    ]
+
+
+def invoice_detail(request, invoice_id):
+    """The invoice with its line items and payments."""
+    return Invoice.objects.filter(
+        pk=invoice_id,
+        client_content_type=ContentType.objects.get_for_model(EmployerProfile),
+        client_object_id=Subquery(EmployerProfile.objects.filter(user=request.user).values('pk')),
+    ).annotate(
+        items_updated=newest(InvoiceLineItem.objects.filter(invoice=OuterRef('pk'))),
+        item_count=counted(InvoiceLineItem.objects.filter(invoice=OuterRef('pk'))),
+        payments_updated=newest(Payment.objects.filter(invoice=OuterRef('pk'))),
+        payment_count=counted(Payment.objects.filter(invoice=OuterRef('pk'))),
+    ).values_list('updated_at', 'items_updated', 'item_count', 'payments_updated', 'payment_count').first()
+
+
+def contract_detail(request, contract_id):
+    """The contract, its template and the employer details it shows."""
+    return Contract.objects.filter(pk=contract_id, employer_profile__user=request.user).values_list(
+        'updated_at', 'template_used__updated_at', 'employer_profile__updated_at',
+        'employer_profile__address__updated_at',
+    ).first()
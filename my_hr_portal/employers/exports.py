@@ -0,0 +1,129 @@
+# employers/exports.py
+"""
+Employer list exports.
+
+Each export is the full result of one employer list (applications,
+assignments, invoices, contracts) under the same filters as the list page,
+read as a ``values_list()`` projection with ``iterator()`` so rows are fetched
+``CHUNK_SIZE`` at a time and streamed by core/exports.py as they arrive.
+"""
+from datetime import date
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum
+
+from core import exports, replicas
+from core.models import Contract, Invoice, InvoiceLineItem
+from .models import Application, Assignment, EmployerProfile
+
+# Rows fetched from the database at a time
+CHUNK_SIZE = 2000
+
+
+def _applications(employer_profile, params):
+    queryset = Application.objects.filter(job_posting__employer=employer_profile)
+    if params.get('status'):
+        queryset = queryset.filter(status=params['status'])
+    if params.get('job'):
+        queryset = queryset.filter(job_posting_id=params['job'])
+    return queryset.order_by('-created_at', '-pk')
+
+
+def _assignments(employer_profile, params):
+    queryset = Assignment.objects.filter(employer=employer_profile)
+    if params.get('status'):
+        queryset = queryset.filter(status=params['status'])
+    return queryset.order_by('-start_date', '-pk')
+
+
+def _invoices(employer_profile, params):
+    totals = (
+        InvoiceLineItem.objects.filter(invoice=OuterRef('pk'))
+        .order_by()
+        .values('invoice')
+        .annotate(total=Sum(F('quantity') * F('unit_price')))
+        .values('total')
+    )
+    queryset = Invoice.objects.filter(
+        client_content_type=ContentType.objects.get_for_model(EmployerProfile),
+        client_object_id=employer_profile.id,
+    ).annotate(total=Subquery(totals, output_field=DecimalField(max_digits=12, decimal_places=2)))
+    if params.get('status'):
+        queryset = queryset.filter(status=params['status'])
+    return queryset.order_by('-issue_date', '-pk')
+
+
+def _contracts(employer_profile, params):
+    queryset = Contract.objects.filter(employer_profile=employer_profile)
+    if params.get('status'):
+        queryset = queryset.filter(status=params['status'])
+    return queryset.order_by('-created_at', '-pk')
+
+
+# name -> (queryset for the employer and filters, [(header, field), ...], choice labels per field)
+EXPORTS = {
+    'applications': (_applications, [
+        ('ID', 'id'),
+        ('Job', 'job_posting__title'),
+        ('First name', 'applicant__first_name'),
+        ('Last name', 'applicant__last_name'),
+        ('Email', 'applicant__user__email'),
+        ('Phone', 'applicant__phone'),
+        ('Expected salary', 'applicant__expected_salary'),
+        ('Status', 'status'),
+        ('Applied', 'created_at'),
+    ], {'status': Application.ApplicationStatus}),
+    'assignments': (_assignments, [
+        ('ID', 'id'),
+        ('First name', 'employee__first_name'),
+        ('Last name', 'employee__last_name'),
+        ('Position', 'position_title'),
+        ('Department', 'department'),
+        ('Type', 'assignment_type'),
+        ('Status', 'status'),
+        ('Start date', 'start_date'),
+        ('Expected end date', 'expected_end_date'),
+        ('Actual end date', 'actual_end_date'),
+        ('Hourly rate', 'hourly_rate'),
+        ('Monthly salary', 'monthly_salary'),
+    ], {'status': Assignment.AssignmentStatus, 'assignment_type': Assignment.AssignmentType}),
+    'invoices': (_invoices, [
+        ('Invoice number', 'invoice_number'),
+        ('Issue date', 'issue_date'),
+        ('Due date', 'due_date'),
+        ('Status', 'status'),
+        ('Total', 'total'),
+    ], {'status': Invoice.InvoiceStatus}),
+    'contracts': (_contracts, [
+        ('ID', 'id'),
+        ('Type', 'contract_type'),
+        ('Status', 'status'),
+        ('Signed', 'signed_date'),
+        ('Effective', 'effective_date'),
+        ('Expires', 'expiry_date'),
+        ('Created', 'created_at'),
+    ], {'status': Contract.ContractStatus, 'contract_type': Contract.ContractType}),
+}
+
+
+def rows(queryset, fields, choices):
+    """``values_list(*fields)`` of ``queryset`` in chunks, with choice codes replaced by their labels."""
+    labels = [dict(choices[field].choices) if field in choices else None for field in fields]
+    for row in queryset.values_list(*fields).iterator(chunk_size=CHUNK_SIZE):
+        yield [label.get(value, value) if label else value for value, label in zip(row, labels)]
+
+
+def export(name, employer_profile, params, file_format='csv', asynchronous=False):
+    """
+    Streaming download of the ``name`` list; ``KeyError`` for an unknown list,
+    ``ValueError`` for a format. ``asynchronous`` streams it under ASGI.
+    """
+    queryset_for, columns, choices = EXPORTS[name]
+    header = [header for header, field in columns]
+    fields = [field for header, field in columns]
+    # Rows stream after the view returns, so fix the database while the view's routing applies
+    queryset = queryset_for(employer_profile, params).using(replicas.read_alias())
+    return exports.stream(
+        f'{name}-{date.today():%Y-%m-%d}', header, rows(queryset, fields, choices), file_format, name.title(),
+        asynchronous,
+    )
@@ -0,0 +1,253 @@
+# employers/feeds.py
+"""
+Sitemap and job feeds as static files.
+
+``sitemap.xml``, ``jobs.rss`` and ``jobs.json`` list every OPEN posting and
+live in ``JOB_FEEDS_ROOT``, where nginx serves them without reaching Django.
+They are kept up to date incrementally: ``entries.json`` next to them holds
+the rendered sitemap/RSS/JSON entry of each open posting, and ``refresh()``
+re-reads only the postings that changed, replaces their entries and rewrites
+the three files from the stored entries. Files are replaced atomically.
+
+Rewriting the files costs I/O proportional to the open postings, so edits are
+batched instead of each waiting its turn: ``refresh()`` appends the changed ids
+to a pending file and returns at once if another worker holds the lock. That
+worker picks the ids up before it lets go, so a burst of edits costs one or
+two rewrites. ``JOB_FEEDS_ROOT`` lies outside ``MEDIA_ROOT``; only the three
+files are published (by nginx, or by the ``public_feed`` view).
+"""
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.text import Truncator
+
+try:
+    import fcntl
+except ImportError:  # Windows development machines
+    fcntl = None
+
+from .models import JobPosting
+
+FILES = {
+    'sitemap.xml': 'application/xml',
+    'jobs.rss': 'application/rss+xml',
+    'jobs.json': 'application/json',
+}
+STATE_FILE = 'entries.json'
+PENDING_FILE = 'pending'
+LOCK_FILE = '.lock'
+
+# Words of the description quoted in the RSS item and the JSON entry
+SUMMARY_WORDS = 80
+
+
+def _root():
+    return settings.JOB_FEEDS_ROOT
+
+
+def _url(path):
+    return settings.PUBLIC_SITE_URL.rstrip('/') + path
+
+
+def path_of(name):
+    return os.path.join(_root(), name)
+
+
+@contextmanager
+def _locked(wait=True):
+    """Hold the feeds lock; yields False instead of waiting when ``wait`` is off and it is taken."""
+    os.makedirs(_root(), exist_ok=True)
+    with open(path_of(LOCK_FILE), 'w') as lock:
+        if fcntl:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+        yield True
+
+
+def _queue(job_posting_ids):
+    os.makedirs(_root(), exist_ok=True)
+    with open(path_of(PENDING_FILE), 'a') as pending:
+        # Held only for the append, so a drain never reads half a line
+        if fcntl:
+            fcntl.flock(pending, fcntl.LOCK_EX)
+        pending.write(''.join(f'{pk}\n' for pk in job_posting_ids))
+
+
+def _drain():
+    """Take the queued ids, emptying the pending file."""
+    try:
+        pending = open(path_of(PENDING_FILE), 'r+')
+    except FileNotFoundError:
+        return set()
+    with pending:
+        if fcntl:
+            fcntl.flock(pending, fcntl.LOCK_EX)
+        ids = {int(line) for line in pending.read().split() if line.isdigit()}
+        pending.seek(0)
+        pending.truncate()
+    return ids
+
+
+def _queued():
+    try:
+        return os.path.getsize(path_of(PENDING_FILE)) > 0
+    except OSError:
+        return False
+
+
+def _write(name, content):
+    # Write next to the target and rename, so readers never see a partial file
+    fd, tmp = tempfile.mkstemp(dir=_root(), prefix=f'.{name}.')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path_of(name))
+
+
+def _postings(ids=None):
+    queryset = JobPosting.objects.filter(status=JobPosting.JobStatus.OPEN).select_related('employer', 'location')
+    if ids is not None:
+        queryset = queryset.filter(pk__in=ids)
+    return queryset.only(
+        'title', 'description', 'job_type', 'estimated_salary_min', 'estimated_salary_max', 'closing_date',
+        'created_at', 'updated_at', 'employer__company_name',
+        'location__city', 'location__country', 'location__street_address', 'location__postal_code',
+    )
+
+
+def _entry(posting):
+    """Sitemap, RSS and JSON renderings of one posting."""
+    url = _url(reverse('board:job_detail', args=[posting.pk]))
+    summary = Truncator(posting.description).words(SUMMARY_WORDS)
+    location = posting.location
+    title = f"{posting.title} - {posting.employer.company_name}"
+    return {
+        'created': posting.created_at.isoformat(),
+        'sitemap': f'<url><loc>{escape(url)}</loc><lastmod>{posting.updated_at.date().isoformat()}</lastmod></url>',
+        'rss': (
+            f'<item><title>{escape(title)}</title><link>{escape(url)}</link>'
+            f'<guid isPermaLink="true">{escape(url)}</guid>'
+            f'<pubDate>{format_datetime(posting.created_at)}</pubDate>'
+            f'<description>{escape(summary)}</description></item>'
+        ),
+        'json': {
+            'id': posting.pk,
+            'url': url,
+            'title': posting.title,
+            'company': posting.employer.company_name,
+            'city': location.city,
+            'country': location.country,
+            'job_type': posting.job_type,
+            'salary_min': str(posting.estimated_salary_min) if posting.estimated_salary_min is not None else None,
+            'salary_max': str(posting.estimated_salary_max) if posting.estimated_salary_max is not None else None,
+            'salary_currency': 'EUR',
+            'closing_date': posting.closing_date.isoformat() if posting.closing_date else None,
+            'posted': posting.created_at.isoformat(),
+            'updated': posting.updated_at.isoformat(),
+            'summary': summary,
+        },
+    }
+
+
+def _render(entries):
+    """The three files from the stored entries, newest posting first."""
+    ordered = sorted(entries.values(), key=lambda entry: entry['created'], reverse=True)
+    board_url = _url(reverse('board:job_list'))
+    now = timezone.now()
+    sitemap = (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        f'<url><loc>{escape(board_url)}</loc><changefreq>hourly</changefreq></url>'
+        + ''.join(entry['sitemap'] for entry in ordered)
+        + '</urlset>\n'
+    )
+    rss = (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<rss version="2.0"><channel><title>DREKAR HR Portal - Open positions</title>'
+        f'<link>{escape(board_url)}</link><description>Open job postings</description>'
+        f'<lastBuildDate>{format_datetime(now)}</lastBuildDate>'
+        + ''.join(entry['rss'] for entry in ordered)
+        + '</channel></rss>\n'
+    )
+    feed = json.dumps({
+        'generated': now.isoformat(),
+        'count': len(ordered),
+        'jobs': [entry['json'] for entry in ordered],
+    }, ensure_ascii=False)
+    return {'sitemap.xml': sitemap, 'jobs.rss': rss, 'jobs.json': feed}
+
+
+def _load():
+    try:
+        with open(path_of(STATE_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save(entries):
+    _write(STATE_FILE, json.dumps(entries, ensure_ascii=False))
+    for name, content in _render(entries).items():
+        _write(name, content)
+
+
+def rebuild():
+    """Write all files from every open posting."""
+    with _locked():
+        # Everything is re-read, queued ids included
+        _drain()
+        entries = {str(posting.pk): _entry(posting) for posting in _postings().iterator(chunk_size=1000)}
+        _save(entries)
+    return len(entries)
+
+
+def refresh(job_posting_ids):
+    """
+    Re-read ``job_posting_ids`` (opened, closed, edited or deleted) and rewrite
+    the files, or leave them to the worker that is rewriting them right now.
+    """
+    job_posting_ids = {int(pk) for pk in job_posting_ids}
+    if not job_posting_ids:
+        return
+    _queue(job_posting_ids)
+    # Whoever holds the lock checks the queue again after letting go, so ids
+    # queued while it was busy are never left behind
+    while _queued():
+        with _locked(wait=False) as acquired:
+            if not acquired:
+                return
+            _apply(_drain())
+
+
+def _apply(job_posting_ids):
+    if not job_posting_ids:
+        return
+    try:
+        entries = _load()
+        if entries is None:
+            entries = {str(posting.pk): _entry(posting) for posting in _postings().iterator(chunk_size=1000)}
+        else:
+            for pk in job_posting_ids:
+                entries.pop(str(pk), None)
+            entries.update((str(posting.pk), _entry(posting)) for posting in _postings(job_posting_ids))
+        _save(entries)
+    except Exception:
+        # Put the ids back so the next refresh (or rebuild_job_feeds) retries them
+        _queue(job_posting_ids)
+        raise
+
+
+def ensure():
+    """Build the files if they do not exist yet (first request after a deploy)."""
+    if not all(os.path.exists(path_of(name)) for name in FILES):
+        rebuild()
@@ -2,6 +2,7 @@ from django import forms
 from django.utils.translation import gettext_lazy as _
 from .models import JobPosting, EmployerProfile
 from core.models import Address, Qualification, Skill, Contract, ContractTemplate
+from core import reference_data
 
 
 class JobPostingForm(forms.ModelForm):
@@ -62,27 +63,32 @@ class JobPostingForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         # Ensure we have locations, qualifications, and skills
-        if not Address.objects.exists():
+        if not reference_data.rows('address'):
             # Add some default locations if none exist
             Address.objects.get_or_create(city='Vilnius', country='Lithuania')
             Address.objects.get_or_create(city='Kaunas', country='Lithuania')
             Address.objects.get_or_create(city='Klaipeda', country='Lithuania')
 
         # Ensure we have some basic qualifications
-        if not Qualification.objects.exists():
+        if not reference_data.rows('qualification'):
             Qualification.objects.get_or_create(name='High School Diploma', defaults={'description': 'Secondary education completion'})
             Qualification.objects.get_or_create(name='Bachelor\'s Degree', defaults={'description': 'University bachelor degree'})
             Qualification.objects.get_or_create(name='Master\'s Degree', defaults={'description': 'University master degree'})
             Qualification.objects.get_or_create(name='Professional Certificate', defaults={'description': 'Professional certification'})
 
         # Ensure we have some basic skills
-        if not Skill.objects.exists():
+        if not reference_data.rows('skill'):
             Skill.objects.get_or_create(name='Communication', defaults={'description': 'Verbal and written communication skills'})
             Skill.objects.get_or_create(name='Teamwork', defaults={'description': 'Ability to work in team environment'})
             Skill.objects.get_or_create(name='Problem Solving', defaults={'description': 'Analytical and problem-solving abilities'})
             Skill.objects.get_or_create(name='Computer Skills', defaults={'description': 'Basic computer and software skills'})
             Skill.objects.get_or_create(name='Time Management', defaults={'description': 'Ability to manage time effectively'})
 
+        # Render reference data from the cache; the address list can be large
+        reference_data.use_autocomplete(self.fields['location'], 'address')
+        reference_data.use_cached_choices(self.fields['required_qualifications'], 'qualification')
+        reference_data.use_cached_choices(self.fields['required_skills'], 'skill')
+
         # Make salary fields optional in form
         self.fields['estimated_salary_min'].required = False
         self.fields['estimated_salary_max'].required = False
@@ -168,7 +174,7 @@ class EmployerProfileForm(forms.ModelForm):
         )
 
         # Create some default addresses if none exist
-        if not Address.objects.exists():
+        if not reference_data.rows('address'):
             Address.objects.create(
                 street_address='Main Street 1',
                 city='Vilnius',
@@ -182,6 +188,7 @@ class EmployerProfileForm(forms.ModelForm):
                 country='Lithuania'
             )
             self.fields['address'].queryset = Address.objects.all()
+        reference_data.use_autocomplete(self.fields['address'], 'address')
 
         # Add help text
         self.fields['company_name'].help_text = _('Legal name of your company')
@@ -279,6 +286,7 @@ class ContractForm(forms.ModelForm):
 
         # Filter active templates only
         self.fields['template_used'].queryset = ContractTemplate.objects.filter(is_active=True)
+        reference_data.use_cached_choices(self.fields['template_used'], 'contract_template', active_only=True)
         self.fields['template_used'].empty_label = _('Select a template (optional)')
 
         # Add help text
@@ -0,0 +1,572 @@
+# employers/imports.py
+"""
+Bulk CSV imports of job postings, employees and assignments.
+
+``run_import()`` reads the CSV a batch of ``BATCH_SIZE`` rows at a time and
+never holds the whole file. For each batch it
+
+* resolves skills, professions, qualifications and addresses against the
+  reference cache (core/reference_data.py); missing addresses are inserted in
+  bulk, missing skills/professions/qualifications only with ``create_missing``;
+* loads whatever else the rows point to (existing users, employees, postings)
+  with one query per batch;
+* builds and field-validates the objects, recording a row-level error for
+  every row that fails instead of aborting;
+* saves the valid rows and their M2M links with ``bulk_create()`` in one
+  transaction. If the database rejects the batch, its rows are retried one by
+  one so only the offending rows are reported.
+
+Bulk inserts bypass ``post_save``, so the caches those signals maintain
+(reference data, matching index, similar jobs, dashboard fragments) are
+refreshed once when the import ends.
+"""
+import csv
+from contextlib import nullcontext
+from decimal import Decimal, InvalidOperation
+from datetime import date
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+from django.db.models.functions import Lower
+
+from core import fragment_cache, reference_data
+from core.models import Address, Profession, Qualification, Skill
+from employees.models import EmployeeProfile
+from . import board, similarity
+from .matching import bump_epoch
+from .models import Assignment, JobPosting
+
+BATCH_SIZE = 1000
+
+# Separates the names in skills/professions/qualifications cells
+LIST_SEPARATOR = ';'
+
+# Above this many new postings the similar-jobs index is rebuilt rather than refreshed
+SIMILARITY_REFRESH_LIMIT = 200
+
+# Row errors kept in a result; the count goes on past this
+MAX_ERRORS = 1000
+
+
+class ImportResult:
+    """Counts and row-level errors of one import."""
+
+    def __init__(self, kind, dry_run=False):
+        self.kind = kind
+        self.dry_run = dry_run
+        self.rows = 0
+        self.created = 0
+        self.error_count = 0
+        # [(CSV line number, message), ...]
+        self.errors = []
+
+    def error(self, line, error):
+        self.error_count += 1
+        if len(self.errors) < MAX_ERRORS:
+            message = '; '.join(error.messages) if isinstance(error, ValidationError) else str(error)
+            self.errors.append((line, message))
+
+    def __str__(self):
+        verb = 'Would import' if self.dry_run else 'Imported'
+        return f"{verb} {self.created} of {self.rows} {self.kind.replace('_', ' ')} ({self.error_count} rows with errors)"
+
+
+# Cell parsing. Each raises ValueError with a message naming the column.
+
+def _text(row, column, required=False):
+    value = (row.get(column) or '').strip()
+    if required and not value:
+        raise ValueError(f"{column} is required")
+    return value
+
+
+def _decimal(row, column):
+    value = _text(row, column)
+    if not value:
+        return None
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"{column}: not a number: {value!r}")
+
+
+def _int(row, column, default=None):
+    value = _text(row, column)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{column}: not a whole number: {value!r}")
+
+
+def _date(row, column, required=False):
+    value = _text(row, column, required)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{column}: not a YYYY-MM-DD date: {value!r}")
+
+
+def _choice(row, column, choices, default):
+    """The code of a choice given as its code or label (any case)."""
+    value = _text(row, column)
+    if not value:
+        return default
+    for code, label in choices:
+        if value.lower() in (code.lower(), label.lower()):
+            return code
+    raise ValueError(f"{column}: unknown value {value!r}")
+
+
+def _names(row, column):
+    return list(dict.fromkeys(name.strip() for name in _text(row, column).split(LIST_SEPARATOR) if name.strip()))
+
+
+def _address(row, prefix=''):
+    """``(street, city, postal code, country)`` of a row, or ``None`` when it has no address."""
+    street, city, postal_code, country = (
+        _text(row, prefix + column) for column in ('street_address', 'city', 'postal_code', 'country')
+    )
+    if not (street or city or country):
+        return None
+    if not (city and country):
+        raise ValueError(f"{prefix}city and {prefix}country are required for an address")
+    return street, city, postal_code, country
+
+
+class References:
+    """
+    Name -> id maps of the reference tables, seeded from the reference cache.
+    ``prepare()`` inserts what a batch is missing, in bulk and in its own
+    transaction, so a later rollback of the batch cannot leave stale ids here.
+    """
+
+    NAMED = {'skill': Skill, 'profession': Profession, 'qualification': Qualification}
+
+    def __init__(self, create_missing=False):
+        self.create_missing = create_missing
+        self.ids = {
+            table: {row[1].lower(): row[0] for row in reference_data.rows(table)}
+            for table in self.NAMED
+        }
+        self.addresses = {
+            self._address_key(street, city, country): pk
+            for pk, street, city, _, country in reference_data.rows('address')
+        }
+        # Tables that got new rows
+        self.changed = set()
+
+    @staticmethod
+    def _address_key(street, city, country):
+        return (street or '').lower(), city.lower(), country.lower()
+
+    def prepare(self, names, addresses):
+        """Insert the missing ``{table: names}`` (with ``create_missing``) and ``addresses`` of a batch."""
+        for table, wanted in names.items():
+            missing = {name.lower(): name for name in wanted if name.lower() not in self.ids[table]}
+            if not missing or not self.create_missing:
+                continue
+            model = self.NAMED[table]
+            with transaction.atomic():
+                model.objects.bulk_create([model(name=name) for name in missing.values()], ignore_conflicts=True)
+            for pk, name in model.objects.filter(name__in=missing.values()).values_list('id', 'name'):
+                self.ids[table][name.lower()] = pk
+            self.changed.add(table)
+
+        missing = {}
+        for street, city, postal_code, country in addresses:
+            key = self._address_key(street, city, country)
+            if key not in self.addresses:
+                missing[key] = Address(
+                    street_address=street or None, city=city, postal_code=postal_code or None, country=country
+                )
+        if missing:
+            with transaction.atomic():
+                Address.objects.bulk_create(missing.values(), ignore_conflicts=True)
+            cities = {address.city for address in missing.values()}
+            for pk, street, city, country in Address.objects.filter(city__in=cities).values_list(
+                    'id', 'street_address', 'city', 'country'):
+                self.addresses.setdefault(self._address_key(street, city, country), pk)
+            self.changed.add('address')
+
+    def lookup(self, table, names):
+        """Ids of ``names`` in ``table``; ``ValueError`` naming the unknown ones."""
+        ids = self.ids[table]
+        unknown = [name for name in names if name.lower() not in ids]
+        if unknown:
+            raise ValueError(f"Unknown {table}: {', '.join(unknown)}")
+        return [ids[name.lower()] for name in names]
+
+    def address(self, address):
+        street, city, _, country = address
+        try:
+            return self.addresses[self._address_key(street, city, country)]
+        except KeyError:
+            raise ValueError(f"Address {', '.join(filter(None, (street, city, country)))} could not be created")
+
+    def finish(self):
+        for table in self.changed:
+            reference_data.invalidate(table)
+
+
+class Importer:
+    """
+    One kind of row. ``prepare()`` loads what a batch refers to, ``build()``
+    turns one row into an item of unsaved objects (raising ``ValueError`` or
+    ``ValidationError``), ``save()`` inserts a list of items and ``saved()``
+    notes what ``finish()`` has to refresh once the import is over.
+    """
+
+    kind = None
+    required_columns = ()
+    needs_employer = False
+
+    def __init__(self, references, employer=None):
+        if self.needs_employer and employer is None:
+            raise ValueError(f"Importing {self.kind.replace('_', ' ')} needs an employer")
+        self.references = references
+        self.employer = employer
+
+    def prepare(self, rows):
+        pass
+
+    def build(self, row):
+        raise NotImplementedError
+
+    def save(self, items):
+        raise NotImplementedError
+
+    def objects(self, item):
+        """The model instances of an item."""
+        return [item]
+
+    def saved(self, items):
+        pass
+
+    def finish(self):
+        """Refresh what the skipped signals would have."""
+
+    def _prepare_references(self, rows, named_columns, address_prefix=None):
+        names = {}
+        addresses = []
+        for row in rows:
+            for table, column in named_columns.items():
+                try:
+                    names.setdefault(table, set()).update(_names(row, column))
+                except ValueError:
+                    pass
+            if address_prefix is not None:
+                try:
+                    address = _address(row, address_prefix)
+                except ValueError:
+                    continue
+                if address:
+                    addresses.append(address)
+        self.references.prepare(names, addresses)
+
+    @staticmethod
+    def _links(through, source, target, pairs):
+        """Through-model rows of an M2M for ``[(source id, target id), ...]``."""
+        return [through(**{f'{source}_id': source_id, f'{target}_id': target_id}) for source_id, target_id in pairs]
+
+
+class JobPostingImporter(Importer):
+    """
+    Columns: title, description, city, country (required); street_address,
+    postal_code, job_type, status, num_employees_requested,
+    estimated_salary_min, estimated_salary_max, closing_date, skills,
+    qualifications.
+    """
+
+    kind = 'job_postings'
+    required_columns = ('title', 'description', 'city', 'country')
+    needs_employer = True
+
+    def prepare(self, rows):
+        self._prepare_references(rows, {'skill': 'skills', 'qualification': 'qualifications'}, '')
+
+    def build(self, row):
+        address = _address(row)
+        if address is None:
+            raise ValueError("city and country are required")
+        posting = JobPosting(
+            employer=self.employer,
+            title=_text(row, 'title', required=True),
+            description=_text(row, 'description', required=True),
+            location_id=self.references.address(address),
+            job_type=_choice(row, 'job_type', JobPosting.JobType.choices, JobPosting.JobType.FULL_TIME),
+            status=_choice(row, 'status', JobPosting.JobStatus.choices, JobPosting.JobStatus.DRAFT),
+            num_employees_requested=_int(row, 'num_employees_requested', 1),
+            estimated_salary_min=_decimal(row, 'estimated_salary_min'),
+            estimated_salary_max=_decimal(row, 'estimated_salary_max'),
+            closing_date=_date(row, 'closing_date'),
+        )
+        if posting.estimated_salary_min and posting.estimated_salary_max and \
+                posting.estimated_salary_min > posting.estimated_salary_max:
+            raise ValueError("estimated_salary_min is above estimated_salary_max")
+        posting.clean_fields(exclude=['employer', 'location'])
+        skill_ids = self.references.lookup('skill', _names(row, 'skills'))
+        qualification_ids = self.references.lookup('qualification', _names(row, 'qualifications'))
+        return posting, skill_ids, qualification_ids
+
+    def __init__(self, references, employer=None):
+        super().__init__(references, employer)
+        self.saved_ids = []
+
+    def save(self, items):
+        JobPosting.objects.bulk_create([posting for posting, _, _ in items])
+        JobPosting.required_skills.through.objects.bulk_create(self._links(
+            JobPosting.required_skills.through, 'jobposting', 'skill',
+            [(posting.pk, skill_id) for posting, skill_ids, _ in items for skill_id in skill_ids],
+        ))
+        JobPosting.required_qualifications.through.objects.bulk_create(self._links(
+            JobPosting.required_qualifications.through, 'jobposting', 'qualification',
+            [(posting.pk, qualification_id) for posting, _, qualification_ids in items
+             for qualification_id in qualification_ids],
+        ))
+
+    def objects(self, item):
+        return [item[0]]
+
+    def saved(self, items):
+        self.saved_ids.extend(posting.pk for posting, _, _ in items)
+
+    def finish(self):
+        if not self.saved_ids:
+            return
+        if len(self.saved_ids) > SIMILARITY_REFRESH_LIMIT:
+            similarity.rebuild_similar_jobs()
+        else:
+            similarity.refresh_similar_jobs(self.saved_ids)
+        bump_epoch()
+        fragment_cache.bump('employer', [self.employer.pk], 'job_postings')
+        board.bump(self.saved_ids)
+
+
+class EmployeeImporter(Importer):
+    """
+    Columns: email, first_name, last_name, date_of_birth, phone, nationality
+    (required); street_address, city, postal_code, country, expected_salary,
+    current_status, experience_summary, skills, professions.
+
+    Each row creates an employee user with an unusable password; the employee
+    sets one through the password reset flow.
+    """
+
+    kind = 'employees'
+    required_columns = ('email', 'first_name', 'last_name', 'date_of_birth', 'phone', 'nationality')
+
+    def __init__(self, references, employer=None):
+        super().__init__(references, employer)
+        self.seen_emails = set()
+        self.existing_emails = set()
+        self.password = make_password(None)
+        self.saved_count = 0
+
+    def prepare(self, rows):
+        self._prepare_references(rows, {'skill': 'skills', 'profession': 'professions'}, '')
+        emails = {_text(row, 'email').lower() for row in rows} - {''}
+        User = get_user_model()
+        # Addresses differ only in case count as the same user
+        self.existing_emails = set(User.objects.annotate(email_key=Lower('email')).filter(
+            email_key__in=emails).values_list('email_key', flat=True))
+
+    def build(self, row):
+        User = get_user_model()
+        email = _text(row, 'email', required=True)
+        key = email.lower()
+        if key in self.existing_emails:
+            raise ValueError(f"A user with email {email} already exists")
+        if key in self.seen_emails:
+            raise ValueError(f"Email {email} appears more than once in the file")
+        address = _address(row)
+        user = User(email=email, username=email[:150], user_type='EMPLOYEE', password=self.password)
+        user.clean_fields(exclude=['password', 'username'])
+        profile = EmployeeProfile(
+            first_name=_text(row, 'first_name', required=True),
+            last_name=_text(row, 'last_name', required=True),
+            date_of_birth=_date(row, 'date_of_birth', required=True),
+            phone=_text(row, 'phone', required=True),
+            nationality=_text(row, 'nationality', required=True),
+            address_id=self.references.address(address) if address else None,
+            expected_salary=_decimal(row, 'expected_salary'),
+            current_status=_choice(row, 'current_status', EmployeeProfile.STATUS_CHOICES, 'AVAILABLE'),
+            experience_summary=_text(row, 'experience_summary') or None,
+        )
+        profile.clean_fields(exclude=['user', 'address'])
+        skill_ids = self.references.lookup('skill', _names(row, 'skills'))
+        profession_ids = self.references.lookup('profession', _names(row, 'professions'))
+        self.seen_emails.add(key)
+        return user, profile, skill_ids, profession_ids
+
+    def save(self, items):
+        User = get_user_model()
+        User.objects.bulk_create([user for user, _, _, _ in items])
+        for user, profile, _, _ in items:
+            profile.user_id = user.pk
+        EmployeeProfile.objects.bulk_create([profile for _, profile, _, _ in items])
+        EmployeeProfile.skills.through.objects.bulk_create(self._links(
+            EmployeeProfile.skills.through, 'employeeprofile', 'skill',
+            [(profile.pk, skill_id) for _, profile, skill_ids, _ in items for skill_id in skill_ids],
+        ))
+        EmployeeProfile.preferred_professions.through.objects.bulk_create(self._links(
+            EmployeeProfile.preferred_professions.through, 'employeeprofile', 'profession',
+            [(profile.pk, profession_id) for _, profile, _, profession_ids in items
+             for profession_id in profession_ids],
+        ))
+
+    def objects(self, item):
+        return [item[0], item[1]]
+
+    def saved(self, items):
+        self.saved_count += len(items)
+
+    def finish(self):
+        if self.saved_count:
+            bump_epoch()
+
+
+class AssignmentImporter(Importer):
+    """
+    Columns: employee_email, start_date (required); job_posting_id,
+    position_title, department, assignment_type, status, expected_end_date,
+    hourly_rate, monthly_salary, notes. The employee must already exist (import
+    employees first) and the posting must belong to the employer.
+    """
+
+    kind = 'assignments'
+    required_columns = ('employee_email', 'start_date')
+    needs_employer = True
+
+    def __init__(self, references, employer=None):
+        super().__init__(references, employer)
+        self.employees = {}
+        self.job_posting_ids = set()
+        self.employee_ids = set()
+
+    def prepare(self, rows):
+        emails = {_text(row, 'employee_email').lower() for row in rows} - {''}
+        self.employees = dict(EmployeeProfile.objects.annotate(email_key=Lower('user__email')).filter(
+            email_key__in=emails).values_list('email_key', 'id'))
+        posting_ids = set()
+        for row in rows:
+            try:
+                posting_ids.add(_int(row, 'job_posting_id'))
+            except ValueError:
+                pass
+        self.job_posting_ids = set(JobPosting.objects.filter(
+            employer=self.employer, pk__in=posting_ids - {None}).values_list('id', flat=True))
+
+    def build(self, row):
+        email = _text(row, 'employee_email', required=True)
+        employee_id = self.employees.get(email.lower())
+        if employee_id is None:
+            raise ValueError(f"No employee with email {email}")
+        job_posting_id = _int(row, 'job_posting_id')
+        if job_posting_id is not None and job_posting_id not in self.job_posting_ids:
+            raise ValueError(f"Job posting {job_posting_id} does not belong to {self.employer}")
+        assignment = Assignment(
+            employer=self.employer,
+            employee_id=employee_id,
+            job_posting_id=job_posting_id,
+            start_date=_date(row, 'start_date', required=True),
+            expected_end_date=_date(row, 'expected_end_date'),
+            status=_choice(row, 'status', Assignment.AssignmentStatus.choices,
+                           Assignment.AssignmentStatus.PENDING_START),
+            assignment_type=_choice(row, 'assignment_type', Assignment.AssignmentType.choices,
+                                    Assignment.AssignmentType.DIRECT_EMPLOYMENT),
+            hourly_rate=_decimal(row, 'hourly_rate'),
+            monthly_salary=_decimal(row, 'monthly_salary'),
+            position_title=_text(row, 'position_title') or None,
+            department=_text(row, 'department') or None,
+            notes=_text(row, 'notes') or None,
+        )
+        if assignment.expected_end_date and assignment.expected_end_date < assignment.start_date:
+            raise ValueError("expected_end_date is before start_date")
+        assignment.clean_fields(exclude=['employer', 'employee', 'job_posting', 'employment_contract'])
+        return assignment
+
+    def save(self, items):
+        Assignment.objects.bulk_create(items)
+
+    def saved(self, items):
+        self.employee_ids.update(assignment.employee_id for assignment in items)
+
+    def finish(self):
+        if not self.employee_ids:
+            return
+        fragment_cache.bump('employer', [self.employer.pk], 'assignments')
+        fragment_cache.bump('employee', self.employee_ids, 'assignments')
+
+
+IMPORTERS = {importer.kind: importer for importer in (JobPostingImporter, EmployeeImporter, AssignmentImporter)}
+
+
+def _import_batch(importer, batch, result):
+    importer.prepare([row for _, row in batch])
+    built = []
+    for line, row in batch:
+        try:
+            built.append((line, importer.build(row)))
+        except (ValueError, ValidationError) as e:
+            result.error(line, e)
+    if not built:
+        return
+    try:
+        with transaction.atomic():
+            importer.save([item for _, item in built])
+    except DatabaseError:
+        # Retry row by row to report just the rows the database rejects
+        for line, item in built:
+            # Drop the pks the rolled back insert handed out
+            for obj in importer.objects(item):
+                obj.pk = None
+            try:
+                with transaction.atomic():
+                    importer.save([item])
+            except DatabaseError as e:
+                result.error(line, e)
+            else:
+                result.created += 1
+                importer.saved([item])
+    else:
+        result.created += len(built)
+        importer.saved([item for _, item in built])
+
+
+def run_import(kind, lines, employer=None, batch_size=BATCH_SIZE, dry_run=False, create_missing=False):
+    """
+    Import the CSV text ``lines`` (a file or any iterable of lines) as
+    ``kind``, one of ``IMPORTERS``. ``ValueError`` for an unknown kind, a
+    missing employer or missing columns; row problems go into the returned
+    ``ImportResult``. A dry run validates and inserts everything, then rolls
+    it all back.
+    """
+    if kind not in IMPORTERS:
+        raise ValueError(f"Unknown import: {kind}")
+    references = References(create_missing)
+    importer = IMPORTERS[kind](references, employer)
+    reader = csv.DictReader(lines)
+    missing = set(importer.required_columns) - set(reader.fieldnames or ())
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(sorted(missing))}")
+
+    result = ImportResult(kind, dry_run)
+    # line_num is read after each row, so multi-line cells report the row's last line
+    numbered = ((reader.line_num, row) for row in reader)
+    with transaction.atomic() if dry_run else nullcontext():
+        while batch := list(islice(numbered, batch_size)):
+            result.rows += len(batch)
+            _import_batch(importer, batch, result)
+        if dry_run:
+            transaction.set_rollback(True)
+    if not dry_run:
+        references.finish()
+        importer.finish()
+    return result
@@ -0,0 +1,56 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from employers.imports import BATCH_SIZE, IMPORTERS, run_import
+from employers.models import EmployerProfile
+
+
+class Command(BaseCommand):
+    help = 'Import job postings, employees or assignments from a CSV file in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(IMPORTERS))
+        parser.add_argument('path', help='CSV file with a header row')
+        parser.add_argument('--employer', help='Employer the postings or assignments belong to (id or user email)')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--create-missing', action='store_true',
+                            help='Create skills, professions and qualifications the file names but the database lacks')
+        parser.add_argument('--dry-run', action='store_true', help='Validate everything, then roll it back')
+        parser.add_argument('--errors', help='Write the rows with errors to this CSV file (line, error)')
+
+    def handle(self, *args, **options):
+        employer = None
+        if options['employer']:
+            lookup = options['employer']
+            employers = EmployerProfile.objects.filter(**(
+                {'pk': lookup} if lookup.isdigit() else {'user__email__iexact': lookup}
+            ))
+            employer = employers.first()
+            if employer is None:
+                raise CommandError(f"No employer {lookup}")
+
+        try:
+            with open(options['path'], newline='', encoding='utf-8-sig') as f:
+                result = run_import(
+                    options['kind'], f, employer,
+                    batch_size=options['batch_size'],
+                    dry_run=options['dry_run'],
+                    create_missing=options['create_missing'],
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        if options['errors'] and result.errors:
+            with open(options['errors'], 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(['line', 'error'])
+                writer.writerows(result.errors)
+        else:
+            for line, message in result.errors[:20]:
+                self.stderr.write(f"line {line}: {message}")
+            if result.error_count > 20:
+                self.stderr.write(f"... and {result.error_count - 20} more")
+
+        style = self.style.SUCCESS if not result.error_count else self.style.WARNING
+        self.stdout.write(style(str(result)))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from employers import feeds
+
+
+class Command(BaseCommand):
+    help = 'Rewrite the sitemap and the RSS/JSON job feeds from all open job postings'
+
+    def handle(self, *args, **options):
+        count = feeds.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Wrote feeds for {count} open postings to {feeds.path_of('')}"))
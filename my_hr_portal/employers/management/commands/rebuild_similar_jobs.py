@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from employers.similarity import rebuild_similar_jobs
+
+
+class Command(BaseCommand):
+    help = 'Recompute the similar-jobs index for all open job postings'
+
+    def handle(self, *args, **options):
+        count = rebuild_similar_jobs()
+        self.stdout.write(self.style.SUCCESS(f"Indexed similar jobs for {count} open postings"))
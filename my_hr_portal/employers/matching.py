@@ -0,0 +1,500 @@
+# employers/matching.py
+"""
+Candidate-to-job matching engine.
+
+Employees and open job postings are kept in memory as sparse (COO) skill and
+profession matrices plus per-row salary and location arrays. A posting can then
+be scored against every employee (or an employee against every open posting)
+with a handful of vectorized NumPy operations instead of per-row Python loops.
+
+The in-memory indexes are refreshed incrementally: every lookup pulls only the
+rows whose ``updated_at`` moved since the last sync. M2M edits bump
+``updated_at`` through the signals in ``employers/signals.py``; edits that
+affect many rows at once (addresses, professions, deletions) bump a shared
+cache epoch that forces a full rebuild in every worker.
+"""
+import re
+import threading
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+# Score weights (they add up to 1.0)
+SKILL_WEIGHT = 0.55
+PROFESSION_WEIGHT = 0.10
+SALARY_WEIGHT = 0.15
+LOCATION_WEIGHT = 0.20
+
+# Location fit for a same address / same city / same country match
+SAME_ADDRESS_FIT = 1.0
+SAME_CITY_FIT = 0.8
+SAME_COUNTRY_FIT = 0.4
+
+# Salary fit used when either side did not state a salary
+UNKNOWN_SALARY_FIT = 0.5
+
+EPOCH_CACHE_KEY = 'matching:epoch'
+# Moves whenever an employee profile or its skills/professions change (validators, see employers/etags.py)
+EMPLOYEES_VERSION_KEY = 'matching:employees'
+
+# Re-read rows slightly older than the last sync to absorb clock skew between workers
+REFRESH_OVERLAP = timedelta(seconds=5)
+
+# Rebuild from scratch instead of patching when this share of rows changed
+REBUILD_RATIO = 0.25
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Lower-cased word tokens of a title or profession name."""
+    return set(_TOKEN_RE.findall((text or '').lower()))
+
+
+def bump_epoch():
+    """Force every worker to rebuild its matching indexes on next use."""
+    cache.set(EPOCH_CACHE_KEY, time.time_ns(), None)
+
+
+def bump_employees():
+    """Move the employees version once the transaction commits."""
+    transaction.on_commit(lambda: cache.set(EMPLOYEES_VERSION_KEY, time.time_ns(), None))
+
+
+def sparse_overlap(rows, cols, query_ids, n):
+    """Per-row count of COO entries ``(rows, cols)`` whose column is in ``query_ids``."""
+    if not len(query_ids) or not len(cols):
+        return np.zeros(n, dtype=np.int64)
+    mark = np.zeros(max(int(cols.max()), int(query_ids.max())) + 1, dtype=bool)
+    mark[query_ids] = True
+    return np.bincount(rows[mark[cols]], minlength=n)
+
+
+def _as_float(value):
+    return float(value) if value is not None else np.nan
+
+
+class Probe:
+    """The side of a match that is scored against a whole index."""
+
+    def __init__(self, skill_ids, profession_ids, salary_min, salary_max,
+                 address_id, city_code, country_code):
+        self.skill_ids = np.asarray(sorted(skill_ids), dtype=np.int64)
+        self.profession_ids = np.asarray(sorted(profession_ids), dtype=np.int64)
+        self.salary_min = _as_float(salary_min)
+        self.salary_max = _as_float(salary_max)
+        self.address_id = address_id if address_id is not None else -1
+        self.city_code = city_code
+        self.country_code = country_code
+
+
+class MatchIndex:
+    """
+    Sparse in-memory index over one side of the match.
+
+    Rows hold the salary range, address and city/country codes of each object,
+    and ``(row, skill_id)`` / ``(row, profession_id)`` pairs form COO matrices.
+    Subclasses provide the queries that load rows.
+    """
+    model = None
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.synced_at = None
+        self._reset()
+
+    def _reset(self):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.row_of = {}
+        self.active = np.empty(0, dtype=bool)
+        self.salary_min = np.empty(0, dtype=np.float64)
+        self.salary_max = np.empty(0, dtype=np.float64)
+        self.address = np.empty(0, dtype=np.int64)
+        self.city = np.empty(0, dtype=np.int64)
+        self.country = np.empty(0, dtype=np.int64)
+        self.skill_rows = np.empty(0, dtype=np.int64)
+        self.skill_cols = np.empty(0, dtype=np.int64)
+        self.profession_rows = np.empty(0, dtype=np.int64)
+        self.profession_cols = np.empty(0, dtype=np.int64)
+        self.skill_counts = np.empty(0, dtype=np.int64)
+
+    # -- loading -------------------------------------------------------------
+
+    def load_rows(self, queryset):
+        """Return ``(id, active, salary_min, salary_max, address_id, city, country)`` tuples."""
+        raise NotImplementedError
+
+    def load_skills(self, ids=None):
+        """Return ``(object_id, skill_id)`` pairs, optionally limited to ``ids``."""
+        raise NotImplementedError
+
+    def load_professions(self, ids=None):
+        """Return ``(object_id, profession_id)`` pairs, optionally limited to ``ids``."""
+        raise NotImplementedError
+
+    def refresh(self):
+        """Rebuild on first use, otherwise patch in rows changed since the last sync."""
+        started = timezone.now()
+        if self.synced_at is None:
+            self.rebuild()
+        else:
+            changed = self.load_rows(
+                self.model.objects.filter(updated_at__gt=self.synced_at - REFRESH_OVERLAP)
+            )
+            if len(changed) > max(len(self.ids), 1) * REBUILD_RATIO:
+                self.rebuild()
+            elif changed:
+                self._patch(changed)
+        self.synced_at = started
+
+    def rebuild(self):
+        self._reset()
+        rows = self.load_rows(self.model.objects.all())
+        self._append_rows(rows)
+        self._set_pairs(self.load_skills(), self.load_professions())
+
+    def _append_rows(self, rows):
+        if not rows:
+            return
+        ids, active, salary_min, salary_max, address, city, country = zip(*rows)
+        start = len(self.ids)
+        self.ids = np.concatenate([self.ids, np.asarray(ids, dtype=np.int64)])
+        self.active = np.concatenate([self.active, np.asarray(active, dtype=bool)])
+        self.salary_min = np.concatenate([self.salary_min, np.asarray([_as_float(v) for v in salary_min])])
+        self.salary_max = np.concatenate([self.salary_max, np.asarray([_as_float(v) for v in salary_max])])
+        self.address = np.concatenate([self.address, np.asarray([a if a is not None else -1 for a in address], dtype=np.int64)])
+        self.city = np.concatenate([self.city, np.asarray(city, dtype=np.int64)])
+        self.country = np.concatenate([self.country, np.asarray(country, dtype=np.int64)])
+        for offset, object_id in enumerate(ids):
+            self.row_of[object_id] = start + offset
+
+    def _pairs_to_coo(self, pairs):
+        rows = [self.row_of[object_id] for object_id, _ in pairs if object_id in self.row_of]
+        cols = [col for object_id, col in pairs if object_id in self.row_of]
+        return np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)
+
+    def _set_pairs(self, skill_pairs, profession_pairs):
+        self.skill_rows, self.skill_cols = self._pairs_to_coo(skill_pairs)
+        self.profession_rows, self.profession_cols = self._pairs_to_coo(profession_pairs)
+        self.skill_counts = np.bincount(self.skill_rows, minlength=len(self.ids))
+
+    def _patch(self, changed):
+        """Replace the rows and matrix entries of changed objects in place."""
+        new_rows = []
+        for row_data in changed:
+            row = self.row_of.get(row_data[0])
+            if row is None:
+                new_rows.append(row_data)
+                continue
+            _, active, salary_min, salary_max, address, city, country = row_data
+            self.active[row] = active
+            self.salary_min[row] = _as_float(salary_min)
+            self.salary_max[row] = _as_float(salary_max)
+            self.address[row] = address if address is not None else -1
+            self.city[row] = city
+            self.country[row] = country
+        self._append_rows(new_rows)
+
+        changed_ids = [row_data[0] for row_data in changed]
+        changed_rows = np.asarray([self.row_of[object_id] for object_id in changed_ids], dtype=np.int64)
+        keep_skills = ~np.isin(self.skill_rows, changed_rows)
+        keep_professions = ~np.isin(self.profession_rows, changed_rows)
+        skill_rows, skill_cols = self._pairs_to_coo(self.load_skills(changed_ids))
+        profession_rows, profession_cols = self._pairs_to_coo(self.load_professions(changed_ids))
+        self.skill_rows = np.concatenate([self.skill_rows[keep_skills], skill_rows])
+        self.skill_cols = np.concatenate([self.skill_cols[keep_skills], skill_cols])
+        self.profession_rows = np.concatenate([self.profession_rows[keep_professions], profession_rows])
+        self.profession_cols = np.concatenate([self.profession_cols[keep_professions], profession_cols])
+        self.skill_counts = np.bincount(self.skill_rows, minlength=len(self.ids))
+
+    # -- scoring -------------------------------------------------------------
+
+    def score(self, probe):
+        """Score ``probe`` against every row; rows that cannot match score 0."""
+        n = len(self.ids)
+        if not n:
+            return np.zeros(0)
+
+        # Binary cosine similarity of skill vectors
+        overlap = sparse_overlap(self.skill_rows, self.skill_cols, probe.skill_ids, n)
+        denominator = np.sqrt(self.skill_counts * len(probe.skill_ids))
+        skill_score = np.divide(overlap, denominator, out=np.zeros(n), where=denominator > 0)
+
+        profession_hit = sparse_overlap(self.profession_rows, self.profession_cols, probe.profession_ids, n) > 0
+
+        salary_score = salary_fit(self, probe)
+        location_score = location_fit(self, probe)
+
+        scores = (
+            SKILL_WEIGHT * skill_score
+            + PROFESSION_WEIGHT * profession_hit
+            + SALARY_WEIGHT * salary_score
+            + LOCATION_WEIGHT * location_score
+        )
+        # Only recommend rows with some skill or profession in common
+        scores[~self.active | ((overlap == 0) & ~profession_hit)] = 0
+        return scores
+
+    def top(self, probe, limit, exclude_ids=()):
+        """Return ``[(object_id, score), ...]`` for the ``limit`` best rows."""
+        scores = self.score(probe)
+        candidates = np.flatnonzero(scores > 0)
+        if len(exclude_ids):
+            candidates = candidates[~np.isin(self.ids[candidates], np.asarray(list(exclude_ids), dtype=np.int64))]
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        ordered = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return [(int(self.ids[row]), float(scores[row])) for row in ordered]
+
+
+def salary_fit(index, probe):
+    """
+    How well the salary expectation fits the budget.
+
+    One side is an employee's ``expected_salary`` (stored as a min == max range),
+    the other a posting's estimated range; the budget is the top of the range.
+    Expectations within budget fit fully and the fit drops linearly to 0 at twice
+    the budget.
+    """
+    if index.role == 'employee':
+        expected = index.salary_min
+        budget = probe.salary_max if not np.isnan(probe.salary_max) else probe.salary_min
+    else:
+        expected = probe.salary_min
+        budget = np.where(np.isnan(index.salary_max), index.salary_min, index.salary_max)
+    expected, budget = np.broadcast_arrays(np.asarray(expected, dtype=np.float64),
+                                           np.asarray(budget, dtype=np.float64))
+    fit = np.full(len(index.ids), UNKNOWN_SALARY_FIT)
+    known = ~np.isnan(expected) & ~np.isnan(budget) & (budget > 0)
+    over = np.zeros(len(index.ids))
+    np.divide(expected - budget, budget, out=over, where=known)
+    fit[known] = np.clip(1 - over[known], 0, 1)
+    return fit
+
+
+def location_fit(index, probe):
+    """Same address > same city > same country > elsewhere."""
+    fit = np.zeros(len(index.ids))
+    if probe.country_code >= 0:
+        fit[index.country == probe.country_code] = SAME_COUNTRY_FIT
+    if probe.city_code >= 0:
+        fit[index.city == probe.city_code] = SAME_CITY_FIT
+    if probe.address_id >= 0:
+        fit[index.address == probe.address_id] = SAME_ADDRESS_FIT
+    return fit
+
+
+class EmployeeIndex(MatchIndex):
+    role = 'employee'
+
+    @property
+    def model(self):
+        from employees.models import EmployeeProfile
+        return EmployeeProfile
+
+    def load_rows(self, queryset):
+        rows = queryset.values_list(
+            'id', 'current_status', 'expected_salary', 'address_id', 'address__city', 'address__country'
+        )
+        return [
+            (object_id, status == 'AVAILABLE', salary, salary, address_id,
+             self.engine.city_code(city, country), self.engine.country_code(country))
+            for object_id, status, salary, address_id, city, country in rows
+        ]
+
+    def load_skills(self, ids=None):
+        through = self.model.skills.through.objects.all()
+        if ids is not None:
+            through = through.filter(employeeprofile_id__in=ids)
+        return list(through.values_list('employeeprofile_id', 'skill_id'))
+
+    def load_professions(self, ids=None):
+        through = self.model.preferred_professions.through.objects.all()
+        if ids is not None:
+            through = through.filter(employeeprofile_id__in=ids)
+        return list(through.values_list('employeeprofile_id', 'profession_id'))
+
+
+class JobPostingIndex(MatchIndex):
+    """Open postings; professions are inferred from the posting title."""
+    role = 'posting'
+
+    @property
+    def model(self):
+        from .models import JobPosting
+        return JobPosting
+
+    def _reset(self):
+        super()._reset()
+        self._titles = {}
+
+    def load_rows(self, queryset):
+        rows = queryset.values_list(
+            'id', 'status', 'estimated_salary_min', 'estimated_salary_max',
+            'location_id', 'location__city', 'location__country', 'title'
+        )
+        result = []
+        for object_id, status, salary_min, salary_max, location_id, city, country, title in rows:
+            self._titles[object_id] = title
+            result.append((
+                object_id, status == self.model.JobStatus.OPEN, salary_min, salary_max, location_id,
+                self.engine.city_code(city, country), self.engine.country_code(country),
+            ))
+        return result
+
+    def load_skills(self, ids=None):
+        through = self.model.required_skills.through.objects.all()
+        if ids is not None:
+            through = through.filter(jobposting_id__in=ids)
+        return list(through.values_list('jobposting_id', 'skill_id'))
+
+    def load_professions(self, ids=None):
+        object_ids = self._titles.keys() if ids is None else ids
+        return [
+            (object_id, profession_id)
+            for object_id in object_ids
+            for profession_id in self.engine.professions_for_title(self._titles.get(object_id))
+        ]
+
+
+class MatchingEngine:
+    """Holds both indexes plus the shared city/country/profession vocabularies."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._epoch = None
+        self._reset()
+
+    def _reset(self):
+        self.cities = {}
+        self.countries = {}
+        self._profession_tokens = None
+        self.employees = EmployeeIndex(self)
+        self.postings = JobPostingIndex(self)
+
+    def city_code(self, city, country):
+        if not city:
+            return -1
+        return self.cities.setdefault((city.strip().lower(), (country or '').strip().lower()), len(self.cities))
+
+    def country_code(self, country):
+        if not country:
+            return -1
+        return self.countries.setdefault(country.strip().lower(), len(self.countries))
+
+    def professions_for_title(self, title):
+        """Professions whose name tokens all appear in the title."""
+        if self._profession_tokens is None:
+            from core.models import Profession
+            self._profession_tokens = [
+                (profession_id, tokenize(name)) for profession_id, name in Profession.objects.values_list('id', 'name')
+            ]
+        title_tokens = tokenize(title)
+        return [pid for pid, tokens in self._profession_tokens if tokens and tokens <= title_tokens]
+
+    def sync(self, name):
+        """Return the up-to-date ``employees``/``postings`` index, rebuilding all if the epoch moved."""
+        epoch = cache.get(EPOCH_CACHE_KEY)
+        if epoch != self._epoch:
+            self._reset()
+            self._epoch = epoch
+        index = getattr(self, name)
+        index.refresh()
+        return index
+
+    def probe_for_posting(self, job_posting):
+        location = job_posting.location
+        salary_min, salary_max = job_posting.estimated_salary_min, job_posting.estimated_salary_max
+        if salary_min is None and salary_max is None:
+            # No budget stated: judge expectations against the market range instead
+            from .benchmarks import band_for_posting
+            band = band_for_posting(job_posting)
+            if band is not None:
+                salary_min, salary_max = band.suggested_range()
+        return Probe(
+            skill_ids=job_posting.required_skills.values_list('id', flat=True),
+            profession_ids=self.professions_for_title(job_posting.title),
+            salary_min=salary_min,
+            salary_max=salary_max,
+            address_id=job_posting.location_id,
+            city_code=self.city_code(location.city, location.country) if location else -1,
+            country_code=self.country_code(location.country) if location else -1,
+        )
+
+    def probe_for_employee(self, employee_profile):
+        address = employee_profile.address
+        return Probe(
+            skill_ids=employee_profile.skills.values_list('id', flat=True),
+            profession_ids=employee_profile.preferred_professions.values_list('id', flat=True),
+            salary_min=employee_profile.expected_salary,
+            salary_max=employee_profile.expected_salary,
+            address_id=employee_profile.address_id,
+            city_code=self.city_code(address.city, address.country) if address else -1,
+            country_code=self.country_code(address.country) if address else -1,
+        )
+
+    def candidates_for_posting(self, job_posting, limit, exclude_ids=()):
+        with self._lock:
+            index = self.sync('employees')
+            probe = self.probe_for_posting(job_posting)
+            return index.top(probe, limit, exclude_ids)
+
+    def jobs_for_employee(self, employee_profile, limit, exclude_ids=()):
+        with self._lock:
+            index = self.sync('postings')
+            probe = self.probe_for_employee(employee_profile)
+            return index.top(probe, limit, exclude_ids)
+
+
+engine = MatchingEngine()
+
+
+def _attach_scores(objects_by_id, ranked):
+    """Return objects in ranked order with a ``match_score`` percentage attached."""
+    result = []
+    for object_id, score in ranked:
+        obj = objects_by_id.get(object_id)
+        if obj is None:
+            continue  # deleted since the index was synced
+        obj.match_score = round(score * 100)
+        result.append(obj)
+    return result
+
+
+def recommend_jobs_for_employee(employee_profile, limit=5):
+    """Open job postings ranked for an employee, excluding ones already applied for."""
+    from .models import Application, JobPosting
+
+    applied = Application.objects.filter(applicant=employee_profile).values_list('job_posting_id', flat=True)
+    ranked = engine.jobs_for_employee(employee_profile, limit, exclude_ids=list(applied))
+    postings = JobPosting.objects.filter(
+        status=JobPosting.JobStatus.OPEN
+    ).select_related('employer', 'location').in_bulk([object_id for object_id, _ in ranked])
+    return _attach_scores(postings, ranked)
+
+
+def recommend_candidates_for_job(job_posting, limit=10):
+    """
+    Available employees ranked for a job posting, excluding existing applicants.
+    Each has a ``salary_percentile``: where their expected salary falls in the
+    market band of the posting (``None`` if either is unknown).
+    """
+    from employees.models import EmployeeProfile
+    from .benchmarks import band_for_posting
+
+    applied = job_posting.applications.values_list('applicant_id', flat=True)
+    ranked = engine.candidates_for_posting(job_posting, limit, exclude_ids=list(applied))
+    candidates = EmployeeProfile.objects.select_related('user', 'address').in_bulk(
+        [object_id for object_id, _ in ranked]
+    )
+    band = band_for_posting(job_posting)
+    result = _attach_scores(candidates, ranked)
+    for candidate in result:
+        candidate.salary_percentile = (
+            band.percentile_of(candidate.expected_salary) if band and candidate.expected_salary else None
+        )
+    return result
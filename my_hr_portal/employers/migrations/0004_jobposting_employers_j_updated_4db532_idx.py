@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 00:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_initial'),
+        ('employers', '0003_alter_assignment_options_assignment_actual_end_date_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['updated_at'], name='employers_j_updated_4db532_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-19 00:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employers', '0004_jobposting_employers_j_updated_4db532_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarJobPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('job_posting', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_links', to='employers.jobposting')),
+                ('similar_posting', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='employers.jobposting')),
+            ],
+            options={
+                'ordering': ['job_posting', 'rank'],
+                'unique_together': {('job_posting', 'rank')},
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-19 00:41
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employers', '0006_applicationevent'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='applicationevent',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
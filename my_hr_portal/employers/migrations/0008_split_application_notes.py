@@ -0,0 +1,85 @@
+import re
+
+from django.db import migrations
+
+# Employer notes used to be appended to Application.notes as "\n\n[Name]: text"
+NOTE_RE = re.compile(r'(?:^|\n\n)\[([^\]\n]{1,150})\]: ')
+
+
+def split_notes(text):
+    """``(applicant text, [(author, note), ...])`` of a legacy notes value."""
+    matches = list(NOTE_RE.finditer(text))
+    if not matches:
+        return text, []
+    ends = [match.start() for match in matches[1:]] + [len(text)]
+    return text[:matches[0].start()], [
+        (match.group(1), text[match.end():end].strip()) for match, end in zip(matches, ends)
+    ]
+
+
+def _author_names(user):
+    full_name = f'{user.first_name} {user.last_name}'.strip()
+    return {name for name in (full_name, user.username) if name}
+
+
+def notes_to_events(apps, schema_editor):
+    Application = apps.get_model('employers', 'Application')
+    ApplicationEvent = apps.get_model('employers', 'ApplicationEvent')
+
+    applications = Application.objects.filter(notes__contains=']: ').select_related('job_posting__employer__user')
+    events = []
+    changed = []
+    for application in applications.iterator(chunk_size=500):
+        head, notes = split_notes(application.notes)
+        if not notes:
+            continue
+        # The notes were written by the posting's employer account
+        employer_user = application.job_posting.employer.user
+        for author, note in notes:
+            actor = employer_user if author in _author_names(employer_user) else None
+            events.append(ApplicationEvent(
+                application=application,
+                from_status='',
+                to_status=application.status,
+                actor=actor,
+                note=note if actor else f'[{author}]: {note}',
+                created_at=application.updated_at,
+            ))
+        application.notes = head.strip() or None
+        changed.append(application)
+
+    ApplicationEvent.objects.bulk_create(events, batch_size=500)
+    Application.objects.bulk_update(changed, ['notes'], batch_size=500)
+
+
+def events_to_notes(apps, schema_editor):
+    Application = apps.get_model('employers', 'Application')
+    ApplicationEvent = apps.get_model('employers', 'ApplicationEvent')
+
+    # Events without a from-status are the ones created from notes
+    migrated = ApplicationEvent.objects.filter(from_status='').exclude(note='').select_related('actor')
+    notes = {}
+    for event in migrated.order_by('created_at', 'id'):
+        if event.actor is not None:
+            author = f'{event.actor.first_name} {event.actor.last_name}'.strip() or event.actor.username
+            notes.setdefault(event.application_id, []).append(f'[{author}]: {event.note}')
+        else:
+            notes.setdefault(event.application_id, []).append(event.note)
+
+    changed = []
+    for application in Application.objects.filter(id__in=notes):
+        application.notes = '\n\n'.join(([application.notes] if application.notes else []) + notes[application.pk])
+        changed.append(application)
+    Application.objects.bulk_update(changed, ['notes'], batch_size=500)
+    migrated.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employers', '0007_applicationevent_created_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(notes_to_events, events_to_notes),
+    ]
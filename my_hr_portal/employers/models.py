@@ -1,7 +1,11 @@
+from decimal import Decimal
+
 from django.db import models
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
 from django.conf import settings
+from django.utils import timezone
 from django.core.files.base import ContentFile
-from PIL import Image
 from io import BytesIO
 from core.models import Address, Qualification, Skill, Profession, BaseClientProfile
 from core.models import TimeStampedModel
@@ -17,6 +21,8 @@ def resize_employer_logo(employer_profile_id):
     Celery task for resizing employer logos in the background.
     This can be used for batch processing or async image resizing.
     """
+    from PIL import Image
+
     try:
         employer = EmployerProfile.objects.get(id=employer_profile_id)
         if employer.logo:
@@ -68,6 +74,9 @@ class EmployerProfile(BaseClientProfile):
     def save(self, *args, **kwargs):
         # Resize logo if it exists and is being updated
         if self.logo:
+            # Pillow is only imported when there is a logo to resize
+            from PIL import Image
+
             try:
                 # Open the image
                 img = Image.open(self.logo)
@@ -128,6 +137,10 @@ class JobPosting(TimeStampedModel):
     
     job_type = models.CharField(max_length=20, choices=JobType.choices, default=JobType.FULL_TIME)
 
+    class Meta:
+        # Incremental refresh of the matching index (employers/matching.py)
+        indexes = [models.Index(fields=['updated_at'])]
+
     def __str__(self):
         return f"{self.title} at {self.employer.company_name}"
 
@@ -137,6 +150,21 @@ class JobPosting(TimeStampedModel):
         return self.status == 'OPEN'
 
 
+class SimilarJobPosting(models.Model):
+    """Precomputed nearest neighbours of an open job posting (see employers/similarity.py)."""
+    job_posting = models.ForeignKey(JobPosting, on_delete=models.CASCADE, related_name='similar_links')
+    similar_posting = models.ForeignKey(JobPosting, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        unique_together = ['job_posting', 'rank']
+        ordering = ['job_posting', 'rank']
+
+    def __str__(self):
+        return f"{self.job_posting_id} ~ {self.similar_posting_id} ({self.score:.2f})"
+
+
 class Application(TimeStampedModel):
     class ApplicationStatus(models.TextChoices):
         SUBMITTED = 'SUBMITTED', 'Submitted'
@@ -163,6 +191,31 @@ class Application(TimeStampedModel):
         return f"{self.applicant} applied for {self.job_posting.title}"
 
 
+class ApplicationEvent(models.Model):
+    """An append-only entry in an application's status history."""
+    application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name='events')
+    from_status = models.CharField(max_length=20, choices=Application.ApplicationStatus.choices, blank=True)
+    to_status = models.CharField(max_length=20, choices=Application.ApplicationStatus.choices)
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, blank=True, null=True, related_name='+'
+    )
+    note = models.TextField(blank=True)
+    # Not auto_now_add, so history backfilled from older data keeps its own timestamps
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [models.Index(fields=['application', '-created_at'])]
+
+    def __str__(self):
+        return f"Application {self.application_id}: {self.from_status or '-'} -> {self.to_status}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Application events are append-only and cannot be changed.")
+        super().save(*args, **kwargs)
+
+
 class Assignment(TimeStampedModel):
     class AssignmentStatus(models.TextChoices):
         PENDING_START = 'PENDING_START', 'Pending Start'  # Future
@@ -248,7 +301,7 @@ class Assignment(TimeStampedModel):
         return (end_date - self.start_date).days
 
     def get_total_hours_worked(self):
-        """Calculate total hours worked in this assignment"""
-        return sum(
-            schedule.total_hours for schedule in self.work_schedules.filter(status='COMPLETED')
-        )
\ No newline at end of file
+        """Hours of the completed shifts of this assignment; see employees/hours.py for whole lists"""
+        return self.work_schedules.filter(status='COMPLETED').aggregate(
+            total=Coalesce(Sum('hours'), Decimal('0.00'))
+        )['total']
\ No newline at end of file
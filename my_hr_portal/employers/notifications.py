@@ -0,0 +1,63 @@
+# employers/notifications.py
+"""Notifications sent when applications, contracts, job postings and timesheets change status."""
+from django.contrib.auth import get_user_model
+
+from core.mail import queue_templated
+from core.models import Notification
+from core.notifications import notify
+from .models import Application, JobPosting
+
+
+def _staff():
+    return get_user_model().objects.filter(is_staff=True, is_active=True)
+
+
+def application_status_changed(application):
+    job_title = application.job_posting.title
+    notify(
+        [application.applicant.user],
+        Notification.NotificationType.APPLICATION_UPDATE,
+        f'Your application for "{job_title}" is now {application.get_status_display()}.',
+        subject=f'Application update: {job_title}',
+    )
+
+
+def contract_status_changed(contract):
+    """Notify the contracted employee (if any) and the staff managing contracts."""
+    recipients = list(_staff())
+    assignment = getattr(contract, 'assignment', None)
+    if assignment is not None:
+        recipients.append(assignment.employee.user)
+    notify(
+        recipients,
+        Notification.NotificationType.STATUS_UPDATE,
+        f'{contract.get_contract_type_display()} contract #{contract.pk} is now {contract.get_status_display()}.',
+        subject=f'Contract #{contract.pk} status update',
+    )
+
+
+def timesheet_status_changed(timesheet):
+    notify(
+        [timesheet.employee.user],
+        Notification.NotificationType.STATUS_UPDATE,
+        f'Your timesheet for {timesheet.date:%Y-%m-%d} was {timesheet.get_status_display().lower()}.',
+        subject=f'Timesheet {timesheet.date:%Y-%m-%d} {timesheet.get_status_display().lower()}',
+    )
+
+
+def job_posting_status_changed(job_posting, old_status):
+    """When an open posting closes or is filled, email the applicants still in the running."""
+    closed = (JobPosting.JobStatus.CLOSED, JobPosting.JobStatus.FILLED)
+    if old_status != JobPosting.JobStatus.OPEN or job_posting.status not in closed:
+        return 0
+    applications = job_posting.applications.exclude(
+        status__in=[Application.ApplicationStatus.HIRED, Application.ApplicationStatus.REJECTED]
+    ).select_related('applicant__user')
+    return queue_templated(
+        'emails/job_posting_closed',
+        [
+            (application.applicant.user.email, {'applicant': application.applicant})
+            for application in applications if application.applicant.user.email
+        ],
+        {'job_posting': job_posting, 'company_name': job_posting.employer.company_name},
+    )
@@ -1,28 +1,34 @@
 # employers/services.py (a new file in your employers app)
-from datetime import date
-from django.db.models import Sum
+from datetime import date, timedelta
+from django.db import transaction
 from core.services import create_invoice_for_client
-from employees.models import Timesheet # Assuming Timesheet model exists
+from employees.hours import annotate_hours
+from employees.models import Timesheet
+from .models import Assignment
 
+@transaction.atomic
 def generate_invoice_for_employer(employer_profile, billing_period_start, billing_period_end):
     """
-    Gathers billable timesheets for an employer and creates an invoice.
+    Creates an invoice for the approved timesheet hours (worked plus overtime) of an
+    employer's assignments that no invoice covers yet, one line per assignment, and
+    links those timesheets to it so running the billing again does not bill them twice.
     """
-    # Find all approved timesheets for this employer's assignments that haven't been invoiced yet
+    # Lock the unbilled timesheets, so a concurrent run waits and then finds them billed
     billable_timesheets = Timesheet.objects.filter(
         assignment__employer=employer_profile,
-        status=Timesheet.TimesheetStatus.APPROVED,
-        invoiced=False, # You'll need to add an 'invoiced' boolean field to your Timesheet model
-        date__range=(billing_period_start, billing_period_end)
-    ).values(
-        'assignment__employee__first_name', 
-        'assignment__employee__last_name',
-        'assignment__job_posting__title'
-    ).annotate(
-        total_hours=Sum('hours_worked')
+        status='APPROVED',
+        invoice__isnull=True,
+        date__range=(billing_period_start, billing_period_end),
     )
+    timesheet_ids = list(billable_timesheets.select_for_update().values_list('id', flat=True))
 
-    if not billable_timesheets:
+    # Hours are summed per assignment in the database (employees/hours.py)
+    billable_assignments = annotate_hours(
+        Assignment.objects.filter(employer=employer_profile).select_related('employee', 'job_posting'),
+        timesheets=Timesheet.objects.filter(id__in=timesheet_ids),
+    ).filter(total_hours__gt=0).order_by('id')
+
+    if not billable_assignments:
         print(f"No billable hours for {employer_profile.company_name} in this period.")
         return None
 
@@ -30,13 +36,13 @@ def generate_invoice_for_employer(employer_profile, billing_period_start, billin
     HOURLY_RATE = 50.00 
 
     line_items_data = []
-    for item in billable_timesheets:
-        description = (f"Work by {item['assignment__employee__first_name']} {item['assignment__employee__last_name']} "
-                       f"({item['assignment__job_posting__title']})")
+    for assignment in billable_assignments:
+        title = assignment.job_posting.title if assignment.job_posting else assignment.position_title
+        description = f"Work by {assignment.employee.first_name} {assignment.employee.last_name} ({title})"
         line_items_data.append({
             'description': description,
-            'quantity': item['total_hours'],
-            'unit_price': HOURLY_RATE
+            'quantity': assignment.total_hours,
+            'unit_price': assignment.hourly_rate or HOURLY_RATE
         })
     
     # Use the core service to create the invoice
@@ -50,6 +56,6 @@ def generate_invoice_for_employer(employer_profile, billing_period_start, billin
     )
 
     # Mark the timesheets as invoiced to prevent double-billing
-    Timesheet.objects.filter(id__in=billable_timesheets.values_list('id', flat=True)).update(invoiced=True)
-    
+    Timesheet.objects.filter(id__in=timesheet_ids).update(invoice=invoice)
+
     return invoice
\ No newline at end of file
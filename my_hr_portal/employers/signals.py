@@ -0,0 +1,103 @@
+# employers/signals.py
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.models import Address, Profession, SalaryBenchmark
+from . import benchmarks, board
+from employees.models import EmployeeProfile
+from .matching import bump_employees, bump_epoch
+from .models import EmployerProfile, JobPosting, SimilarJobPosting
+from .similarity import schedule_similar_jobs_refresh
+
+
+def _touch(model, instance, reverse, pk_set):
+    """Bump ``updated_at`` on the profiles/postings whose M2M links changed."""
+    if reverse:
+        if not pk_set:
+            return  # clear() from the other side; handled by the pre_clear epoch bump
+        ids = pk_set
+    else:
+        ids = [instance.pk]
+    model.objects.filter(pk__in=ids).update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=EmployeeProfile.skills.through)
+@receiver(m2m_changed, sender=EmployeeProfile.preferred_professions.through)
+def employee_links_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        bump_epoch()
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        _touch(EmployeeProfile, instance, reverse, pk_set)
+        bump_employees()
+
+
+@receiver(post_save, sender=EmployeeProfile)
+def employee_profile_saved(sender, **kwargs):
+    bump_employees()
+
+
+@receiver(m2m_changed, sender=JobPosting.required_skills.through)
+def job_posting_skills_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        bump_epoch()
+        schedule_similar_jobs_refresh(instance.jobposting_set.values_list('id', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        _touch(JobPosting, instance, reverse, pk_set)
+        if reverse:
+            if pk_set:
+                schedule_similar_jobs_refresh(pk_set)
+                board.bump(pk_set)
+        else:
+            schedule_similar_jobs_refresh([instance.pk])
+            board.bump([instance.pk])
+
+
+@receiver(post_save, sender=JobPosting)
+def job_posting_saved(sender, instance, **kwargs):
+    schedule_similar_jobs_refresh([instance.pk])
+    board.bump([instance.pk])
+
+
+@receiver(post_delete, sender=JobPosting)
+def job_posting_deleted(sender, instance, **kwargs):
+    board.bump([instance.pk])
+
+
+@receiver(post_save, sender=EmployerProfile)
+def employer_saved(sender, instance, **kwargs):
+    # The board and feeds show the company name
+    board.bump(instance.job_postings.filter(status=JobPosting.JobStatus.OPEN).values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Address)
+def address_saved(sender, instance, **kwargs):
+    # ... and the posting's location
+    board.bump(instance.jobposting_set.filter(status=JobPosting.JobStatus.OPEN).values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=JobPosting)
+def job_posting_deleting(sender, instance, **kwargs):
+    # The cascade drops the links, so find the lists that point here first
+    owners = SimilarJobPosting.objects.filter(similar_posting=instance).values_list('job_posting_id', flat=True)
+    schedule_similar_jobs_refresh(list(owners))
+
+
+@receiver(post_save, sender=Address)
+@receiver(post_save, sender=Profession)
+@receiver(post_delete, sender=Address)
+@receiver(post_delete, sender=Profession)
+@receiver(post_delete, sender=EmployeeProfile)
+@receiver(post_delete, sender=JobPosting)
+def matching_data_changed(sender, **kwargs):
+    bump_epoch()
+
+
+@receiver(post_save, sender=SalaryBenchmark)
+@receiver(post_save, sender=Profession)
+@receiver(post_delete, sender=SalaryBenchmark)
+@receiver(post_delete, sender=Profession)
+def benchmark_data_changed(sender, **kwargs):
+    # After commit, so the rebuilt table sees the new rows (and the refreshed profession cache)
+    transaction.on_commit(benchmarks.invalidate)
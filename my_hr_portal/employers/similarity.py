@@ -0,0 +1,322 @@
+# employers/similarity.py
+"""
+Similar-jobs index.
+
+Stores the ``SIMILAR_JOBS_LIMIT`` nearest open postings of every open posting in
+``SimilarJobPosting``, so ``job_detail`` reads a handful of ids from a small
+table instead of filtering the live postings on every view.
+
+Similarity combines skill and title-token cosine, location and job type. One
+posting is scored against all open postings at once with NumPy; when a posting
+opens, closes or changes only its own list and the lists it enters or leaves
+are recomputed.
+
+The posting features live in a per-process ``PostingIndex`` that is patched
+like the matching indexes: each refresh re-reads only the postings whose
+``updated_at`` moved (plus the ones being refreshed), and the matching epoch
+forces a rebuild after deletions and address changes. A refresh then queries
+only the lists that contain the changed postings and the weakest entry of the
+lists they may enter, never the whole ``SimilarJobPosting`` table.
+"""
+import logging
+import threading
+
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from .matching import EPOCH_CACHE_KEY, REBUILD_RATIO, REFRESH_OVERLAP, sparse_overlap, tokenize
+from .models import JobPosting, SimilarJobPosting
+
+logger = logging.getLogger(__name__)
+
+SIMILAR_JOBS_LIMIT = 4
+
+# Similarity weights (they add up to 1.0)
+SKILL_WEIGHT = 0.45
+TITLE_WEIGHT = 0.30
+LOCATION_WEIGHT = 0.15
+JOB_TYPE_WEIGHT = 0.10
+
+SAME_CITY_FIT = 1.0
+SAME_COUNTRY_FIT = 0.5
+
+
+def _code(vocabulary, value):
+    """Encode a hashable value as an integer; empty values become -1."""
+    return vocabulary.setdefault(value, len(vocabulary)) if value else -1
+
+
+def _cosine(overlap, counts, query_count):
+    denominator = np.sqrt(counts * query_count)
+    return np.divide(overlap, denominator, out=np.zeros(len(counts)), where=denominator > 0)
+
+
+class PostingIndex:
+    """
+    Features of the job postings: job type and city/country codes per row, and
+    ``(row, token)`` / ``(row, skill_id)`` pairs as COO matrices.
+
+    Rows are never removed; a posting that closes keeps its row with no pairs,
+    so it overlaps (and scores against) nothing.
+    """
+
+    def __init__(self):
+        self.synced_at = None
+        self._reset()
+
+    def _reset(self):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.row_of = {}
+        self.active = np.empty(0, dtype=bool)
+        self.job_type = np.empty(0, dtype=np.int64)
+        self.city = np.empty(0, dtype=np.int64)
+        self.country = np.empty(0, dtype=np.int64)
+        self.title_rows = np.empty(0, dtype=np.int64)
+        self.title_cols = np.empty(0, dtype=np.int64)
+        self.skill_rows = np.empty(0, dtype=np.int64)
+        self.skill_cols = np.empty(0, dtype=np.int64)
+        self.title_counts = np.empty(0, dtype=np.int64)
+        self.skill_counts = np.empty(0, dtype=np.int64)
+        self._job_types = {}
+        self._cities = {}
+        self._countries = {}
+        self._tokens = {}
+
+    # -- loading -------------------------------------------------------------
+
+    def _load(self, queryset):
+        return list(queryset.values_list(
+            'id', 'status', 'title', 'job_type', 'location__city', 'location__country'
+        ))
+
+    def refresh(self, job_posting_ids=()):
+        """
+        Rebuild on first use, otherwise patch in the postings changed since the
+        last sync and ``job_posting_ids``.
+        """
+        started = timezone.now()
+        if self.synced_at is None:
+            self.rebuild()
+        else:
+            job_posting_ids = set(job_posting_ids)
+            changed = self._load(JobPosting.objects.filter(
+                Q(updated_at__gt=self.synced_at - REFRESH_OVERLAP) | Q(pk__in=job_posting_ids)
+            ))
+            # Deleted postings are not found; their rows simply go inactive
+            found = {row_data[0] for row_data in changed}
+            changed.extend(
+                (object_id, None, '', None, None, None)
+                for object_id in job_posting_ids - found if object_id in self.row_of
+            )
+            if len(changed) > max(len(self.ids), 1) * REBUILD_RATIO:
+                self.rebuild()
+            elif changed:
+                self._patch(changed)
+        self.synced_at = started
+
+    def rebuild(self):
+        self._reset()
+        self._patch(self._load(JobPosting.objects.filter(status=JobPosting.JobStatus.OPEN)))
+
+    def _patch(self, changed):
+        """Set the rows of changed postings, appending new ones, and replace their pairs."""
+        new_ids = [row_data[0] for row_data in changed if row_data[0] not in self.row_of]
+        if new_ids:
+            start = len(self.ids)
+            self.ids = np.concatenate([self.ids, np.asarray(new_ids, dtype=np.int64)])
+            grow = np.full(len(new_ids), -1, dtype=np.int64)
+            self.active = np.concatenate([self.active, np.zeros(len(new_ids), dtype=bool)])
+            self.job_type = np.concatenate([self.job_type, grow])
+            self.city = np.concatenate([self.city, grow])
+            self.country = np.concatenate([self.country, grow])
+            for offset, object_id in enumerate(new_ids):
+                self.row_of[object_id] = start + offset
+
+        title_rows, title_cols, open_ids = [], [], []
+        for object_id, status, title, job_type, city, country in changed:
+            row = self.row_of[object_id]
+            self.active[row] = status == JobPosting.JobStatus.OPEN
+            self.job_type[row] = _code(self._job_types, job_type)
+            city_key = ((city or '').strip().lower(), (country or '').strip().lower()) if city else None
+            self.city[row] = _code(self._cities, city_key)
+            self.country[row] = _code(self._countries, (country or '').strip().lower())
+            if not self.active[row]:
+                continue
+            open_ids.append(object_id)
+            for token in tokenize(title):
+                title_rows.append(row)
+                title_cols.append(self._tokens.setdefault(token, len(self._tokens)))
+
+        skill_rows, skill_cols = [], []
+        if open_ids:
+            for object_id, skill_id in JobPosting.required_skills.through.objects.filter(
+                jobposting_id__in=open_ids
+            ).values_list('jobposting_id', 'skill_id'):
+                skill_rows.append(self.row_of[object_id])
+                skill_cols.append(skill_id)
+
+        changed_rows = np.asarray([self.row_of[row_data[0]] for row_data in changed], dtype=np.int64)
+        keep_titles = ~np.isin(self.title_rows, changed_rows)
+        keep_skills = ~np.isin(self.skill_rows, changed_rows)
+        self.title_rows = np.concatenate([self.title_rows[keep_titles], np.asarray(title_rows, dtype=np.int64)])
+        self.title_cols = np.concatenate([self.title_cols[keep_titles], np.asarray(title_cols, dtype=np.int64)])
+        self.skill_rows = np.concatenate([self.skill_rows[keep_skills], np.asarray(skill_rows, dtype=np.int64)])
+        self.skill_cols = np.concatenate([self.skill_cols[keep_skills], np.asarray(skill_cols, dtype=np.int64)])
+        n = len(self.ids)
+        self.title_counts = np.bincount(self.title_rows, minlength=n)
+        self.skill_counts = np.bincount(self.skill_rows, minlength=n)
+
+    # -- scoring -------------------------------------------------------------
+
+    def open_ids(self):
+        return self.ids[self.active].tolist()
+
+    def similarities(self, row):
+        """Similarity of the posting at ``row`` to every open posting (0 for itself)."""
+        n = len(self.ids)
+        skills = self.skill_cols[self.skill_rows == row]
+        titles = self.title_cols[self.title_rows == row]
+        skill_overlap = sparse_overlap(self.skill_rows, self.skill_cols, skills, n)
+        title_overlap = sparse_overlap(self.title_rows, self.title_cols, titles, n)
+
+        location = np.zeros(n)
+        if self.country[row] >= 0:
+            location[self.country == self.country[row]] = SAME_COUNTRY_FIT
+        if self.city[row] >= 0:
+            location[self.city == self.city[row]] = SAME_CITY_FIT
+
+        scores = (
+            SKILL_WEIGHT * _cosine(skill_overlap, self.skill_counts, len(skills))
+            + TITLE_WEIGHT * _cosine(title_overlap, self.title_counts, len(titles))
+            + LOCATION_WEIGHT * location
+            + JOB_TYPE_WEIGHT * (self.job_type == self.job_type[row])
+        )
+        # Location and job type alone do not make two postings similar (closed
+        # postings have no pairs, so this drops them too)
+        scores[(skill_overlap == 0) & (title_overlap == 0)] = 0
+        scores[row] = 0
+        return scores
+
+    def neighbours(self, row, scores=None):
+        """``[(posting_id, score), ...]`` of the nearest open postings."""
+        if scores is None:
+            scores = self.similarities(row)
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > SIMILAR_JOBS_LIMIT:
+            candidates = candidates[np.argpartition(-scores[candidates], SIMILAR_JOBS_LIMIT - 1)[:SIMILAR_JOBS_LIMIT]]
+        ordered = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return [(int(self.ids[i]), float(scores[i])) for i in ordered]
+
+
+_index = PostingIndex()
+_index_lock = threading.Lock()
+_index_epoch = None
+
+
+def _synced_index(job_posting_ids=()):
+    """This process's index, up to date; rebuilt when the matching epoch moved. Call under ``_index_lock``."""
+    global _index, _index_epoch
+    epoch = cache.get(EPOCH_CACHE_KEY)
+    if epoch != _index_epoch:
+        _index = PostingIndex()
+        _index_epoch = epoch
+    _index.refresh(job_posting_ids)
+    return _index
+
+
+def _links(index, object_id, scores=None):
+    return [
+        SimilarJobPosting(job_posting_id=object_id, similar_posting_id=similar_id, rank=rank, score=score)
+        for rank, (similar_id, score) in enumerate(index.neighbours(index.row_of[object_id], scores), start=1)
+    ]
+
+
+@transaction.atomic
+def rebuild_similar_jobs():
+    """Recompute every list from scratch. Returns the number of postings indexed."""
+    index = PostingIndex()
+    index.rebuild()
+    open_ids = index.open_ids()
+    links = []
+    for object_id in open_ids:
+        links.extend(_links(index, object_id))
+    SimilarJobPosting.objects.all().delete()
+    SimilarJobPosting.objects.bulk_create(links, batch_size=1000)
+    return len(open_ids)
+
+
+@transaction.atomic
+def refresh_similar_jobs(job_posting_ids):
+    """
+    Recompute the lists affected by changes to ``job_posting_ids``.
+
+    That is the changed postings' own lists, the lists that currently contain
+    them, and the lists they now beat the weakest entry of.
+    """
+    job_posting_ids = set(job_posting_ids)
+    with _index_lock:
+        index = _synced_index(job_posting_ids)
+        affected = set(job_posting_ids)
+        affected.update(SimilarJobPosting.objects.filter(
+            similar_posting_id__in=job_posting_ids
+        ).values_list('job_posting_id', flat=True))
+
+        own_scores = {}
+        for object_id in job_posting_ids:
+            row = index.row_of.get(object_id)
+            if row is not None and index.active[row]:
+                own_scores[object_id] = index.similarities(row)
+
+        # Similarity is symmetric, so a changed posting enters another list when
+        # its own score for that posting beats the list's weakest entry
+        candidates = set()
+        for scores in own_scores.values():
+            candidates.update(index.ids[scores > 0].tolist())
+        candidates -= affected
+        if candidates:
+            threshold = dict.fromkeys(candidates, 0.0)
+            for entry in SimilarJobPosting.objects.filter(job_posting_id__in=candidates).values(
+                'job_posting_id'
+            ).annotate(entries=Count('id'), weakest=Min('score')):
+                if entry['entries'] >= SIMILAR_JOBS_LIMIT:
+                    threshold[entry['job_posting_id']] = entry['weakest']
+            owners = np.asarray(list(threshold), dtype=np.int64)
+            rows = np.asarray([index.row_of[object_id] for object_id in owners.tolist()], dtype=np.int64)
+            weakest = np.asarray(list(threshold.values()))
+            for scores in own_scores.values():
+                affected.update(owners[scores[rows] > weakest].tolist())
+
+        SimilarJobPosting.objects.filter(job_posting_id__in=affected).delete()
+        links = []
+        for object_id in affected:
+            row = index.row_of.get(object_id)
+            if row is not None and index.active[row]:
+                links.extend(_links(index, object_id, own_scores.get(object_id)))
+        SimilarJobPosting.objects.bulk_create(links)
+
+
+def _refresh_after_commit(job_posting_ids):
+    try:
+        refresh_similar_jobs(job_posting_ids)
+    except Exception:
+        # The postings are committed; rebuild_similar_jobs repairs the lists
+        logger.exception('Failed to refresh similar jobs for %d postings', len(job_posting_ids))
+
+
+def schedule_similar_jobs_refresh(job_posting_ids):
+    """Refresh the index once the current transaction commits."""
+    job_posting_ids = list(job_posting_ids)
+    if job_posting_ids:
+        transaction.on_commit(lambda: _refresh_after_commit(job_posting_ids))
+
+
+def similar_jobs_for(job_posting, limit=SIMILAR_JOBS_LIMIT):
+    """The precomputed similar open postings of ``job_posting``."""
+    links = SimilarJobPosting.objects.filter(
+        job_posting=job_posting,
+        similar_posting__status=JobPosting.JobStatus.OPEN,
+    ).select_related('similar_posting__employer', 'similar_posting__location')[:limit]
+    return [link.similar_posting for link in links]
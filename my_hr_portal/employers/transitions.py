@@ -0,0 +1,146 @@
+# employers/transitions.py
+"""
+Application status transitions.
+
+Every status change (and every employer note) is appended to the
+application's ``ApplicationEvent`` history. ``transition()`` handles one
+application. ``bulk_transition()`` moves a selection with a single ``UPDATE``,
+records the events with ``bulk_create`` and queues the applicants'
+notifications as one delivery. Because ``QuerySet.update()`` bypasses
+``post_save``, it emits the dashboard fragment counters and live status events
+that ``core/signals.py`` would produce itself.
+
+With ``dry_run=True`` ``bulk_transition()`` writes nothing and only reports
+what would change.
+"""
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core import events, notifications as core_notifications, signals
+from core.fragment_cache import bump
+from . import notifications
+from .models import Application, ApplicationEvent
+
+# Upper bound on one bulk request, so a stray "select all" cannot lock a whole table
+MAX_BULK_APPLICATIONS = 1000
+
+
+def transition(application, new_status, actor, note=''):
+    """
+    Move one application to ``new_status``, append its history event and
+    notify the applicant. A note without a status change is recorded too.
+    Returns whether the status changed.
+    """
+    if new_status not in Application.ApplicationStatus.values:
+        raise ValueError(f'Invalid status: {new_status}')
+    old_status = application.status
+    changed = new_status != old_status
+    if not changed and not note:
+        return False
+
+    with transaction.atomic():
+        if changed:
+            application.status = new_status
+            application.save(update_fields=['status', 'updated_at'])
+        ApplicationEvent.objects.create(
+            application=application, from_status=old_status, to_status=new_status, actor=actor, note=note
+        )
+    if changed:
+        notifications.application_status_changed(application)
+    return changed
+
+
+def select_applications(employer_profile, ids=None, status=None, job=None):
+    """
+    The employer's applications with the given ``ids``, or, when ``ids`` is
+    ``None``, all of them matching the ``status``/``job`` filters of the
+    applications list.
+    """
+    applications = Application.objects.filter(job_posting__employer=employer_profile)
+    if ids is not None:
+        return applications.filter(id__in=ids)
+    if status:
+        applications = applications.filter(status=status)
+    if job:
+        applications = applications.filter(job_posting_id=job)
+    return applications
+
+
+def _lock(applications):
+    if connection.features.has_select_for_update_of:
+        # Lock the application rows only, not the joined posting/profile/user rows
+        return applications.select_for_update(of=('self',))
+    return applications.select_for_update()
+
+
+def bulk_transition(applications, new_status, actor, note='', dry_run=False):
+    """
+    Move ``applications`` (a queryset) to ``new_status``. Applications already
+    in that status are left alone; an invalid status or an oversized selection
+    raises ``ValueError``. Returns a report::
+
+        {'dry_run': bool, 'status': new_status, 'matched': int, 'changed': int,
+         'transitions': {from_status: count}, 'application_ids': [changed ids]}
+    """
+    if new_status not in Application.ApplicationStatus.values:
+        raise ValueError(f'Invalid status: {new_status}')
+
+    with transaction.atomic():
+        selected = applications.select_related('job_posting', 'applicant__user').order_by('id')
+        if not dry_run:
+            selected = _lock(selected)
+        selected = list(selected[:MAX_BULK_APPLICATIONS + 1])
+        if len(selected) > MAX_BULK_APPLICATIONS:
+            raise ValueError(
+                f'At most {MAX_BULK_APPLICATIONS} applications can be updated at once; narrow the selection.'
+            )
+
+        changed = [application for application in selected if application.status != new_status]
+        transitions = {}
+        for application in changed:
+            transitions[application.status] = transitions.get(application.status, 0) + 1
+        report = {
+            'dry_run': dry_run,
+            'status': new_status,
+            'matched': len(selected),
+            'changed': len(changed),
+            'transitions': transitions,
+            'application_ids': [application.pk for application in changed],
+        }
+        if dry_run or not changed:
+            return report
+
+        now = timezone.now()
+        Application.objects.filter(id__in=report['application_ids']).update(status=new_status, updated_at=now)
+        ApplicationEvent.objects.bulk_create([
+            ApplicationEvent(
+                application=application,
+                from_status=application.status,
+                to_status=new_status,
+                actor=actor,
+                note=note,
+            )
+            for application in changed
+        ], batch_size=500)
+
+        with core_notifications.batch():
+            for application in changed:
+                application.status = new_status
+                application.updated_at = now
+                notifications.application_status_changed(application)
+
+        _changed_after_commit(changed)
+    return report
+
+
+def _changed_after_commit(applications):
+    """What ``core/signals.py`` does on ``post_save``, for applications changed with ``update()``."""
+    employer_ids = {application.job_posting.employer_id for application in applications}
+    bump('employee', [application.applicant_id for application in applications], 'applications')
+    bump('employer', employer_ids, 'applications')
+
+    signals.publish_statuses('application', [
+        (application, [events.channel('employee', application.applicant_id),
+                       events.channel('employer', application.job_posting.employer_id)])
+        for application in applications
+    ])
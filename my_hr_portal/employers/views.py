@@ -1,23 +1,38 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.decorators import user_passes_test
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
 import json
 from django.core.paginator import Paginator
 from .models import JobPosting, EmployerProfile, Application, Assignment
 from .forms import JobPostingForm, EmployerProfileForm
-from django.db.models import Sum, F
-from core.models import Invoice, Contract, ContractTemplate
+from django.db.models import Count, Sum, F
+from django.utils.functional import SimpleLazyObject
+from core.models import Invoice, Contract, ContractTemplate, Rollup
 from django.contrib.contenttypes.models import ContentType
 from core.services import create_invoice_for_client
+from core import async_views, fragment_cache, reference_data, replicas, rollups
+from core.conditional import conditional
+from .matching import recommend_candidates_for_job
+from . import benchmarks, board, etags, exports, feeds, notifications, transitions
 from datetime import date, timedelta
+from employees import hours
 
 
 def is_employer(user):
     return user.is_authenticated and user.user_type == 'EMPLOYER'
 
 
+async def _status_counts(queryset):
+    """``{status: count}`` of ``queryset`` in one grouped query"""
+    return {
+        row['status']: row['count']
+        async for row in queryset.order_by().values('status').annotate(count=Count('id'))
+    }
+
+
 @login_required
 @user_passes_test(is_employer)
 def dashboard(request):
@@ -29,70 +44,52 @@ def dashboard(request):
         return render(request, 'employers/dashboard.html', {
             'user': request.user,
             'has_profile': False,
+            'fragment_timeout': fragment_cache.FRAGMENT_TIMEOUT,
         })
 
     from django.utils import timezone
-    from employees.models import Timesheet
     today = timezone.now().date()
 
-    # Assignment queries
+    # Assignment queries (the dashboard shows their counts only)
     current_assignments = Assignment.objects.filter(
         employer=employer_profile,
         status=Assignment.AssignmentStatus.ACTIVE,
         start_date__lte=today
     ).exclude(
         actual_end_date__lt=today
-    ).select_related('employee', 'employment_contract')
-
-    upcoming_assignments = Assignment.objects.filter(
-        employer=employer_profile,
-        status=Assignment.AssignmentStatus.PENDING_START,
-        start_date__gt=today,
-        start_date__lte=today + timezone.timedelta(days=30)
-    ).select_related('employee')
-
-    past_assignments = Assignment.objects.filter(
-        employer=employer_profile,
-        status__in=[Assignment.AssignmentStatus.COMPLETED, Assignment.AssignmentStatus.TERMINATED]
-    ).select_related('employee')[:5]
+    )
 
-    # Statistics
-    stats = {
+    # Statistics; evaluated only when the cached stats fragment is stale
+    stats = SimpleLazyObject(lambda: {
         'total_job_postings': employer_profile.job_postings.count(),
         'active_job_postings': employer_profile.job_postings.filter(status=JobPosting.JobStatus.OPEN).count(),
         'total_assignments': Assignment.objects.filter(employer=employer_profile).count(),
-        'active_employees': current_assignments.count(),
+        'active_assignments': current_assignments.count(),
         'total_employees': Assignment.objects.filter(employer=employer_profile).values('employee').distinct().count(),
-    }
-
-    # Recent timesheets needing approval
-    pending_timesheets = Timesheet.objects.filter(
-        assignment__employer=employer_profile,
-        status='PENDING'
-    ).select_related('employee', 'assignment').order_by('-submitted_at')[:10]
+    })
 
     # Add recent job postings (last 5)
-    recent_jobs = employer_profile.job_postings.order_by('-created_at')[:5]
-    for job in recent_jobs:
-        job.applications_count = job.applications.count()
+    recent_jobs = employer_profile.job_postings.select_related('location').annotate(
+        applications_count=Count('applications')
+    ).order_by('-created_at')[:5]
 
     context = {
         'user': request.user,
         'has_profile': has_profile,
         'profile': employer_profile,
-        'current_assignments': current_assignments,
-        'upcoming_assignments': upcoming_assignments,
-        'past_assignments': past_assignments,
-        'pending_timesheets': pending_timesheets,
         'recent_job_postings': recent_jobs,
-        # Legacy stats for existing dashboard template
-        'total_job_postings': stats['total_job_postings'],
-        'active_job_postings': stats['active_job_postings'],
-        'total_assignments': stats['total_assignments'],
-        'active_assignments': stats['active_employees'],
+        'stats': stats,
+        'fragments': fragment_cache.versions('employer', employer_profile.pk, {
+            'stats': ('assignments', 'job_postings'),
+            'recent_jobs': ('applications', 'job_postings'),
+        }, daily=('stats',)),
+        'fragment_timeout': fragment_cache.FRAGMENT_TIMEOUT,
     }
 
-    return render(request, 'employers/dashboard.html', context)
+    # Read from the replica unless this profile's rows changed too recently for it
+    changed = fragment_cache.changed_at('employer', employer_profile.pk, fragment_cache.DEPENDENCIES)
+    with replicas.reading(since=changed):
+        return render(request, 'employers/dashboard.html', context)
 
 
 @login_required
@@ -179,9 +176,11 @@ def edit_job_posting(request, job_id):
     job_posting = get_object_or_404(JobPosting, id=job_id, employer=employer_profile)
 
     if request.method == 'POST':
+        old_status = job_posting.status
         form = JobPostingForm(request.POST, instance=job_posting)
         if form.is_valid():
             form.save()
+            notifications.job_posting_status_changed(job_posting, old_status)
             messages.success(request, 'Job posting updated successfully!')
             return redirect('employers:job_postings_list')
     else:
@@ -230,11 +229,13 @@ def toggle_job_status(request, job_id):
             employer_profile = request.user.employerprofile
             job_posting = get_object_or_404(JobPosting, id=job_id, employer=employer_profile)
 
+            old_status = job_posting.status
             if job_posting.status == JobPosting.JobStatus.OPEN:
                 job_posting.status = JobPosting.JobStatus.CLOSED
             else:
                 job_posting.status = JobPosting.JobStatus.OPEN
             job_posting.save()
+            notifications.job_posting_status_changed(job_posting, old_status)
 
             return JsonResponse({
                 'success': True,
@@ -252,6 +253,7 @@ def toggle_job_status(request, job_id):
 
 @login_required
 @user_passes_test(is_employer)
+@conditional(etags.job_posting_detail)
 def job_posting_detail(request, job_id):
     """View job posting details and applications"""
     try:
@@ -261,23 +263,43 @@ def job_posting_detail(request, job_id):
         return redirect('employers:profile_setup')
 
     job_posting = get_object_or_404(JobPosting, id=job_id, employer=employer_profile)
-    applications = job_posting.applications.all().order_by('-created_at')
+    applications = job_posting.applications.select_related('applicant__user').defer('notes').order_by('-created_at')
 
     # Pagination for applications
     paginator = Paginator(applications, 10)
     page_number = request.GET.get('page')
     applications_page = paginator.get_page(page_number)
 
+    # Available employees ranked by skills, salary and location fit
+    recommended_candidates = recommend_candidates_for_job(job_posting, limit=10)
+
     context = {
         'job_posting': job_posting,
         'applications': applications_page,
         'applications_count': applications.count(),
         'new_applications_count': applications.filter(status=Application.ApplicationStatus.SUBMITTED).count(),
+        'recommended_candidates': recommended_candidates,
+        'salary_band': benchmarks.band_for_posting(job_posting),
     }
 
     return render(request, 'employers/job_posting_detail.html', context)
 
 
+@login_required
+@user_passes_test(is_employer)
+def salary_suggestion(request):
+    """Market salary range for ``?title=`` at the address ``?location=``, for the job posting form"""
+    title = request.GET.get('title', '').strip()
+    try:
+        location_id = int(request.GET.get('location', ''))
+    except ValueError:
+        location_id = None
+    band = None
+    if title:
+        band = benchmarks.band_for_location(title, location_id) if location_id else benchmarks.band_for_title(title)
+    return JsonResponse({'band': band.as_dict() if band else None})
+
+
 @login_required
 @user_passes_test(is_employer)
 def profile_setup(request):
@@ -333,18 +355,21 @@ def profile_view(request):
 
 @login_required
 @user_passes_test(is_employer)
-def applications_list(request):
+async def applications_list(request):
     """View all applications for employer's job postings"""
-    try:
-        employer_profile = request.user.employerprofile
-    except EmployerProfile.DoesNotExist:
+    user = await request.auser()
+    employer_profile = await EmployerProfile.objects.filter(user=user).afirst()
+    if employer_profile is None:
         messages.info(request, 'Please complete your employer profile to access applications.')
         return redirect('employers:profile_setup')
 
     # Get all applications for this employer's job postings
+    # The list shows neither the applicants' notes nor the posting descriptions
     applications = Application.objects.filter(
         job_posting__employer=employer_profile
-    ).select_related('job_posting', 'applicant', 'applicant__user').order_by('-created_at')
+    ).select_related('job_posting', 'job_posting__location', 'applicant', 'applicant__user').defer(
+        'notes', 'job_posting__description'
+    ).order_by('-created_at')
 
     # Filter by status if requested
     status_filter = request.GET.get('status')
@@ -359,21 +384,23 @@ def applications_list(request):
     # Pagination
     paginator = Paginator(applications, 15)
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = await sync_to_async(paginator.get_page)(page_number)
+    page_obj.object_list = [application async for application in page_obj.object_list]
 
-    # Get status counts for filter tabs
+    # Get status counts for filter tabs, in one grouped query
+    counts = await _status_counts(Application.objects.filter(job_posting__employer=employer_profile))
     status_counts = {
-        'all': Application.objects.filter(job_posting__employer=employer_profile).count(),
-        'submitted': Application.objects.filter(job_posting__employer=employer_profile, status=Application.ApplicationStatus.SUBMITTED).count(),
-        'reviewed': Application.objects.filter(job_posting__employer=employer_profile, status=Application.ApplicationStatus.REVIEWED).count(),
-        'invited': Application.objects.filter(job_posting__employer=employer_profile, status=Application.ApplicationStatus.INVITED).count(),
-        'hired': Application.objects.filter(job_posting__employer=employer_profile, status=Application.ApplicationStatus.HIRED).count(),
-        'reserved': Application.objects.filter(job_posting__employer=employer_profile, status=Application.ApplicationStatus.RESERVED).count(),
-        'rejected': Application.objects.filter(job_posting__employer=employer_profile, status=Application.ApplicationStatus.REJECTED).count(),
+        'all': sum(counts.values()),
+        'submitted': counts.get(Application.ApplicationStatus.SUBMITTED, 0),
+        'reviewed': counts.get(Application.ApplicationStatus.REVIEWED, 0),
+        'invited': counts.get(Application.ApplicationStatus.INVITED, 0),
+        'hired': counts.get(Application.ApplicationStatus.HIRED, 0),
+        'reserved': counts.get(Application.ApplicationStatus.RESERVED, 0),
+        'rejected': counts.get(Application.ApplicationStatus.REJECTED, 0),
     }
 
     # Get job postings for filter dropdown
-    job_postings = JobPosting.objects.filter(employer=employer_profile).order_by('-created_at')
+    job_postings = [job async for job in JobPosting.objects.filter(employer=employer_profile).order_by('-created_at')]
 
     context = {
         'page_obj': page_obj,
@@ -382,10 +409,11 @@ def applications_list(request):
         'job_filter': job_filter,
         'status_counts': status_counts,
         'job_postings': job_postings,
+        'status_choices': Application.ApplicationStatus.choices,
         'employer_profile': employer_profile
     }
 
-    return render(request, 'employers/applications_list.html', context)
+    return await async_views.render_async(request, 'employers/applications_list.html', context)
 
 
 @login_required
@@ -399,13 +427,24 @@ def application_detail(request, application_id):
         return redirect('employers:profile_setup')
 
     application = get_object_or_404(
-        Application,
+        Application.objects.select_related('job_posting__location', 'applicant__user'),
         id=application_id,
         job_posting__employer=employer_profile
     )
 
+    # Status history, newest first
+    history = Paginator(application.events.select_related('actor'), 10)
+    history_page = history.get_page(request.GET.get('history_page'))
+
+    # Where the applicant's expectation sits in the market for this posting
+    salary_band = benchmarks.band_for_posting(application.job_posting)
+    expected_salary = application.applicant.expected_salary
+
     context = {
-        'application': application
+        'application': application,
+        'history_page': history_page,
+        'salary_band': salary_band,
+        'salary_percentile': salary_band.percentile_of(expected_salary) if salary_band and expected_salary else None,
     }
 
     return render(request, 'employers/application_detail.html', context)
@@ -432,8 +471,7 @@ def update_application_status(request, application_id):
         # Get all valid status choices
         valid_statuses = [choice[0] for choice in Application.ApplicationStatus.choices]
         if new_status in valid_statuses:
-            application.status = new_status
-            application.save()
+            transitions.transition(application, new_status, request.user, note=request.POST.get('note', '').strip())
 
             status_display = application.get_status_display()
             messages.success(request, f'Application status updated to {status_display}.')
@@ -467,25 +505,16 @@ def update_application_status_ajax(request, application_id):
     try:
         data = json.loads(request.body)
         new_status = data.get('status')
-        notes = data.get('notes', '')
+        notes = str(data.get('notes') or '')
 
         # Validate status
         valid_statuses = [choice[0] for choice in Application.ApplicationStatus.choices]
         if new_status not in valid_statuses:
             return JsonResponse({'success': False, 'error': 'Invalid status'})
 
-        # Update application
+        # Update application; the change and any note go to its history
         old_status = application.status
-        application.status = new_status
-
-        # Update notes if provided
-        if notes:
-            if application.notes:
-                application.notes += f"\n\n[{request.user.get_full_name() or request.user.username}]: {notes}"
-            else:
-                application.notes = f"[{request.user.get_full_name() or request.user.username}]: {notes}"
-
-        application.save()
+        transitions.transition(application, new_status, request.user, note=notes.strip())
 
         return JsonResponse({
             'success': True,
@@ -503,11 +532,94 @@ def update_application_status_ajax(request, application_id):
 
 @login_required
 @user_passes_test(is_employer)
-def assignments_list(request):
-    """View and manage employee assignments"""
+def bulk_update_application_status(request):
+    """
+    Move many applications to one status. JSON body: ``status``, either
+    ``application_ids`` or ``filter`` (``{"status": ..., "job": ...}`` as on the
+    applications list), and optional ``note`` and ``dry_run``.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Invalid request method'}, status=405)
+
+    try:
+        employer_profile = request.user.employerprofile
+    except EmployerProfile.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'Employer profile not found'})
+
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'error': 'Invalid JSON data'}, status=400)
+
+    ids = data.get('application_ids')
+    selection_filter = data.get('filter')
+    if ids is not None:
+        if not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids):
+            return JsonResponse({'success': False, 'error': 'application_ids must be a list of ids'}, status=400)
+        applications = transitions.select_applications(employer_profile, ids=ids)
+    elif isinstance(selection_filter, dict):
+        # The list's query string values: job may come as "12", and either may be empty
+        job = selection_filter.get('job') or None
+        status = selection_filter.get('status') or None
+        if isinstance(job, str) and job.isdigit():
+            job = int(job)
+        if job is not None and (not isinstance(job, int) or isinstance(job, bool)):
+            return JsonResponse({'success': False, 'error': 'filter.job must be a job posting id'}, status=400)
+        if status is not None and not isinstance(status, str):
+            return JsonResponse({'success': False, 'error': 'filter.status must be a status'}, status=400)
+        applications = transitions.select_applications(employer_profile, status=status, job=job)
+    else:
+        return JsonResponse({'success': False, 'error': 'Select applications or a filter'}, status=400)
+
+    try:
+        report = transitions.bulk_transition(
+            applications,
+            data.get('status'),
+            request.user,
+            note=str(data.get('note') or '').strip(),
+            dry_run=bool(data.get('dry_run')),
+        )
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    return JsonResponse({'success': True, **report})
+
+
+@login_required
+@user_passes_test(is_employer)
+def schedule_calendar(request):
+    """JSON calendar of the shifts on the employer's assignments: ``?view=week|month&date=YYYY-MM-DD[&employee=ID]``"""
+    from employees import schedules
+    from employees.models import WorkSchedule
+
     try:
         employer_profile = request.user.employerprofile
     except EmployerProfile.DoesNotExist:
+        return JsonResponse({'error': 'Employer profile not found'}, status=404)
+
+    shifts = WorkSchedule.objects.filter(assignment__employer=employer_profile)
+    templates = schedules.active_templates().filter(assignment__employer=employer_profile)
+    employee_id = request.GET.get('employee')
+    if employee_id:
+        if not employee_id.isdigit():
+            return JsonResponse({'error': 'Invalid employee'}, status=400)
+        shifts = shifts.filter(employee_id=employee_id)
+        templates = templates.filter(assignment__employee_id=employee_id)
+
+    try:
+        payload = schedules.calendar_payload(shifts, templates, request.GET.get('view', 'week'), request.GET.get('date'))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(payload)
+
+
+@login_required
+@user_passes_test(is_employer)
+async def assignments_list(request):
+    """View and manage employee assignments"""
+    user = await request.auser()
+    employer_profile = await EmployerProfile.objects.filter(user=user).afirst()
+    if employer_profile is None:
         messages.info(request, 'Please complete your employer profile first.')
         return redirect('employers:profile_setup')
 
@@ -523,17 +635,19 @@ def assignments_list(request):
     # Pagination
     paginator = Paginator(assignments, 15)
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = await sync_to_async(paginator.get_page)(page_number)
+    page_obj.object_list = [assignment async for assignment in page_obj.object_list]
 
-    # Get status counts for filter tabs
+    # Get status counts for filter tabs, in one grouped query
+    counts = await _status_counts(Assignment.objects.filter(employer=employer_profile))
     status_counts = {
-        'all': Assignment.objects.filter(employer=employer_profile).count(),
-        'pending_start': Assignment.objects.filter(employer=employer_profile, status=Assignment.AssignmentStatus.PENDING_START).count(),
-        'active': Assignment.objects.filter(employer=employer_profile, status=Assignment.AssignmentStatus.ACTIVE).count(),
-        'completed': Assignment.objects.filter(employer=employer_profile, status=Assignment.AssignmentStatus.COMPLETED).count(),
-        'terminated': Assignment.objects.filter(employer=employer_profile, status=Assignment.AssignmentStatus.TERMINATED).count(),
-        'paused': Assignment.objects.filter(employer=employer_profile, status=Assignment.AssignmentStatus.PAUSED).count(),
-        'cancelled': Assignment.objects.filter(employer=employer_profile, status=Assignment.AssignmentStatus.CANCELLED).count(),
+        'all': sum(counts.values()),
+        'pending_start': counts.get(Assignment.AssignmentStatus.PENDING_START, 0),
+        'active': counts.get(Assignment.AssignmentStatus.ACTIVE, 0),
+        'completed': counts.get(Assignment.AssignmentStatus.COMPLETED, 0),
+        'terminated': counts.get(Assignment.AssignmentStatus.TERMINATED, 0),
+        'paused': counts.get(Assignment.AssignmentStatus.PAUSED, 0),
+        'cancelled': counts.get(Assignment.AssignmentStatus.CANCELLED, 0),
     }
 
     context = {
@@ -544,7 +658,7 @@ def assignments_list(request):
         'employer_profile': employer_profile
     }
 
-    return render(request, 'employers/assignments.html', context)
+    return await async_views.render_async(request, 'employers/assignments.html', context)
 
 
 @login_required
@@ -558,7 +672,7 @@ def assignment_detail(request, assignment_id):
         return redirect('employers:profile_setup')
 
     assignment = get_object_or_404(
-        Assignment,
+        hours.annotate_hours(Assignment.objects.select_related('employee', 'job_posting')),
         id=assignment_id,
         employer=employer_profile
     )
@@ -571,6 +685,66 @@ def assignment_detail(request, assignment_id):
     return render(request, 'employers/assignment_detail.html', context)
 
 
+@login_required
+@user_passes_test(is_employer)
+@replicas.reads
+def reports(request):
+    """Hours, pay and billing by month, read from the reporting rollups"""
+    try:
+        employer_profile = request.user.employerprofile
+    except EmployerProfile.DoesNotExist:
+        messages.info(request, 'Please complete your employer profile first.')
+        return redirect('employers:profile_setup')
+
+    months = rollups.report_months(request.GET.get('months'))
+    rows = rollups.monthly(Rollup.Scope.EMPLOYER, employer_profile.id, months)
+    by_assignment = rollups.per_scope(
+        Rollup.Scope.ASSIGNMENT,
+        Assignment.objects.filter(employer=employer_profile).values('id'),
+        rows[0].period_start,
+    )
+    assignments = Assignment.objects.filter(id__in=by_assignment).select_related('employee').only(
+        'id', 'position_title', 'status', 'employee__first_name', 'employee__last_name',
+    )
+    assignment_rows = sorted(
+        ((assignment, by_assignment[assignment.id]) for assignment in assignments),
+        key=lambda item: item[1]['hours'], reverse=True,
+    )
+
+    context = {
+        'employer_profile': employer_profile,
+        'rows': rows[::-1],
+        'totals': rollups.totals(rows),
+        'peak_hours': max(row.hours for row in rows) or 1,
+        'assignment_rows': assignment_rows,
+        'months': months,
+        'month_choices': rollups.REPORT_MONTHS,
+    }
+    return render(request, 'employers/reports.html', context)
+
+
+@login_required
+@user_passes_test(is_employer)
+@replicas.reads
+def export_list(request, name):
+    """Download a whole list (applications, assignments, invoices, contracts) as CSV or XLSX, with the list's filters"""
+    try:
+        employer_profile = request.user.employerprofile
+    except EmployerProfile.DoesNotExist:
+        messages.info(request, 'Please complete your employer profile first.')
+        return redirect('employers:profile_setup')
+
+    if name not in exports.EXPORTS:
+        raise Http404
+    try:
+        return exports.export(
+            name, employer_profile, request.GET, request.GET.get('format', 'csv'),
+            asynchronous=async_views.is_asgi(request),
+        )
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+
 @login_required
 @user_passes_test(is_employer)
 def invoices_list(request):
@@ -628,6 +802,7 @@ def invoices_list(request):
 
 @login_required
 @user_passes_test(is_employer)
+@conditional(etags.invoice_detail)
 def invoice_detail(request, invoice_id):
     """View detailed invoice information"""
     try:
@@ -795,6 +970,7 @@ def contracts_list(request):
 
 @login_required
 @user_passes_test(is_employer)
+@conditional(etags.contract_detail)
 def contract_detail(request, contract_id):
     """View contract details"""
     try:
@@ -835,7 +1011,7 @@ def create_contract(request):
                 messages.error(request, 'Contract type and effective date are required.')
                 return render(request, 'employers/create_contract.html', {
                     'employer_profile': employer_profile,
-                    'templates': ContractTemplate.objects.filter(is_active=True),
+                    'templates': reference_data.active_contract_templates(),
                     'contract_types': Contract.ContractType.choices
                 })
 
@@ -861,7 +1037,7 @@ def create_contract(request):
             messages.error(request, f'Error creating contract: {str(e)}')
 
     # Get available templates
-    templates = ContractTemplate.objects.filter(is_active=True)
+    templates = reference_data.active_contract_templates()
 
     context = {
         'employer_profile': employer_profile,
@@ -890,6 +1066,7 @@ def update_contract_status(request, contract_id):
         if new_status not in dict(Contract.ContractStatus.choices):
             return JsonResponse({'success': False, 'error': 'Invalid status'})
 
+        old_status = contract.status
         contract.status = new_status
 
         # Set signed date if moving to active
@@ -897,6 +1074,8 @@ def update_contract_status(request, contract_id):
             contract.signed_date = date.today()
 
         contract.save()
+        if new_status != old_status:
+            notifications.contract_status_changed(contract)
 
         return JsonResponse({
             'success': True,
@@ -907,4 +1086,32 @@ def update_contract_status(request, contract_id):
     except EmployerProfile.DoesNotExist:
         return JsonResponse({'success': False, 'error': 'Employer profile not found'})
     except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)})
\ No newline at end of file
+        return JsonResponse({'success': False, 'error': str(e)})
+
+def public_job_list(request):
+    """Open job postings for anonymous visitors, served from the board page cache"""
+    params = board.filters(request.GET)
+    html = board.cached('list', params, lambda: board.render('jobs/board.html', board.list_context(params), request))
+    return board.page_response(HttpResponse(html))
+
+
+def public_job_detail(request, job_id):
+    """An open job posting for anonymous visitors; closed and unknown ones are cached as not found too"""
+
+    def render_detail():
+        context = board.detail_context(job_id)
+        return board.render('jobs/detail.html', context, request) if context else ''
+
+    html = board.cached('detail', {'id': job_id}, render_detail)
+    if not html:
+        raise Http404("No open job posting with this id")
+    return board.page_response(HttpResponse(html))
+
+
+def public_feed(request, name):
+    """The sitemap or a job feed; nginx serves these files directly in production"""
+    if name not in feeds.FILES:
+        raise Http404("Unknown feed")
+    feeds.ensure()
+    response = FileResponse(open(feeds.path_of(name), 'rb'), content_type=feeds.FILES[name])
+    return board.page_response(response)
@@ -7,4 +7,5 @@ urlpatterns = [
     path('dashboard/', views.dashboard, name='dashboard'),
     path('profile/', views.profile_view, name='profile_view'),
     path('profile/setup/', views.profile_setup, name='profile_setup'),
+    path('reports/', views.reports, name='reports'),
 ]
\ No newline at end of file
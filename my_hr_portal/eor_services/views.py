@@ -2,6 +2,8 @@ from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.decorators import user_passes_test
 from django.contrib import messages
+from core import rollups
+from core.models import Rollup
 from .models import EORClientProfile
 from .forms import EORClientProfileForm
 
@@ -82,4 +84,27 @@ def profile_view(request):
         'profile': profile
     }
 
-    return render(request, 'eor_services/profile_view.html', context)
\ No newline at end of file
+    return render(request, 'eor_services/profile_view.html', context)
+
+
+@login_required
+@user_passes_test(is_eor_client)
+def reports(request):
+    """Hours, pay and billing of placed employees by month, read from the reporting rollups"""
+    try:
+        profile = request.user.eorclientprofile
+    except EORClientProfile.DoesNotExist:
+        messages.info(request, 'Please complete your EOR client profile first.')
+        return redirect('eor_services:profile_setup')
+
+    months = rollups.report_months(request.GET.get('months'))
+    rows = rollups.monthly(Rollup.Scope.EOR_CLIENT, profile.id, months)
+    context = {
+        'profile': profile,
+        'rows': rows[::-1],
+        'totals': rollups.totals(rows),
+        'peak_hours': max(row.hours for row in rows) or 1,
+        'months': months,
+        'month_choices': rollups.REPORT_MONTHS,
+    }
+    return render(request, 'eor_services/reports.html', context)
@@ -9,6 +9,7 @@ APP_NAME="hr-portal"
 APP_USER="www-data"
 APP_DIR="/var/www/$APP_NAME"
 SERVICE_NAME="hr-portal"
+EMAIL_SERVICE_NAME="hr-portal-email"
 REPO_URL="https://github.com/doorsas/JOB_PORTAL_DREKAR_NEW.git"
 
 # Colors for output
@@ -107,6 +108,7 @@ fi
 print_status "Creating necessary directories..."
 sudo -u $APP_USER mkdir -p $APP_DIR/my_hr_portal/logs
 sudo -u $APP_USER mkdir -p $APP_DIR/my_hr_portal/media
+sudo -u $APP_USER mkdir -p $APP_DIR/my_hr_portal/feeds
 sudo -u $APP_USER mkdir -p $APP_DIR/my_hr_portal/staticfiles
 
 # Copy environment file if it exists in the repo or restore from backup
@@ -157,6 +159,14 @@ if [ ! -f "/etc/systemd/system/$SERVICE_NAME.service" ]; then
     systemctl enable $SERVICE_NAME
 fi
 
+# The email worker sends everything the app queues (password resets, notifications)
+if [ ! -f "/etc/systemd/system/$EMAIL_SERVICE_NAME.service" ]; then
+    print_status "Creating email worker service file..."
+    cp $APP_DIR/my_hr_portal/hr-portal-email.service /etc/systemd/system/
+    systemctl daemon-reload
+    systemctl enable $EMAIL_SERVICE_NAME
+fi
+
 # Create Nginx configuration if it doesn't exist
 if [ ! -f "/etc/nginx/sites-available/$APP_NAME" ]; then
     print_status "Setting up Nginx configuration..."
@@ -168,6 +178,7 @@ fi
 # Start services
 print_status "Starting services..."
 systemctl start $SERVICE_NAME
+systemctl restart $EMAIL_SERVICE_NAME
 systemctl reload nginx
 
 # Wait for services to start
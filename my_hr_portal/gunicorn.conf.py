@@ -7,12 +7,26 @@ import os
 bind = "127.0.0.1:8000"
 backlog = 2048
 
-# Worker processes - adjusted for low memory instances
-# For 1GB RAM instance (t2.micro), use 2-3 workers
-# For 2GB+ RAM, you can increase to 4-5 workers
+# Worker processes - the fallback profile. Unless GUNICORN_AUTOTUNE=0, the
+# worker class, worker/thread counts and max_requests below are replaced at
+# startup by core/worker_tuning.py from the host's memory, CPUs and the size of
+# the preloaded app (see when_ready). GUNICORN_WORKERS, GUNICORN_THREADS and
+# GUNICORN_MAX_REQUESTS pin single values; `manage.py tune_gunicorn`
+# load-tests candidate profiles on this host and recommends them.
 workers = 2
+threads = 1
 worker_class = "sync"
 worker_connections = 1000
+autotune = os.environ.get("GUNICORN_AUTOTUNE", "1") == "1"
+
+# Application: WSGI by default. GUNICORN_ASGI=1 serves asgi.py with uvicorn
+# workers instead, so the async views (job search, job detail, applications,
+# CV download, employer lists) and the event stream run on an event loop and a
+# slow query, download or client no longer holds a whole worker.
+wsgi_app = "my_hr_portal.wsgi:application"
+if os.environ.get("GUNICORN_ASGI") == "1":
+    wsgi_app = "my_hr_portal.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
 timeout = 60
 keepalive = 2
 
@@ -52,6 +66,22 @@ limit_request_field_size = 8190
 # keyfile = "/etc/ssl/private/your-domain.key"
 # certfile = "/etc/ssl/certs/your-domain.crt"
 
+# Server hooks
+def when_ready(server):
+    # The app is preloaded and no worker is forked yet. Workers must open their
+    # own (persistent or pooled) database connections, not share the master's
+    from django.db import connections
+    connections.close_all()
+    if autotune:
+        from core import worker_tuning
+        worker_tuning.apply(server)
+
+
+def on_reload(server):
+    # HUP re-reads this file; tune again before the new workers are spawned
+    when_ready(server)
+
+
 # Performance tuning
 worker_tmp_dir = "/dev/shm"  # Use RAM disk for better performance
 forwarded_allow_ips = "127.0.0.1"
\ No newline at end of file
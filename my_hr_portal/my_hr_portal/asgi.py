@@ -2,6 +2,9 @@
 ASGI config for my_hr_portal project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with uvicorn workers under gunicorn (``GUNICORN_ASGI=1``, see
+gunicorn.conf.py) to run the async views and the event stream on an event
+loop; ``wsgi.py`` remains the default entry point.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -11,6 +14,9 @@ import os
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'my_hr_portal.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'my_hr_portal.settings.production')
+# Tells the settings they are served over ASGI (whichever server runs this), so
+# they leave out sync-only middleware and persistent database connections
+os.environ['GUNICORN_ASGI'] = '1'
 
 application = get_asgi_application()
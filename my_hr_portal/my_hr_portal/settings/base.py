@@ -4,6 +4,7 @@ This file contains settings common to all environments.
 """
 
 import os
+import tempfile
 from pathlib import Path
 from decouple import config, Csv
 
@@ -31,16 +32,25 @@ INSTALLED_APPS = [
     'core',
 ]
 
+# Served by asgi.py (which sets GUNICORN_ASGI) rather than wsgi.py
+ASGI = config('GUNICORN_ASGI', default=False, cast=bool)
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # For static files in production
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'core.replicas.ReplicaMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
+if ASGI:
+    # WhiteNoise is sync-only: one sync middleware makes Django run the whole
+    # stack in a thread per request. nginx serves /static/ itself, and
+    # runserver's staticfiles handler covers development
+    MIDDLEWARE.remove('whitenoise.middleware.WhiteNoiseMiddleware')
 
 ROOT_URLCONF = 'my_hr_portal.urls'
 
@@ -55,6 +65,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.live_events',
             ],
         },
     },
@@ -101,6 +112,24 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Public job board (employers/board.py): pages stay cached until a posting
+# changes; the sitemap and RSS/JSON feeds are files under JOB_FEEDS_ROOT that
+# nginx serves directly, with absolute links built from PUBLIC_SITE_URL.
+# Kept out of MEDIA_ROOT: the directory also holds the entry state and lock
+# files, which must not be served under /media/
+PUBLIC_SITE_URL = config('PUBLIC_SITE_URL', default='http://localhost:8000')
+JOB_BOARD_CACHE_TIMEOUT = 60 * 60 * 24
+JOB_FEEDS_ROOT = BASE_DIR / 'feeds'
+
+# Read replica (core/replicas.py): used when DATABASES has a 'replica' alias.
+# Visitors read from the primary for this long after they change something
+DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+DATABASE_REPLICA_STICKY_SECONDS = config('DATABASE_REPLICA_STICKY_SECONDS', default=10, cast=int)
+
+# Per-worker database connection counters (core/connection_stats.py,
+# `python manage.py db_connections`); production uses /var/run/hr-portal
+DB_CONNECTION_STATS_DIR = config('DB_CONNECTION_STATS_DIR', default=os.path.join(tempfile.gettempdir(), 'hr-portal-db-connections'))
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -119,6 +148,14 @@ SITE_ID = 1
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='HR Portal <noreply@hrportal.com>')
 SERVER_EMAIL = config('SERVER_EMAIL', default='HR Portal <server@hrportal.com>')
 
+# Outbound email queue (core/mail.py): EMAIL_BACKEND stores messages and
+# `manage.py send_queued_email` delivers them through EMAIL_QUEUE_DELIVERY_BACKEND
+EMAIL_BACKEND = 'core.mail.QueuedEmailBackend'
+EMAIL_QUEUE_DELIVERY_BACKEND = config('EMAIL_QUEUE_DELIVERY_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_QUEUE_BATCH_SIZE = config('EMAIL_QUEUE_BATCH_SIZE', default=100, cast=int)
+EMAIL_QUEUE_RATE_LIMIT = config('EMAIL_QUEUE_RATE_LIMIT', default=10, cast=float)  # messages per second, 0 = unlimited
+EMAIL_QUEUE_MAX_ATTEMPTS = config('EMAIL_QUEUE_MAX_ATTEMPTS', default=5, cast=int)
+
 # Password reset settings
 PASSWORD_RESET_TIMEOUT = 86400  # 24 hours in seconds
 
@@ -127,6 +164,16 @@ FILE_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
 
 # Session settings
+SESSION_ENGINE = 'core.sessions.db'
 SESSION_COOKIE_AGE = 86400  # 24 hours
-SESSION_SAVE_EVERY_REQUEST = True
-SESSION_EXPIRE_AT_BROWSER_CLOSE = False
\ No newline at end of file
+# Sessions are saved when they change; otherwise the expiry slides forward at most this often
+SESSION_SAVE_EVERY_REQUEST = False
+SESSION_REFRESH_INTERVAL = 60 * 15  # 15 minutes
+SESSION_EXPIRE_AT_BROWSER_CLOSE = False
+# Keep anonymous sessions in a signed cookie; they move to SESSION_ENGINE on login
+SESSION_ANONYMOUS_SIGNED_COOKIES = config('SESSION_ANONYMOUS_SIGNED_COOKIES', default=True, cast=bool)
+
+# Live status events (core/events.py). The stream needs an ASGI server, so pages
+# only open it when enabled; the Redis URL fans events out across worker processes
+EVENTS_STREAM_ENABLED = config('EVENTS_STREAM_ENABLED', default=False, cast=bool)
+EVENTS_REDIS_URL = config('EVENTS_REDIS_URL', default='')
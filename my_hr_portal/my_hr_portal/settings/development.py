@@ -14,11 +14,27 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Opening SQLite is cheap, so connections close after each request unless set
+        'CONN_MAX_AGE': config('DATABASE_CONN_MAX_AGE', default=0, cast=int),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
-# Email backend for development
-EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+# A second SQLite file stands in for a read replica; copy the primary into it
+# with `python manage.py sync_replica` (core/replicas.py)
+if config('DATABASE_REPLICA_PATH', default=''):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': config('DATABASE_REPLICA_PATH'),
+        'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+        'CONN_HEALTH_CHECKS': True,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# Queued email is delivered to the console; set EMAIL_QUEUE_DELIVERY_BACKEND to
+# 'django.core.mail.backends.filebased.EmailBackend' to write files to EMAIL_FILE_PATH
+EMAIL_QUEUE_DELIVERY_BACKEND = config('EMAIL_QUEUE_DELIVERY_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 # Add development-specific apps
 INSTALLED_APPS += [
@@ -19,6 +19,40 @@ DATABASES = {
     )
 }
 
+# Optional streaming replica for read-only pages (core/replicas.py)
+if config('DATABASE_REPLICA_URL', default=''):
+    DATABASES['replica'] = dj_database_url.config(env='DATABASE_REPLICA_URL')
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+# Connection reuse. Each worker keeps its connection for DATABASE_CONN_MAX_AGE
+# seconds, checked before reuse, instead of connecting for every request.
+# Persistent connections are not reused under ASGI, so there the default is 0;
+# on PostgreSQL, DATABASE_POOL=1 gives every worker process a psycopg pool
+# instead (needs psycopg[pool]; size it so workers x max size stays below the
+# server's max_connections). Django's pool and CONN_MAX_AGE exclude each other.
+DATABASE_CONN_MAX_AGE = config('DATABASE_CONN_MAX_AGE', default=0 if ASGI else 60, cast=int)
+DATABASE_POOL = config('DATABASE_POOL', default=False, cast=bool)
+for database in DATABASES.values():
+    database['CONN_HEALTH_CHECKS'] = True
+    if DATABASE_POOL and database['ENGINE'] == 'django.db.backends.postgresql':
+        from psycopg_pool import ConnectionPool
+
+        database['CONN_MAX_AGE'] = 0
+        database.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': config('DATABASE_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DATABASE_POOL_MAX_SIZE', default=10, cast=int),
+            # Seconds a request waits for a free connection before failing
+            'timeout': config('DATABASE_POOL_TIMEOUT', default=10, cast=int),
+            'check': ConnectionPool.check_connection,
+        }
+    else:
+        database['CONN_MAX_AGE'] = DATABASE_CONN_MAX_AGE
+
+# Per-worker connection counters live in the unit's RuntimeDirectory: the
+# service runs with PrivateTmp=true, so files under /tmp would be invisible to
+# `manage.py db_connections` run from a shell
+DB_CONNECTION_STATS_DIR = config('DB_CONNECTION_STATS_DIR', default='/var/run/hr-portal/db-connections')
+
 # Security Settings
 SECURE_SSL_REDIRECT = config('SECURE_SSL_REDIRECT', default=False, cast=bool)
 SECURE_PROXY_SSL_HEADER_NAME = config('SECURE_PROXY_SSL_HEADER_NAME', default='')
@@ -49,7 +83,7 @@ CSRF_TRUSTED_ORIGINS = config('CSRF_TRUSTED_ORIGINS', default='', cast=Csv())
 X_FRAME_OPTIONS = 'DENY'
 
 # Email Configuration
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_QUEUE_DELIVERY_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = config('EMAIL_HOST')
 EMAIL_PORT = config('EMAIL_PORT', cast=int)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER')
@@ -71,9 +105,12 @@ CACHES = {
 }
 
 # Session Configuration
-SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
+SESSION_ENGINE = 'core.sessions.cache'
 SESSION_CACHE_ALIAS = 'default'
 
+# Live status events across workers
+EVENTS_REDIS_URL = config('EVENTS_REDIS_URL', default=config('REDIS_URL', default=''))
+
 # Logging Configuration
 LOGGING = {
     'version': 1,
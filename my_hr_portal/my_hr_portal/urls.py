@@ -25,6 +25,7 @@ urlpatterns = [
     path('employers/', include('employers.urls')),
     path('employees/', include('employees.urls')),
     path('eor/', include('eor_services.urls')),
+    path('', include('employers.board_urls')),
     path('', include('core.urls')),
 ]
 
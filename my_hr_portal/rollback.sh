@@ -9,6 +9,7 @@ APP_NAME="hr-portal"
 APP_USER="www-data"
 APP_DIR="/var/www/$APP_NAME"
 SERVICE_NAME="hr-portal"
+EMAIL_SERVICE_NAME="hr-portal-email"
 BACKUP_DIR="/var/backups/$APP_NAME"
 
 # Colors
@@ -119,6 +120,7 @@ chmod -R 755 $APP_DIR
 # Start services
 print_status "Starting services..."
 systemctl start $SERVICE_NAME
+systemctl restart $EMAIL_SERVICE_NAME 2>/dev/null || print_warning "$EMAIL_SERVICE_NAME is not installed; queued email is not being sent"
 systemctl reload nginx
 
 # Wait for services to start
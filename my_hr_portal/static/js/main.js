@@ -6,6 +6,9 @@ document.addEventListener('DOMContentLoaded', function() {
     initializeMessages();
     initializeFormValidation();
     initializeAnimations();
+    initializeAutocompleteSelects();
+    initializeNotificationBadge();
+    initializeEventStream();
 });
 
 // User Menu Functionality
@@ -287,6 +290,87 @@ function confirmAction(message, callback) {
     }
 }
 
+// Autocomplete selects: the server renders only the selected option and
+// matching options are fetched from data-autocomplete-url as the user types
+function initializeAutocompleteSelects() {
+    document.querySelectorAll('select[data-autocomplete-url]').forEach(function(select) {
+        const search = document.createElement('input');
+        search.type = 'search';
+        search.className = 'form-control mb-1';
+        search.placeholder = 'Type to search...';
+        search.autocomplete = 'off';
+        select.parentNode.insertBefore(search, select);
+
+        let timer = null;
+        search.addEventListener('input', function() {
+            clearTimeout(timer);
+            const query = search.value.trim();
+            if (query.length < 2) {
+                return;
+            }
+            timer = setTimeout(function() {
+                fetch(select.dataset.autocompleteUrl + '?q=' + encodeURIComponent(query), {
+                    credentials: 'same-origin'
+                })
+                    .then(function(response) { return response.json(); })
+                    .then(function(data) {
+                        // Keep the empty option and the current selection
+                        Array.from(select.options).forEach(function(option) {
+                            if (option.value && !option.selected) {
+                                option.remove();
+                            }
+                        });
+                        data.results.forEach(function(result) {
+                            if (!select.querySelector('option[value="' + result.id + '"]')) {
+                                select.add(new Option(result.text, result.id));
+                            }
+                        });
+                    });
+            }, 250);
+        });
+    });
+}
+
+// Unread notification badge, refreshed from the cached counter endpoint
+function initializeNotificationBadge() {
+    const badge = document.querySelector('[data-unread-url]');
+    if (!badge) {
+        return;
+    }
+    const count = badge.querySelector('[data-unread-count]');
+
+    function refresh() {
+        fetch(badge.dataset.unreadUrl, { credentials: 'same-origin' })
+            .then(function(response) { return response.json(); })
+            .then(function(data) {
+                count.textContent = data.unread;
+                count.classList.toggle('d-none', !data.unread);
+            });
+    }
+    refresh();
+    setInterval(refresh, 60000);
+    document.addEventListener('portal:status', refresh);
+}
+
+// Live status changes pushed by the server (server-sent events). Elements
+// marked data-status-for="<model>-<id>" get the new status label; other code
+// can listen for the 'portal:status' event on document.
+function initializeEventStream() {
+    const url = document.body.dataset.eventStreamUrl;
+    if (!url || !window.EventSource) {
+        return;
+    }
+    const source = new EventSource(url);
+    source.addEventListener('status', function(event) {
+        const data = JSON.parse(event.data);
+        document.querySelectorAll('[data-status-for="' + data.model + '-' + data.id + '"]').forEach(function(element) {
+            element.textContent = data.status_display;
+            element.dataset.status = data.status;
+        });
+        document.dispatchEvent(new CustomEvent('portal:status', { detail: data }));
+    });
+}
+
 // Add CSS animations
 const style = document.createElement('style');
 style.textContent = `
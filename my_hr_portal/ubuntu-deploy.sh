@@ -79,7 +79,7 @@ echo "3. Copy .env file with production settings"
 echo "4. Run migrations: sudo -u $APP_USER $APP_DIR/venv/bin/python manage.py migrate"
 echo "5. Collect static files: sudo -u $APP_USER $APP_DIR/venv/bin/python manage.py collectstatic --noinput"
 echo "6. Create superuser: sudo -u $APP_USER $APP_DIR/venv/bin/python manage.py createsuperuser"
-echo "7. Set up systemd service"
+echo "7. Set up the systemd services (hr-portal.service, and hr-portal-email.service to send queued email)"
 echo "8. Configure Nginx"
 echo "9. Set up SSL with Let's Encrypt"
 
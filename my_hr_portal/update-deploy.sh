@@ -9,6 +9,7 @@ APP_NAME="hr-portal"
 APP_USER="www-data"
 APP_DIR="/var/www/$APP_NAME"
 SERVICE_NAME="hr-portal"
+EMAIL_SERVICE_NAME="hr-portal-email"
 BACKUP_DIR="/var/backups/$APP_NAME"
 TIMESTAMP=$(date +"%Y%m%d_%H%M%S")
 
@@ -86,6 +87,13 @@ sudo -u $APP_USER $APP_DIR/venv/bin/python manage.py migrate
 print_status "Collecting static files..."
 sudo -u $APP_USER $APP_DIR/venv/bin/python manage.py collectstatic --noinput
 
+# Rewrite the public sitemap and job feeds served by nginx
+print_status "Rebuilding job feeds..."
+sudo -u $APP_USER $APP_DIR/venv/bin/python manage.py rebuild_job_feeds
+# Feeds used to live under media/, where their state files were served publicly
+sudo sed -i 's#my_hr_portal/media/feeds/#my_hr_portal/feeds/#' /etc/nginx/sites-available/$APP_NAME
+sudo rm -rf $APP_DIR/my_hr_portal/media/feeds
+
 # Update cache table (if using database cache)
 print_status "Updating cache table..."
 sudo -u $APP_USER $APP_DIR/venv/bin/python manage.py createcachetable
@@ -100,9 +108,15 @@ chown -R $APP_USER:$APP_USER $APP_DIR
 chmod -R 755 $APP_DIR
 chmod -R 644 $APP_DIR/staticfiles/
 
+# Install or refresh the email worker unit (sends the queued outbound email)
+cp $APP_DIR/my_hr_portal/hr-portal-email.service /etc/systemd/system/
+systemctl daemon-reload
+systemctl enable --quiet $EMAIL_SERVICE_NAME
+
 # Restart services
 print_status "Restarting services..."
 systemctl start $SERVICE_NAME
+systemctl restart $EMAIL_SERVICE_NAME
 systemctl reload nginx
 
 # Wait a moment for services to start
@@ -110,6 +124,11 @@ sleep 3
 
 # Check service status
 print_status "Checking service status..."
+if systemctl is-active --quiet $EMAIL_SERVICE_NAME; then
+    print_success "$EMAIL_SERVICE_NAME is running"
+else
+    print_warning "$EMAIL_SERVICE_NAME is not running; queued email is not being sent (journalctl -u $EMAIL_SERVICE_NAME)"
+fi
 if systemctl is-active --quiet $SERVICE_NAME; then
     print_success "$SERVICE_NAME is running"
 else